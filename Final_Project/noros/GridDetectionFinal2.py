@@ -1,3 +1,6 @@
+import collections
+import time
+
 import cv2
 import numpy as np
 import cv2.aruco as aruco
@@ -32,8 +35,44 @@ def find_intersections(lines):
                 intersections.append(pt)
     return intersections
 
+def find_intersections_batch(lines, frame_shape=None):
+    """
+    NumPy version of find_intersections. Takes the HoughLinesP array (N,1,4)
+    directly, splits it into vertical/horizontal in one pass and intersects
+    every vertical with every horizontal segment by broadcasting.
+    If frame_shape is given, points outside the frame are dropped.
+    Returns an (N,2) int array in the same order as find_intersections
+    (vertical-major).
+    """
+    if lines is None or len(lines) == 0:
+        return np.empty((0, 2), dtype=int)
+    segs = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+    is_vertical = np.abs(segs[:, 0] - segs[:, 2]) < np.abs(segs[:, 1] - segs[:, 3])
+    v = segs[is_vertical]
+    h = segs[~is_vertical]
+    if len(v) == 0 or len(h) == 0:
+        return np.empty((0, 2), dtype=int)
+
+    # (V,1) against (1,H)
+    x1, y1, x2, y2 = (v[:, i:i + 1] for i in range(4))
+    x3, y3, x4, y4 = (h[None, :, i] for i in range(4))
+    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    valid = denom != 0
+    safe_denom = np.where(valid, denom, 1.0)
+    a = x1 * y2 - y1 * x2
+    b = x3 * y4 - y3 * x4
+    px = (a * (x3 - x4) - (x1 - x2) * b) / safe_denom
+    py = (a * (y3 - y4) - (y1 - y2) * b) / safe_denom
+
+    if frame_shape is not None:
+        frame_h, frame_w = frame_shape[:2]
+        valid &= (px >= 0) & (px < frame_w) & (py >= 0) & (py < frame_h)
+
+    # astype(int) truncates toward zero, same as int() in compute_intersection
+    return np.stack((px[valid], py[valid]), axis=1).astype(int)
+
 def cluster_points(points, cluster_dist):
-    if not points:
+    if len(points) == 0:
         return []
     pts = np.array(points)
     clusters = []
@@ -47,6 +86,50 @@ def cluster_points(points, cluster_dist):
         pts = pts[~close_mask]
     return clusters
 
+def cluster_points_grid(points, cluster_dist):
+    """
+    Same result as cluster_points, but points are bucketed into a spatial hash
+    with cell size cluster_dist, so each reference point only looks at the
+    3x3 neighbouring buckets instead of every remaining point.
+    Reference points are still taken in input order, so clusters come out
+    identical and in the same order.
+    """
+    if len(points) == 0:
+        return []
+    pts = np.array(points)
+    keys = np.floor_divide(pts, cluster_dist).astype(np.int64)
+
+    # Bucket -> indices; a stable sort keeps each bucket in input order
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.any(np.diff(sorted_keys, axis=0) != 0, axis=1)) + 1
+    buckets = {
+        tuple(sorted_keys[s]): idxs
+        for s, idxs in zip(np.concatenate(([0], starts)).tolist(), np.split(order, starts))
+    }
+
+    alive = np.ones(len(pts), dtype=bool)
+    clusters = []
+    for ref_idx in range(len(pts)):
+        if not alive[ref_idx]:
+            continue
+        kx, ky = keys[ref_idx].tolist()
+        cand = [buckets[k] for k in ((kx + dx, ky + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+                if k in buckets]
+        cand = np.sort(np.concatenate(cand))
+        cand = cand[alive[cand]]
+        dists = np.linalg.norm(pts[cand] - pts[ref_idx], axis=1)
+        close = cand[dists < cluster_dist]
+        cluster_center = np.mean(pts[close], axis=0).astype(int)
+        clusters.append(tuple(cluster_center))
+        alive[close] = False
+    return clusters
+
+CLUSTER_METHODS = {
+    "greedy": cluster_points,
+    "grid": cluster_points_grid,
+}
+
 def sort_into_grid(intersections):
     if not intersections:
         return []
@@ -109,6 +192,25 @@ def get_grid_corners(grid):
     br = bottom_row[-1]
     return [tl, tr, bl, br]
 
+# Stages timed by process_frame(frame, timings), in order; "render" also
+# covers building and publishing the DetectionResult
+PROCESS_STAGES = ["update_grid", "warp", "detect_aruco", "assign_cells", "render"]
+
+def stage_timer(timings):
+    """
+    lap(stage) appends the seconds since the previous lap (or since this
+    call) to timings[stage]. With timings=None lap does nothing.
+    """
+    if timings is None:
+        return lambda stage: None
+    last = [time.perf_counter()]
+
+    def lap(stage):
+        now = time.perf_counter()
+        timings.setdefault(stage, []).append(now - last[0])
+        last[0] = now
+    return lap
+
 def warp_point(pt, H):
     x, y = pt
     in_vec = np.array([[x], [y], [1]], dtype=np.float32)
@@ -119,11 +221,86 @@ def warp_point(pt, H):
         return (ox, oy)
     return (0, 0)
 
+def marker_center(corner_pts):
+    """Integer center of a marker from its (4,2) int corners."""
+    return int(np.mean(corner_pts[:, 0])), int(np.mean(corner_pts[:, 1]))
+
+def marker_angle(corner_pts):
+    """Heading in degrees of the marker's top edge (corner 0 -> corner 1)."""
+    dx = corner_pts[1][0] - corner_pts[0][0]
+    dy = corner_pts[1][1] - corner_pts[0][1]
+    return float(np.degrees(np.arctan2(dy, dx)))
+
 def point_in_polygon(pt, polygon):
     poly_np = np.array(polygon, dtype=np.int32).reshape((-1,1,2))
     inside = cv2.pointPolygonTest(poly_np, pt, False)
     return inside >= 0
 
+class GridGeometry:
+    """
+    Everything drawn or tested against for one grid, in display coordinates:
+      points   - grid rows of (x, y) intersections
+      polygons - list of ([tl, tr, br, bl], label), one per cell
+      centers  - cell centers, same order as labels
+    With a homography H every point is warped in a single
+    cv2.perspectiveTransform call instead of one warp_point per point.
+    Coordinates are truncated to int like warp_point does.
+    """
+
+    def __init__(self, grid, H=None):
+        raw_centers, self.labels = find_cell_centers(grid)
+        row_lengths = [len(row) for row in grid]
+        flat = [pt for row in grid for pt in row] + list(raw_centers)
+        pts = np.array(flat, dtype=np.float64).reshape(-1, 1, 2)
+        if H is not None and len(pts) > 0:
+            pts = cv2.perspectiveTransform(pts, H)
+        pts = [tuple(p) for p in pts.reshape(-1, 2).astype(int).tolist()]
+
+        self.points = []
+        start = 0
+        for n in row_lengths:
+            self.points.append(pts[start:start + n])
+            start += n
+        self.centers = pts[start:]
+
+        self.polygons = []
+        cell_label = 1
+        for r in range(len(self.points) - 1):
+            row_top = self.points[r]
+            row_bot = self.points[r + 1]
+            num_cols = min(len(row_top), len(row_bot))
+            for c in range(num_cols - 1):
+                poly = [row_top[c], row_top[c + 1], row_bot[c + 1], row_bot[c]]
+                self.polygons.append((poly, cell_label))
+                cell_label += 1
+
+class DetectionResult:
+    """
+    What one processed frame found, without any pixels:
+      robot_position      - (x, y, angle_deg) or None
+      robot_cell_label    - cell label of the robot or None
+      other_markers       - list of (marker_id, (x, y), angle_deg)
+      other_markers_cells - list of [marker_id, cell_label, angle_deg]
+      marker_corners      - list of (marker_id, (4,2) int array), for drawing
+      grid, homography    - grid and homography the labels were computed with
+    Coordinates are in the warped image when used_homography is True.
+    """
+
+    def __init__(self, frame_id, frame_shape, used_homography, robot_position,
+                 robot_cell_label, other_markers, other_markers_cells,
+                 marker_corners, grid, homography, grid_version):
+        self.frame_id = frame_id
+        self.frame_shape = frame_shape
+        self.used_homography = used_homography
+        self.robot_position = robot_position
+        self.robot_cell_label = robot_cell_label
+        self.other_markers = other_markers
+        self.other_markers_cells = other_markers_cells
+        self.marker_corners = marker_corners
+        self.grid = grid
+        self.homography = homography
+        self.grid_version = grid_version
+
 # ArUco Setup
 aruco_dict = aruco.getPredefinedDictionary(aruco.DICT_6X6_250)
 detector_params = aruco.DetectorParameters()
@@ -135,7 +312,7 @@ class ArucoGridDetector:
     the old midpoint-based line.
     """
 
-    def __init__(self, robot_id, rows, cols, cell_size, camera_index=2):
+    def __init__(self, robot_id, rows, cols, cell_size, camera_index=2, frame_source=None):
         self.robot_id = robot_id
         self.rows = rows
         self.cols = cols
@@ -151,25 +328,71 @@ class ArucoGridDetector:
         # Toggles & parameters
         self.detect_grid = 1         # 1=grid detection on, 0=off
         self.cluster_dist = 50
+        self.cluster_method = "grid"  # key into CLUSTER_METHODS
         self.update_thresh = 15
         self.show_intersections = 0
         self.show_lines = 0
         self.use_wrap = 0
         self.triangle_side = 100  # side of the equilateral triangle
+        self.track_grid = 0          # 1=lock the grid once stable and only validate it
+        self.lock_frames = 5         # consecutive stable detections needed to lock
+        self.roi_tracking = 0        # 1=look for markers near their last position first
+        self.roi_padding = 100       # px added around a marker's last bounding box
+        self.full_scan_interval = 15 # full-frame ArUco scan at least every N frames
+        self.render = 1              # 0=detection only, no overlay frame is produced
+        self.render_every = 1        # draw overlays on every Nth processed frame
 
         # Internal state
-        self.cap = cv2.VideoCapture(camera_index)
+        # Anything with read()/release() like cv2.VideoCapture works here,
+        # e.g. the sources in frame_sources.py (video file, image folder, synthetic arena)
+        if frame_source is not None:
+            self.cap = frame_source
+        else:
+            self.cap = cv2.VideoCapture(camera_index)
         #self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
         #self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
         self.last_valid_grid = None
         self.last_valid_homography = None
         self.display_frame = None
+        self._grid_version = 0       # bumped whenever the grid / homography changes
+        self._cell_raster = None     # HxW int32, cell label per pixel (0 = no cell)
+        self._cell_raster_key = None
+        self._geometry = None        # GridGeometry for the current grid version
+        self._geometry_key = None
+
+        # Grid tracking state
+        self.grid_locked = False
+        self.grid_drift = 0.0        # mean corner drift (px) since the grid was locked
+        self._stable_count = 0
+        self._locked_corners = None  # (4,1,2) float32 corners at lock time
+        self._track_pts = None       # same corners, followed with optical flow
+        self._track_prev_gray = None
+
+        # ArUco ROI tracking state
+        self._roi_boxes = {}         # marker_id -> (x0, y0, x1, y1) from the last frame
+        self._roi_frame_shape = None
+        self._frames_since_full_scan = 0
+        self.aruco_stats = {
+            "frames": 0,
+            "full_scans": 0,
+            "roi_lookups": 0,        # tracked markers searched for in their ROI
+            "roi_hits": 0,           # ... and found there
+            "detect_ms": 0.0,        # last frame
+            "avg_detect_ms": 0.0,    # exponential moving average
+        }
 
         # Robot/markers
         self.robot_position = None  # (x, y, angle_deg)
         self.other_markers = []     # list of (marker_id, (x,y), angle_deg)
         self.robot_cell_label = None
         self.other_markers_cell_labels = []
+        self.marker_corners = []    # list of (marker_id, (4,2) int array)
+        self._frame_count = 0
+        self._published = (None, None)   # (display_frame, DetectionResult)
+        # Setters that reset tracking state may be called from the GUI thread
+        # while VisionPipeline's worker is inside process_frame; they queue
+        # their change here and process_frame applies it before the next frame
+        self._pending_settings = collections.deque()
 
     # ======= Setters =======
     def set_detect_grid_state(self, val):
@@ -178,6 +401,12 @@ class ArucoGridDetector:
     def set_cluster_dist(self, val):
         self.cluster_dist = val
 
+    def set_cluster_method(self, val):
+        if val not in CLUSTER_METHODS:
+            print(f"Unknown cluster method '{val}', keeping '{self.cluster_method}'.")
+            return
+        self.cluster_method = val
+
     def set_update_thresh(self, val):
         self.update_thresh = val
 
@@ -193,46 +422,144 @@ class ArucoGridDetector:
     def set_triangle_side(self, val):
         self.triangle_side = val
 
+    def set_track_grid(self, val):
+        def apply():
+            self.track_grid = val
+            if val != 1:
+                self._release_grid_lock()
+        self._pending_settings.append(apply)
+
+    def set_roi_tracking(self, val):
+        def apply():
+            self.roi_tracking = val
+            if val != 1:
+                self._roi_boxes = {}
+        self._pending_settings.append(apply)
+
+    def set_roi_padding(self, val):
+        self.roi_padding = val
+
+    def set_full_scan_interval(self, val):
+        self.full_scan_interval = max(1, val)
+
+    def set_render(self, val):
+        def apply():
+            self.render = val
+            if val != 1:
+                self.display_frame = None
+        self._pending_settings.append(apply)
+
+    def set_render_every(self, val):
+        self.render_every = max(1, val)
+
+    def unlock_grid(self):
+        """Drops the grid lock; takes effect from the next processed frame."""
+        self._pending_settings.append(self._release_grid_lock)
+
+    def _apply_pending_settings(self):
+        while self._pending_settings:
+            self._pending_settings.popleft()()
+
+    def _release_grid_lock(self):
+        self.grid_locked = False
+        self._stable_count = 0
+        self._locked_corners = None
+        self._track_pts = None
+        self._track_prev_gray = None
+
     # ======= Main Processing =======
     def update_frame(self):
         ret, frame = self.cap.read()
         if not ret:
             print("Failed to read frame from camera.")
             return False
+        self.process_frame(frame)
+        return True
+
+    def process_frame(self, frame, timings=None):
+        """
+        Runs grid detection, ArUco detection and cell assignment on a frame
+        that was already read, and returns a DetectionResult. Used by
+        update_frame and by the threaded VisionPipeline, which does the
+        capture on its own thread.
+        Overlays are drawn afterwards by render_overlays, only when render=1
+        and only on every render_every-th frame; get_frame() keeps returning
+        the last rendered frame in between.
+        Settings queued by set_track_grid / set_roi_tracking / set_render /
+        unlock_grid since the last call are applied first.
+        With a timings dict, the seconds spent in each stage (PROCESS_STAGES)
+        are appended to timings[stage] (benchmark_vision.py).
+        """
+        self._apply_pending_settings()
+        lap = stage_timer(timings)
 
         # Possibly update the grid if detect_grid == 1
         if self.detect_grid == 1:
             self.update_grid(frame)
+        lap("update_grid")
 
-        # Possibly warp
-        display_frame = frame.copy()
+        # Possibly warp; detection then runs in the warped image
         used_homography = False
         if self.use_wrap == 1 and self.last_valid_homography is not None:
             out_w = int(self.cols * self.cell_size)
             out_h = int(self.rows * self.cell_size)
             if out_w < 1: out_w = 1
             if out_h < 1: out_h = 1
-            display_frame = cv2.warpPerspective(frame, self.last_valid_homography, (out_w, out_h))
+            frame = cv2.warpPerspective(frame, self.last_valid_homography, (out_w, out_h))
             used_homography = True
+        lap("warp")
 
         # ArUco detection
-        self.detect_aruco(display_frame)
+        self.detect_aruco(frame)
+        lap("detect_aruco")
 
         # Triangle-based cell assignment (if grid is known)
         self.robot_cell_label = None
         self.other_markers_cell_labels = []
         if self.last_valid_grid is not None:
-            self._assign_markers_to_cells(display_frame, used_homography)
+            self._assign_markers_to_cells(frame.shape, used_homography)
+        lap("assign_cells")
+
+        result = self._make_result(frame.shape, used_homography)
+
+        if self._render_due():
+            # The warped image is already a private copy; the camera frame is not
+            canvas = frame if used_homography else frame.copy()
+            self.display_frame = self.render_overlays(canvas, result)
+
+        self._publish(result)
+        lap("render")
+        return result
+
+    def _make_result(self, frame_shape, used_homography):
+        self._frame_count += 1
+        return DetectionResult(
+            self._frame_count, frame_shape[:2], used_homography,
+            self.robot_position, self.robot_cell_label,
+            list(self.other_markers), list(self.other_markers_cell_labels),
+            list(self.marker_corners),
+            self.last_valid_grid, self.last_valid_homography, self._grid_version,
+        )
 
-        # Draw grid
-        if self.last_valid_grid is not None:
-            self.draw_grid(display_frame, used_homography)
+    def _render_due(self):
+        """True if the frame just turned into a result should be rendered."""
+        return self.render == 1 and (self._frame_count - 1) % self.render_every == 0
 
-        self.display_frame = display_frame
-        return True
+    def _publish(self, result):
+        # One tuple swapped in with a single assignment, so getters called from
+        # another thread never see half of one frame and half of the next.
+        self._published = (self.display_frame, result)
 
     def update_grid(self, frame):
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.track_grid == 1 and self.grid_locked:
+            if self._validate_locked_grid(gray):
+                return
+            print(f"Grid drift {self.grid_drift:.1f}px, re-detecting grid.")
+            self._release_grid_lock()
+        self._detect_grid_full(gray)
+
+    def _detect_grid_full(self, gray):
         binary = cv2.adaptiveThreshold(
             gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY, 15, 10
@@ -240,126 +567,246 @@ class ArucoGridDetector:
         edges = cv2.Canny(binary, 50, 150)
         lines = cv2.HoughLinesP(edges, 1, np.pi/180, 60, minLineLength=30, maxLineGap=10)
 
-        raw_intx = find_intersections(lines)
+        raw_intx = find_intersections_batch(lines, gray.shape)
         cdist = max(1, self.cluster_dist)
-        clustered = cluster_points(raw_intx, cdist)
+        clustered = CLUSTER_METHODS[self.cluster_method](raw_intx, cdist)
         new_grid = sort_into_grid(clustered)
 
         if new_grid:
-            if self.last_valid_grid is None:
-                self.last_valid_grid = new_grid
+            if (self.last_valid_grid is None or
+                    average_grid_distance(self.last_valid_grid, new_grid) > self.update_thresh):
+                self._set_grid(new_grid)
+                self._stable_count = 0
             else:
-                dist = average_grid_distance(self.last_valid_grid, new_grid)
-                if dist > self.update_thresh:
-                    self.last_valid_grid = new_grid
+                self._stable_count += 1
 
             corners_4 = get_grid_corners(self.last_valid_grid)
-            if corners_4 is not None:
-                image_corner_pts = np.float32(corners_4)
-                H = cv2.getPerspectiveTransform(image_corner_pts, self.real_corner_pts)
-                self.last_valid_homography = H
+            if (corners_4 is not None and self.track_grid == 1
+                    and self._stable_count >= self.lock_frames):
+                self._lock_grid(gray, np.float32(corners_4))
+        else:
+            self._stable_count = 0
+
+    def _set_grid(self, grid):
+        """Replace the grid (and its homography) and bump the grid version."""
+        self.last_valid_grid = grid
+        corners_4 = get_grid_corners(grid)
+        if corners_4 is not None:
+            image_corner_pts = np.float32(corners_4)
+            self.last_valid_homography = cv2.getPerspectiveTransform(
+                image_corner_pts, self.real_corner_pts)
+        # Anything derived from the grid (e.g. the cell raster) is keyed on this
+        self._grid_version += 1
 
-    def detect_aruco(self, display_frame):
-        corners, ids, _ = aruco.detectMarkers(display_frame, aruco_dict, parameters=detector_params)
+    # --------------------------------------------------------------------------
+    # Grid tracking: once locked, the four outer corners are followed with
+    # Lucas-Kanade optical flow. Full detection only runs again when they
+    # drift more than update_thresh from where the grid was locked, or when
+    # a corner is lost (e.g. covered by a robot).
+    # --------------------------------------------------------------------------
+    def _lock_grid(self, gray, corner_pts):
+        self._locked_corners = corner_pts.reshape(-1, 1, 2).copy()
+        self._track_pts = self._locked_corners.copy()
+        self._track_prev_gray = gray
+        self.grid_drift = 0.0
+        self.grid_locked = True
+        print("Grid locked, switching to tracking.")
+
+    def _validate_locked_grid(self, gray):
+        pts, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._track_prev_gray, gray, self._track_pts, None,
+            winSize=(21, 21), maxLevel=2
+        )
+        self._track_prev_gray = gray
+        if pts is None or not status.all():
+            self.grid_drift = float('inf')
+            return False
+        self._track_pts = pts
+        self.grid_drift = float(np.mean(np.linalg.norm(pts - self._locked_corners, axis=2)))
+        return self.grid_drift <= self.update_thresh
+
+    def detect_aruco(self, frame):
+        corners, ids = self._find_markers(frame)
         self.robot_position = None
         self.other_markers = []
+        self.marker_corners = []
 
         if ids is not None and len(ids) > 0:
             for i, cset in enumerate(corners):
-                c = cset[0]
-                corner_pts = [(int(pt[0]), int(pt[1])) for pt in c]
-                cx = int(np.mean([pt[0] for pt in corner_pts]))
-                cy = int(np.mean([pt[1] for pt in corner_pts]))
-                dx = corner_pts[1][0] - corner_pts[0][0]
-                dy = corner_pts[1][1] - corner_pts[0][1]
-                angle_deg = np.degrees(np.arctan2(dy, dx))
-
-                marker_id = int(ids[i])
+                corner_pts = cset[0].astype(int)
+                cx, cy = marker_center(corner_pts)
+                angle_deg = marker_angle(corner_pts)
+
+                marker_id = int(ids[i][0])
                 if marker_id == self.robot_id:
                     self.robot_position = (cx, cy, angle_deg)
                 else:
                     self.other_markers.append((marker_id, (cx, cy), angle_deg))
+                self.marker_corners.append((marker_id, corner_pts))
 
-                # Draw bounding box & center
-                cv2.polylines(display_frame, [np.array(corner_pts)], True, (255, 255, 0), 2)
-                cv2.circle(display_frame, (cx, cy), 5, (255, 255, 0), -1)
+    # --------------------------------------------------------------------------
+    # ROI tracking: each marker seen in the last frame is searched for in its
+    # old bounding box grown by roi_padding. The full frame is only scanned
+    # when a tracked marker is not found again, every full_scan_interval
+    # frames (to pick up new markers), or when nothing is being tracked.
+    # --------------------------------------------------------------------------
+    def _find_markers(self, frame):
+        t0 = time.perf_counter()
+        shape = frame.shape[:2]
+        if self._roi_frame_shape != shape:
+            # Warp toggled or camera resolution changed, old boxes are meaningless
+            self._roi_boxes = {}
+            self._roi_frame_shape = shape
+
+        stats = self.aruco_stats
+        corners, ids = None, None
+        full_scan = (self.roi_tracking != 1 or not self._roi_boxes
+                     or self._frames_since_full_scan >= self.full_scan_interval)
+        if not full_scan:
+            corners, ids, lost = self._detect_in_rois(frame)
+            stats["roi_lookups"] += len(self._roi_boxes)
+            stats["roi_hits"] += len(self._roi_boxes) - lost
+            full_scan = lost > 0
+
+        if full_scan:
+            corners, ids, _ = aruco.detectMarkers(frame, aruco_dict, parameters=detector_params)
+            self._frames_since_full_scan = 0
+            stats["full_scans"] += 1
+        else:
+            self._frames_since_full_scan += 1
+
+        if self.roi_tracking == 1:
+            self._roi_boxes = {}
+            if ids is not None:
+                for cset, mid in zip(corners, ids[:, 0]):
+                    c = cset[0]
+                    self._roi_boxes[int(mid)] = (c[:, 0].min(), c[:, 1].min(),
+                                                 c[:, 0].max(), c[:, 1].max())
+
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+        stats["detect_ms"] = dt_ms
+        if stats["frames"] == 0:
+            stats["avg_detect_ms"] = dt_ms
+        else:
+            stats["avg_detect_ms"] += 0.1 * (dt_ms - stats["avg_detect_ms"])
+        stats["frames"] += 1
+        return corners, ids
 
-                # Label
-                if marker_id == self.robot_id:
-                    id_text = "Bulbul"
-                else:
-                    id_text = f"ID: {marker_id}"
-                x0, y0 = corner_pts[0]
-                x1, y1 = corner_pts[1]
-                cv2.putText(display_frame, id_text, (x0, y0 - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 2)
-                cv2.putText(display_frame, f"{angle_deg:.1f} deg", (x1, y1 - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 2)
-                # We no longer draw the old front line here. That will be replaced
-                # by drawing from center to the front corner of the triangle later.
+    def _detect_in_rois(self, frame):
+        """
+        Runs detectMarkers on the padded box of every tracked marker.
+        Returns (corners, ids, lost) in the same layout as aruco.detectMarkers,
+        with corners shifted back to full-frame coordinates; lost is how many
+        tracked markers were not found in their box.
+        """
+        h, w = frame.shape[:2]
+        pad = self.roi_padding
+        found = {}
+        for mid, (x0, y0, x1, y1) in self._roi_boxes.items():
+            if mid in found:
+                # Already picked up inside a neighbour's box
+                continue
+            rx0, ry0 = max(0, int(x0) - pad), max(0, int(y0) - pad)
+            rx1, ry1 = min(w, int(x1) + pad + 1), min(h, int(y1) + pad + 1)
+            if rx1 <= rx0 or ry1 <= ry0:
+                continue
+            roi_corners, roi_ids, _ = aruco.detectMarkers(
+                frame[ry0:ry1, rx0:rx1], aruco_dict, parameters=detector_params)
+            if roi_ids is None:
+                continue
+            for cset, found_id in zip(roi_corners, roi_ids[:, 0]):
+                found_id = int(found_id)
+                if found_id not in found:
+                    found[found_id] = cset + np.float32([rx0, ry0])
+
+        lost = sum(1 for mid in self._roi_boxes if mid not in found)
+        if not found:
+            return (), None, lost
+        ids = np.array(list(found.keys()), dtype=np.int32).reshape(-1, 1)
+        return tuple(found.values()), ids, lost
 
     # --------------------------------------------------------------------------
     # Equilateral Triangle => check if corners are inside a single cell polygon
     # and draw line from center -> front triangle corner
     # --------------------------------------------------------------------------
-    def _assign_markers_to_cells(self, display_frame, used_homography):
-        cell_polys = self._get_cell_polygons(used_homography)
+    def _assign_markers_to_cells(self, frame_shape, used_homography):
+        raster = self._get_cell_raster(frame_shape, used_homography)
 
-        # Robot
-        if self.robot_position is not None:
-            rx, ry, rangle = self.robot_position
-            tri_corners = self._get_triangle_corners(rx, ry, rangle)
-            # Draw triangle
-            pts_np = np.array(tri_corners, dtype=np.int32).reshape((-1,1,2))
-            cv2.polylines(display_frame, [pts_np], True, (0,255,0), 2)
+        # Robot first, then the others, so all triangles go through one lookup
+        markers = self._marker_poses(self.robot_position, self.other_markers)
+        if not markers:
+            self.other_markers_cell_labels = []
+            return
 
-            # Draw line from center to the front corner = tri_corners[0]
-            front_corner = tri_corners[0]
-            cv2.line(display_frame,
-                     (int(rx), int(ry)),
-                     (int(front_corner[0]), int(front_corner[1])),
-                     (0, 255, 255), 2)
+        markers_np = np.array(markers, dtype=np.float64)
+        tri_corners = self._get_triangle_corners_batch(markers_np[:, :2], markers_np[:, 2])
+        labels = self._lookup_cells(tri_corners, raster)
 
-            self.robot_cell_label = self._find_cell_for_triangle(tri_corners, cell_polys)
+        if self.robot_position is not None:
+            self.robot_cell_label = labels[0]
+            labels = labels[1:]
 
         # Other markers
         self.other_markers_cell_labels = []
-        for (mid, (mx, my), angle_deg) in self.other_markers:
-            tri_corners = self._get_triangle_corners(mx, my, angle_deg)
-            pts_np = np.array(tri_corners, dtype=np.int32).reshape((-1,1,2))
-            cv2.polylines(display_frame, [pts_np], True, (0,255,0), 2)
-
-            # line from center to front corner
-            front_corner = tri_corners[0]
-            cv2.line(display_frame,
-                     (int(mx), int(my)),
-                     (int(front_corner[0]), int(front_corner[1])),
-                     (0, 255, 255), 2)
-
-            cell_label = self._find_cell_for_triangle(tri_corners, cell_polys)
+        for (mid, _, angle_deg), cell_label in zip(self.other_markers, labels):
             self.other_markers_cell_labels.append([mid, cell_label, angle_deg])
 
+    @staticmethod
+    def _marker_poses(robot_position, other_markers):
+        """(x, y, angle_deg) of the robot (first, if seen) and every other marker."""
+        markers = []
+        if robot_position is not None:
+            markers.append(tuple(robot_position))
+        for (mid, (mx, my), angle_deg) in other_markers:
+            markers.append((mx, my, angle_deg))
+        return markers
+
+    # --------------------------------------------------------------------------
+    # Cell raster: every pixel holds the label of the cell polygon covering it.
+    # Built once per grid version (and frame size / warp mode), after that a
+    # marker corner resolves to its cell with a single array lookup.
+    # --------------------------------------------------------------------------
+    def _get_cell_raster(self, frame_shape, used_homography):
+        key = (self._grid_version, bool(used_homography), frame_shape[:2])
+        if self._cell_raster_key != key:
+            raster = np.zeros(frame_shape[:2], dtype=np.int32)
+            for poly, label in self._get_cell_polygons(used_homography):
+                poly_np = np.array(poly, dtype=np.int32).reshape((-1,1,2))
+                cv2.fillPoly(raster, [poly_np], int(label))
+            self._cell_raster = raster
+            self._cell_raster_key = key
+        return self._cell_raster
+
+    def _lookup_cells(self, tri_corners, raster):
+        """
+        tri_corners: (M,3,2) array. Returns one label per triangle: the cell
+        holding all three corners, or None if they are not in the same cell.
+        """
+        h, w = raster.shape
+        pts = np.rint(tri_corners).astype(np.int64)
+        xs, ys = pts[..., 0], pts[..., 1]
+        inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        cells = np.zeros(xs.shape, dtype=np.int32)
+        cells[inside] = raster[ys[inside], xs[inside]]
+        same = (cells[:, 0] > 0) & (cells[:, 0] == cells[:, 1]) & (cells[:, 0] == cells[:, 2])
+        return [int(c) if ok else None for c, ok in zip(cells[:, 0], same)]
+
     def _get_cell_polygons(self, used_homography):
-        polys = []
-        cell_label = 1
-        for r in range(len(self.last_valid_grid) - 1):
-            row_top = self.last_valid_grid[r]
-            row_bot = self.last_valid_grid[r + 1]
-            num_cols = min(len(row_top), len(row_bot))
-            for c in range(num_cols - 1):
-                tl = row_top[c]
-                tr = row_top[c + 1]
-                bl = row_bot[c]
-                br = row_bot[c + 1]
-                if used_homography and self.last_valid_homography is not None:
-                    tl = warp_point(tl, self.last_valid_homography)
-                    tr = warp_point(tr, self.last_valid_homography)
-                    bl = warp_point(bl, self.last_valid_homography)
-                    br = warp_point(br, self.last_valid_homography)
-                poly = [tl, tr, br, bl]
-                polys.append((poly, cell_label))
-                cell_label += 1
-        return polys
+        return self._get_grid_geometry(used_homography).polygons
+
+    # --------------------------------------------------------------------------
+    # Grid geometry cache: grid points, cell polygons and cell centers in the
+    # coordinates of the display frame. Rebuilt only when the grid version or
+    # the warp mode changes; all points go through one perspectiveTransform.
+    # --------------------------------------------------------------------------
+    def _get_grid_geometry(self, used_homography):
+        warp = bool(used_homography) and self.last_valid_homography is not None
+        key = (self._grid_version, warp)
+        if self._geometry_key != key:
+            self._geometry = GridGeometry(self.last_valid_grid,
+                                          self.last_valid_homography if warp else None)
+            self._geometry_key = key
+        return self._geometry
 
     def _get_triangle_corners(self, cx, cy, angle_deg):
         """
@@ -377,35 +824,84 @@ class ArucoGridDetector:
             corners.append((px, py))
         return corners
 
-    def _find_cell_for_triangle(self, tri_corners, cell_polys):
-        for (poly, label) in cell_polys:
-            inside_count = 0
-            for corner in tri_corners:
-                if point_in_polygon(corner, poly):
-                    inside_count += 1
-                else:
-                    break
-            if inside_count == 3:
-                return label
-        return None
+    def _get_triangle_corners_batch(self, centers, angles_deg):
+        """
+        Same corners as _get_triangle_corners for M markers at once.
+        centers: (M,2), angles_deg: (M,). Returns (M,3,2).
+        """
+        R = self.triangle_side / np.sqrt(3.0)
+        theta = np.radians(angles_deg)[:, None] + np.arange(3) * (2.0 * np.pi / 3.0)
+        xs = centers[:, 0:1] + R * np.cos(theta)
+        ys = centers[:, 1:2] + R * np.sin(theta)
+        return np.stack((xs, ys), axis=2)
+
+    # ======= Overlay Rendering =======
+    def render_overlays(self, display_frame, result):
+        """
+        Draws a DetectionResult into display_frame (in place) and returns it:
+        marker outlines and labels, the cell triangles with their front line,
+        then the grid. Nothing here feeds back into detection.
+        """
+        for marker_id, corner_pts in result.marker_corners:
+            cx, cy = marker_center(corner_pts)
+            angle_deg = marker_angle(corner_pts)
+
+            # Draw bounding box & center
+            cv2.polylines(display_frame, [corner_pts.reshape((-1,1,2))], True, (255, 255, 0), 2)
+            cv2.circle(display_frame, (cx, cy), 5, (255, 255, 0), -1)
+
+            # Label
+            if marker_id == self.robot_id:
+                id_text = "Bulbul"
+            else:
+                id_text = f"ID: {marker_id}"
+            x0, y0 = corner_pts[0]
+            x1, y1 = corner_pts[1]
+            cv2.putText(display_frame, id_text, (int(x0), int(y0) - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 2)
+            cv2.putText(display_frame, f"{angle_deg:.1f} deg", (int(x1), int(y1) - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 2)
+
+        if result.grid is None:
+            return display_frame
+
+        markers = self._marker_poses(result.robot_position, result.other_markers)
+        if markers:
+            markers_np = np.array(markers, dtype=np.float64)
+            tri_corners = self._get_triangle_corners_batch(markers_np[:, :2], markers_np[:, 2])
+            for (cx, cy, _), tri in zip(markers, tri_corners):
+                # Draw triangle
+                pts_np = tri.astype(np.int32).reshape((-1,1,2))
+                cv2.polylines(display_frame, [pts_np], True, (0,255,0), 2)
+
+                # Draw line from center to the front corner = tri[0]
+                cv2.line(display_frame,
+                         (int(cx), int(cy)),
+                         (int(tri[0][0]), int(tri[0][1])),
+                         (0, 255, 255), 2)
+
+        if result.grid_version == self._grid_version:
+            geom = self._get_grid_geometry(result.used_homography)
+        else:
+            # Grid changed since this result was produced, draw the old one
+            geom = GridGeometry(result.grid,
+                                result.homography if result.used_homography else None)
+        self.draw_grid(display_frame, result.used_homography, geom)
+        return display_frame
 
     # ======= Draw Grid Overlays =======
-    def draw_grid(self, display_frame, used_homography):
-        cell_centers, labels = find_cell_centers(self.last_valid_grid)
-        for (cx, cy), lbl in zip(cell_centers, labels):
-            if used_homography and self.last_valid_homography is not None:
-                cx, cy = warp_point((cx, cy), self.last_valid_homography)
+    def draw_grid(self, display_frame, used_homography, geom=None):
+        if geom is None:
+            geom = self._get_grid_geometry(used_homography)
+        for (cx, cy), lbl in zip(geom.centers, geom.labels):
             cv2.circle(display_frame, (cx, cy), 4, (0, 0, 255), -1)
             cv2.putText(display_frame, str(lbl), (cx - 10, cy + 5),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
         if self.show_intersections == 1:
-            num_rows = len(self.last_valid_grid)
-            for i, row_pts in enumerate(self.last_valid_grid):
+            num_rows = len(geom.points)
+            for i, row_pts in enumerate(geom.points):
                 for j, (x, y) in enumerate(row_pts):
-                    if used_homography and self.last_valid_homography is not None:
-                        x, y = warp_point((x, y), self.last_valid_homography)
-
                     if ((i == 0 and j == 0) or
                         (i == 0 and j == len(row_pts)-1) or
                         (i == num_rows-1 and j == 0) or
@@ -421,47 +917,61 @@ class ArucoGridDetector:
                     cv2.circle(display_frame, (x, y), radius, color, -1)
 
         if self.show_lines == 1:
-            num_rows = len(self.last_valid_grid)
+            num_rows = len(geom.points)
             for i in range(num_rows):
-                row_pts = self.last_valid_grid[i]
+                row_pts = geom.points[i]
                 for j in range(len(row_pts) - 1):
-                    p1 = row_pts[j]
-                    p2 = row_pts[j + 1]
-                    if used_homography and self.last_valid_homography is not None:
-                        p1 = warp_point(p1, self.last_valid_homography)
-                        p2 = warp_point(p2, self.last_valid_homography)
-                    cv2.line(display_frame, p1, p2, (255, 105, 180), 2)
+                    cv2.line(display_frame, row_pts[j], row_pts[j + 1], (255, 105, 180), 2)
             for i in range(num_rows - 1):
-                row_pts_this = self.last_valid_grid[i]
-                row_pts_next = self.last_valid_grid[i+1]
+                row_pts_this = geom.points[i]
+                row_pts_next = geom.points[i+1]
                 max_cols = min(len(row_pts_this), len(row_pts_next))
                 for col in range(max_cols):
-                    p1 = row_pts_this[col]
-                    p2 = row_pts_next[col]
-                    if used_homography and self.last_valid_homography is not None:
-                        p1 = warp_point(p1, self.last_valid_homography)
-                        p2 = warp_point(p2, self.last_valid_homography)
-                    cv2.line(display_frame, p1, p2, (255, 105, 180), 2)
+                    cv2.line(display_frame, row_pts_this[col], row_pts_next[col],
+                             (255, 105, 180), 2)
 
     # ======= Getters =======
     def get_frame(self):
-        return self.display_frame
+        """Last rendered overlay frame, None when render=0."""
+        return self._published[0]
+
+    def get_result(self):
+        """DetectionResult of the last processed frame, or None."""
+        return self._published[1]
+
+    def is_grid_locked(self):
+        """True while the grid is locked and only being tracked."""
+        return self.grid_locked
+
+    def get_aruco_stats(self):
+        """
+        ArUco detection counters: frames, full_scans, detect_ms, avg_detect_ms
+        and roi_hit_rate (fraction of tracked markers found again in their ROI).
+        """
+        stats = dict(self.aruco_stats)
+        lookups = stats["roi_lookups"]
+        stats["roi_hit_rate"] = stats["roi_hits"] / lookups if lookups else 0.0
+        return stats
 
     def get_robot_position(self):
         """(x, y, angle_deg) in final coords if wrap=1 or original if wrap=0."""
-        return self.robot_position
+        result = self._published[1]
+        return result.robot_position if result is not None else None
 
     def get_robot_cell_label(self):
         """Which cell the robot's triangle is in, or None."""
-        return self.robot_cell_label
+        result = self._published[1]
+        return result.robot_cell_label if result is not None else None
 
     def get_other_markers(self):
         """List of (marker_id, (x, y), angle_deg)."""
-        return self.other_markers
+        result = self._published[1]
+        return result.other_markers if result is not None else []
 
     def get_other_markers_cells(self):
         """List of (marker_id, cell_label, angle_deg). cell_label=None if no cell encloses it."""
-        return self.other_markers_cell_labels
+        result = self._published[1]
+        return result.other_markers_cells if result is not None else []
 
     def release(self):
         if self.cap:
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+from search_modified import SearchClass
+
+# The movement classes and the fake Pico live in test/ and are imported by module name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test"))
+
+from async_movement import AsyncMovementClass  # noqa: E402
+from fake_pico import FakeCamera, FakePico  # noqa: E402
+from movement_class5 import MovementClass  # noqa: E402
+
+
+def make_path(rows, cols):
+    """Corner-to-corner path on an empty grid, as the GUI would plan it."""
+    searcher = SearchClass()
+    searcher.set_grid_dimensions(rows, cols)
+    return searcher.find_path((0, 0), (rows - 1, cols - 1), 0)
+
+
+def run_sync(pico, camera, path, pipelined):
+    mover = MovementClass(pico_ip=pico.host, pico_port=pico.port, detector=camera)
+    mover.connect()
+    t0 = time.perf_counter()
+    mover.execute_path(path, pipelined=pipelined)
+    elapsed = time.perf_counter() - t0
+    mover.disconnect()
+    return elapsed
+
+
+async def run_async(pico, camera, path, pipelined):
+    mover = AsyncMovementClass(pico_ip=pico.host, pico_port=pico.port, detector=camera)
+    await mover.connect()
+    t0 = time.perf_counter()
+    await mover.execute_path(path, pipelined=pipelined)
+    elapsed = time.perf_counter() - t0
+    await mover.disconnect()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="MovementClass vs. AsyncMovementClass with camera corrections, "
+                    "against the simulated Pico.")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--cell-time", type=float, default=0.05, help="simulated s per cell")
+    parser.add_argument("--rotation-speed", type=float, default=900.0, help="simulated deg/s")
+    parser.add_argument("--turn-error", type=float, default=0.1,
+                        help="relative turn error the corrections have to remove")
+    parser.add_argument("--fps", type=float, default=30.0, help="simulated camera rate")
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.01, 0.03],
+                        help="one-way network delays to test, s")
+    args = parser.parse_args()
+
+    path = make_path(args.rows, args.cols)
+    print(f"{len(path)}-state path, turn error {args.turn_error:.0%}, camera {args.fps:.0f} fps")
+
+    modes = [("sync", False), ("async", False), ("sync pipe", True), ("async pipe", True)]
+    print(f"{'latency':>8} " + " ".join(f"{name:>12}" for name, _ in modes)
+          + "   (s per path, commands run)")
+    for latency in args.latencies:
+        pico = FakePico(port=0, cell_time=args.cell_time, rotation_speed=args.rotation_speed,
+                        latency=latency, turn_error=args.turn_error)
+        pico.start_in_thread()
+        camera = FakeCamera(pico, args.rows, args.cols, args.fps)
+        camera.start()
+        cells = []
+        for name, pipelined in modes:
+            camera.place(*path[0])
+            commands_before = pico.commands_run
+            with contextlib.redirect_stdout(io.StringIO()):
+                if name.startswith("sync"):
+                    elapsed = run_sync(pico, camera, path, pipelined)
+                else:
+                    elapsed = asyncio.run(run_async(pico, camera, path, pipelined))
+            cells.append(f"{elapsed:>7.3f} ({pico.commands_run - commands_before:>2})")
+        camera.stop()
+        pico.stop()
+        print(f"{latency * 1000:>6.0f}ms " + " ".join(f"{c:>12}" for c in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from GridDetectionFinal2 import CLUSTER_METHODS, find_intersections_batch
+
+IMAGE_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+
+def record_corpus(out_dir, camera_index, n_frames):
+    """Grab n_frames from the camera into out_dir as PNGs."""
+    os.makedirs(out_dir, exist_ok=True)
+    cap = cv2.VideoCapture(camera_index)
+    saved = 0
+    while saved < n_frames:
+        ret, frame = cap.read()
+        if not ret:
+            print("Failed to read frame from camera.")
+            break
+        cv2.imwrite(os.path.join(out_dir, f"frame_{saved:04d}.png"), frame)
+        saved += 1
+    cap.release()
+    print(f"Saved {saved} frames to {out_dir}")
+
+
+def raw_intersections(frame):
+    """Same front end as ArucoGridDetector.update_grid, up to clustering."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    binary = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY, 15, 10
+    )
+    edges = cv2.Canny(binary, 50, 150)
+    lines = cv2.HoughLinesP(edges, 1, np.pi/180, 60, minLineLength=30, maxLineGap=10)
+    return find_intersections_batch(lines, frame.shape)
+
+
+def corpus_from_dir(frames_dir):
+    paths = []
+    for pattern in IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(frames_dir, pattern)))
+    for path in sorted(paths):
+        frame = cv2.imread(path)
+        if frame is not None:
+            yield os.path.basename(path), raw_intersections(frame)
+
+
+def synthetic_corpus(n_sets, seed=0):
+    """
+    Intersection clouds shaped like real Hough output: dense blobs around
+    each grid crossing plus some scattered noise.
+    """
+    rng = np.random.default_rng(seed)
+    for i in range(n_sets):
+        rows, cols = rng.integers(4, 10), rng.integers(5, 12)
+        spacing = rng.integers(60, 120)
+        xs, ys = np.meshgrid(np.arange(cols + 1) * spacing + 40,
+                             np.arange(rows + 1) * spacing + 40)
+        crossings = np.stack((xs.ravel(), ys.ravel()), axis=1)
+        hits = rng.integers(20, 80, size=len(crossings))
+        blobs = np.repeat(crossings, hits, axis=0) + rng.normal(0, 4, (hits.sum(), 2))
+        noise = rng.uniform(0, (cols + 2) * spacing, (hits.sum() // 10, 2))
+        pts = np.concatenate((blobs, noise)).astype(int)
+        rng.shuffle(pts)
+        yield f"synthetic_{i:02d}", pts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cluster_points implementations.")
+    parser.add_argument("--frames", help="directory of recorded frames (png/jpg)")
+    parser.add_argument("--record", type=int, default=0,
+                        help="record this many frames from --camera into --frames first")
+    parser.add_argument("--camera", type=int, default=2)
+    parser.add_argument("--cluster-dist", type=int, default=50)
+    parser.add_argument("--synthetic", type=int, default=10,
+                        help="number of synthetic point sets when no --frames given")
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.frames:
+            parser.error("--record needs --frames")
+        record_corpus(args.frames, args.camera, args.record)
+
+    corpus = corpus_from_dir(args.frames) if args.frames else synthetic_corpus(args.synthetic)
+
+    totals = {name: 0.0 for name in CLUSTER_METHODS}
+    mismatches = 0
+    print(f"{'sample':<20} {'points':>7} " + " ".join(f"{n + ' ms':>10}" for n in CLUSTER_METHODS) + "  identical")
+    for name, pts in corpus:
+        results = {}
+        times = {}
+        for method, fn in CLUSTER_METHODS.items():
+            t0 = time.perf_counter()
+            results[method] = fn(pts, args.cluster_dist)
+            times[method] = time.perf_counter() - t0
+            totals[method] += times[method]
+        outputs = list(results.values())
+        identical = all(o == outputs[0] for o in outputs[1:])
+        mismatches += not identical
+        print(f"{name:<20} {len(pts):>7} "
+              + " ".join(f"{times[m] * 1000:>10.2f}" for m in CLUSTER_METHODS)
+              + f"  {identical}")
+
+    print("total: " + ", ".join(f"{m}={t * 1000:.1f} ms" for m, t in totals.items()))
+    print("All outputs identical." if mismatches == 0 else f"{mismatches} sample(s) differ!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+from search_modified import SearchClass
+
+# The movement classes, the compiler and the fake Pico live in test/ and are imported by module name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test"))
+
+from fake_pico import FakePico  # noqa: E402
+from motion_compiler import compile_path, estimate_time  # noqa: E402
+from movement_class5 import MovementClass  # noqa: E402
+
+GRID_SIZES = [(6, 8), (20, 20), (50, 50)]
+
+
+def make_searcher(rows, cols, density, seed):
+    """Grid with a seeded random obstacle layout; start/goal corners kept free."""
+    searcher = SearchClass()
+    searcher.set_grid_dimensions(rows, cols)
+    rng = random.Random(seed)
+    for _ in range(int(rows * cols * density)):
+        searcher.add_obstacle(rng.randrange(rows), rng.randrange(cols))
+    for cell in [(0, 0), (rows - 1, cols - 1)]:
+        searcher.remove_obstacle(*cell)
+    return searcher
+
+
+def per_cell_program(path):
+    """What the step-by-step execute_path sends: _compress_path with every FORWARD split into cells."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        segments = MovementClass()._compress_path(path)
+    return [(c, 1) if c == "FORWARD" else (c, p) for c, p in segments for _ in range(p if c == "FORWARD" else 1)]
+
+
+def programs(path):
+    return [("per cell", per_cell_program(path)),
+            ("merged", compile_path(path)),
+            ("arcs", compile_path(path, arcs=True))]
+
+
+def estimate_table(args):
+    print(f"Estimated time in SearchClass units (1 cell / unit, {args.rotation_cost} per 90 deg, "
+          f"{args.overhead} per command), averaged over {args.seeds} maps")
+    names = [name for name, _ in programs([])]
+    print(f"{'grid':>8} {'path':>6} " + " ".join(f"{name + ' cmds':>14} {'time':>7}" for name in names))
+    for rows, cols in GRID_SIZES:
+        totals = {name: [0, 0.0] for name in names}
+        states = 0
+        found = 0
+        for seed in range(args.seeds):
+            searcher = make_searcher(rows, cols, args.density, seed)
+            searcher.set_speeds(1.0, args.rotation_cost)
+            with contextlib.redirect_stdout(io.StringIO()):
+                path = searcher.find_path((0, 0), (rows - 1, cols - 1), 0)
+            if not path:
+                continue
+            found += 1
+            states += len(path)
+            for name, program in programs(path):
+                totals[name][0] += len(program)
+                totals[name][1] += estimate_time(program, searcher.linear_speed, searcher.rotation_speed,
+                                                 args.overhead)
+        if not found:
+            print(f"{rows}x{cols}: no path on any seed")
+            continue
+        grid = f"{rows}x{cols}"
+        print(f"{grid:>8} {states / found:>6.1f} " + " ".join(
+            f"{totals[name][0] / found:>14.1f} {totals[name][1] / found:>7.1f}" for name in names))
+
+
+def run_on_pico(pico, program, batched):
+    mover = MovementClass(pico_ip=pico.host, pico_port=pico.port)
+    with contextlib.redirect_stdout(io.StringIO()):
+        mover.connect()
+        t0 = time.perf_counter()
+        if batched:
+            ok = mover.execute_program(program)
+        else:
+            ok = all(mover._send_command_wait_ack(command, param) for command, param in program)
+        elapsed = time.perf_counter() - t0
+        mover.disconnect()
+    return elapsed, ok
+
+
+def pico_table(args):
+    path = make_searcher(args.rows, args.cols, args.density, 0).find_path((0, 0), (args.rows - 1, args.cols - 1), 0)
+    print(f"\nOn the simulated Pico: {args.rows}x{args.cols} map, {len(path)}-state path, "
+          f"{args.cell_time} s/cell, {args.rotation_speed:.0f} deg/s")
+    runs = [("per cell, stop-and-wait", "per cell", False),
+            ("merged, stop-and-wait", "merged", False),
+            ("merged, one batch", "merged", True),
+            ("arcs, one batch", "arcs", True)]
+    compiled = dict(programs(path))
+    print(f"{'latency':>8} " + " ".join(f"{name:>24}" for name, _, _ in runs) + "   (s per path)")
+    for latency in args.latencies:
+        pico = FakePico(port=0, cell_time=args.cell_time, rotation_speed=args.rotation_speed, latency=latency)
+        pico.start_in_thread()
+        cells = []
+        for _, program_name, batched in runs:
+            program = compiled[program_name]
+            elapsed, ok = run_on_pico(pico, program, batched)
+            cells.append(f"{elapsed:>7.3f} ({len(program):>2} cmds)" + ("" if ok else "!"))
+        pico.stop()
+        print(f"{latency * 1000:>6.0f}ms " + " ".join(f"{c:>24}" for c in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-cell commands vs. compiled motion programs (motion_compiler.py).")
+    parser.add_argument("--seeds", type=int, default=10, help="maps per grid size")
+    parser.add_argument("--density", type=float, default=0.2, help="fraction of cells that are obstacles")
+    parser.add_argument("--rotation-cost", type=float, default=1.0, help="SearchClass rotation_speed")
+    parser.add_argument("--overhead", type=float, default=0.3,
+                        help="per-command start/stop + ack time in SearchClass units")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--cell-time", type=float, default=0.05, help="simulated s per cell")
+    parser.add_argument("--rotation-speed", type=float, default=900.0, help="simulated deg/s")
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.03],
+                        help="one-way network delays to test, s")
+    args = parser.parse_args()
+
+    estimate_table(args)
+    pico_table(args)
+
+
+if __name__ == "__main__":
+    main()
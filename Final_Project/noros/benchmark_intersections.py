@@ -0,0 +1,65 @@
+import time
+import numpy as np
+
+from GridDetectionFinal2 import find_intersections, find_intersections_batch
+
+FRAME_W = 1280
+FRAME_H = 720
+SEGMENT_COUNTS = [100, 500, 2000]
+REPEATS = 5
+
+
+def make_segments(n, seed=0):
+    """
+    Random HoughLinesP-like output, shape (n,1,4) int32.
+    Half roughly vertical, half roughly horizontal.
+    """
+    rng = np.random.default_rng(seed)
+    segs = np.zeros((n, 1, 4), dtype=np.int32)
+    n_vert = n // 2
+    for i in range(n):
+        length = rng.integers(30, 300)
+        slope = rng.uniform(-0.05, 0.05)
+        if i < n_vert:
+            x = rng.integers(0, FRAME_W)
+            y = rng.integers(0, FRAME_H - length)
+            segs[i, 0] = (x, y, x + int(slope * length), y + length)
+        else:
+            x = rng.integers(0, FRAME_W - length)
+            y = rng.integers(0, FRAME_H)
+            segs[i, 0] = (x, y, x + length, y + int(slope * length))
+    return segs
+
+
+def time_it(fn, *args):
+    best = float('inf')
+    result = None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    print(f"{'segments':>8} {'pairs':>9} {'per-pair ms':>12} {'batch ms':>10} {'speedup':>8}  match")
+    for n in SEGMENT_COUNTS:
+        segs = make_segments(n)
+        # The old path runs on int32 scalars; cast up so it cannot overflow
+        # and the comparison is about the algorithm, not the dtype.
+        segs_wide = segs.astype(np.int64)
+        t_loop, ref = time_it(find_intersections, segs_wide)
+        t_batch, out = time_it(find_intersections_batch, segs)
+
+        # Same points in the same order when no bounds mask is applied
+        match = ref == [tuple(p) for p in out.tolist()]
+        pairs = (n // 2) * (n - n // 2)
+        print(f"{n:>8} {pairs:>9} {t_loop * 1000:>12.2f} {t_batch * 1000:>10.2f} "
+              f"{t_loop / t_batch:>7.1f}x  {match}")
+
+        masked = find_intersections_batch(segs, (FRAME_H, FRAME_W))
+        print(f"{'':>8} in-frame intersections: {len(masked)} / {len(out)}")
+
+
+if __name__ == "__main__":
+    main()
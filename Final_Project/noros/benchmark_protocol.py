@@ -0,0 +1,84 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+from search_modified import SearchClass
+
+# movement_class5.py and the fake Pico live in test/ and are imported by module name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test"))
+
+from fake_pico import FakePico  # noqa: E402
+from movement_class5 import MovementClass  # noqa: E402
+
+
+def make_path(rows, cols):
+    """Corner-to-corner path on an empty grid, as the GUI would plan it."""
+    searcher = SearchClass()
+    searcher.set_grid_dimensions(rows, cols)
+    return searcher.find_path((0, 0), (rows - 1, cols - 1), 0)
+
+
+def run_stop_and_wait(mover, segments):
+    """One command at a time through _send_command_wait_ack, as execute_path does."""
+    failed = 0
+    for command, param in segments:
+        if not mover._send_command_wait_ack(command, param):
+            failed += 1
+    return failed
+
+
+def run_once(pico, segments, mode, window):
+    mover = MovementClass(pico_ip=pico.host, pico_port=pico.port)
+    with contextlib.redirect_stdout(io.StringIO()):
+        mover.connect()
+        t0 = time.perf_counter()
+        if mode == "stop-and-wait":
+            failed = run_stop_and_wait(mover, segments)
+        else:
+            failed = 0 if mover.send_pipelined(segments, window=window) else 1
+        elapsed = time.perf_counter() - t0
+        mover.disconnect()
+    return elapsed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stop-and-wait vs. pipelined commands against the simulated Pico.")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--cell-time", type=float, default=0.05, help="simulated s per cell")
+    parser.add_argument("--rotation-speed", type=float, default=900.0, help="simulated deg/s")
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.01, 0.03],
+                        help="one-way network delays to test, s")
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    path = make_path(args.rows, args.cols)
+    with contextlib.redirect_stdout(io.StringIO()):
+        segments = MovementClass()._compress_path(path)
+    motion = sum(
+        FakePico(cell_time=args.cell_time, rotation_speed=args.rotation_speed).motion_time(c, [str(p)])
+        for c, p in segments)
+    print(f"{len(path)}-state path -> {len(segments)} commands, {motion:.2f} s of simulated motion")
+
+    modes = [("stop-and-wait", None)] + [(f"window {w}", w) for w in args.windows]
+    print(f"{'latency':>8} " + " ".join(f"{name:>14}" for name, _ in modes) + "   (s per path)")
+    for latency in args.latencies:
+        pico = FakePico(port=0, cell_time=args.cell_time, rotation_speed=args.rotation_speed,
+                        latency=latency)
+        pico.start_in_thread()
+        cells = []
+        for name, window in modes:
+            elapsed, failed = run_once(pico, segments, "stop-and-wait" if window is None else "pipelined",
+                                       window)
+            cells.append(f"{elapsed:>9.3f}" + (f" ({failed}!)" if failed else "     "))
+        pico.stop()
+        print(f"{latency * 1000:>6.0f}ms " + " ".join(f"{c:>14}" for c in cells))
+    print("(n!) = commands not acknowledged as expected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from search_modified import SEARCH_BACKENDS, SearchClass, find_conflicts
+
+GRID_SIZES = [(6, 8), (50, 50), (500, 500)]
+
+
+def make_searcher(rows, cols, density, seed, backend):
+    """Grid with a seeded random obstacle layout; start/goal corners kept free."""
+    searcher = SearchClass()
+    searcher.set_grid_dimensions(rows, cols)
+    searcher.set_backend(backend)
+    # Measure the search itself, not the path cache
+    searcher.set_cache_size(0)
+    rng = random.Random(seed)
+    for _ in range(int(rows * cols * density)):
+        searcher.add_obstacle(rng.randrange(rows), rng.randrange(cols))
+    for cell in [(0, 0), (0, 1), (rows - 1, cols - 1)]:
+        searcher.remove_obstacle(*cell)
+    return searcher
+
+
+def time_query(searcher, start, goal, repeats):
+    """Best of `repeats` runs of find_path, in ms, plus the path found."""
+    best = float('inf')
+    path = []
+    for _ in range(repeats):
+        # find_path prints when there is no path; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            path = searcher.find_path(start, goal, 0)
+            best = min(best, time.perf_counter() - t0)
+    return best * 1000.0, path
+
+
+def replan_benchmark(rows, cols, density, seed, n_changes):
+    """
+    Adds one obstacle at a time and replans after each, the way the GUI does
+    when a new marker shows up: full search vs. incremental (D* Lite).
+    """
+    full = make_searcher(rows, cols, density, seed, "array")
+    incremental = make_searcher(rows, cols, density, seed, "array")
+    incremental.set_incremental(True)
+    start, goal = (0, 0), (rows - 1, cols - 1)
+
+    first = {}
+    for name, searcher in (("full", full), ("incremental", incremental)):
+        first[name], _ = time_query(searcher, start, goal, 1)
+
+    rng = random.Random(seed + 1)
+    totals = {"full": 0.0, "incremental": 0.0}
+    same_cost = True
+    for _ in range(n_changes):
+        cell = (rng.randrange(rows), rng.randrange(cols))
+        if cell in (start, goal):
+            continue
+        paths = {}
+        for name, searcher in (("full", full), ("incremental", incremental)):
+            searcher.add_obstacle(*cell)
+            ms, paths[name] = time_query(searcher, start, goal, 1)
+            totals[name] += ms
+        same_cost &= path_cost(full, paths["incremental"]) <= path_cost(full, paths["full"]) + 1e-9
+    print(f"{rows}x{cols:<6} first plan: full {first['full']:.2f} ms, incremental "
+          f"{first['incremental']:.2f} ms | {n_changes} replans: full {totals['full']:.1f} ms, "
+          f"incremental {totals['incremental']:.1f} ms | cost <= full: {same_cost}")
+
+
+def cache_benchmark(rows, cols, density, seed, n_queries=200):
+    """Same query over and over on an unchanged map, as the GUI loop does."""
+    searcher = make_searcher(rows, cols, density, seed, "array")
+    searcher.set_cache_size(128)
+    start, goal = (0, 0), (rows - 1, cols - 1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        for _ in range(n_queries):
+            searcher.find_path(start, goal, 0)
+        elapsed = (time.perf_counter() - t0) * 1000.0
+    stats = searcher.get_cache_stats()
+    print(f"{rows}x{cols:<6} {n_queries} cached queries: {elapsed:.2f} ms total, "
+          f"{stats['hits']} hits / {stats['misses']} misses")
+
+
+def cost_field_benchmark(rows, cols, density, seed, n_goals=50):
+    """Many goals from one start: find_path per goal vs. one cost field."""
+    searcher = make_searcher(rows, cols, density, seed, "array")
+    rng = random.Random(seed + 2)
+    goals = [(rng.randrange(rows), rng.randrange(cols)) for _ in range(n_goals)]
+    goals = [g for g in goals if g not in searcher.obstacles]
+    start = (0, 0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        paths = [searcher.find_path(start, g, 0) for g in goals]
+        t1 = time.perf_counter()
+        field = searcher.compute_cost_field(start, 0)
+        t2 = time.perf_counter()
+        field_paths = [field.path_to(g) for g in goals]
+        t3 = time.perf_counter()
+    same = all(path_cost(searcher, a) >= path_cost(searcher, b) - 1e-9
+               for a, b in zip(paths, field_paths))
+    print(f"{rows}x{cols:<6} {len(goals)} goals: find_path {(t1 - t0) * 1000:.1f} ms, "
+          f"cost field {(t2 - t1) * 1000:.1f} ms + paths {(t3 - t2) * 1000:.2f} ms | "
+          f"cost <= find_path: {same}")
+
+
+def multi_robot_benchmark(rows, cols, n_agents, density, n_maps):
+    """plan_multi on seeded random maps: timing, conflicts and robots left stuck."""
+    times = []
+    conflicts = 0
+    stuck = 0
+    for seed in range(n_maps):
+        searcher = make_searcher(rows, cols, density, seed, "array")
+        rng = random.Random(seed)
+        free = [(r, c) for r in range(rows) for c in range(cols) if (r, c) not in searcher.obstacles]
+        cells = rng.sample(free, 2 * n_agents)
+        agents = {rid: (cells[rid], cells[n_agents + rid], rng.choice([0, 90, 180, 270]))
+                  for rid in range(n_agents)}
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            paths = searcher.plan_multi(agents)
+            times.append((time.perf_counter() - t0) * 1000.0)
+        conflicts += len(find_conflicts(paths, agents))
+        stuck += sum(1 for p in paths.values() if not p)
+    times.sort()
+    print(f"{rows}x{cols:<6} {n_agents} robots, {n_maps} maps: median {times[len(times) // 2]:.1f} ms, "
+          f"max {times[-1]:.1f} ms | conflicts {conflicts} | robots without path {stuck}")
+
+
+def anytime_benchmark(rows, cols, density, seed, budget_ms, max_calls=200):
+    """
+    Calls find_path_anytime with a fixed budget until the path is optimal,
+    as a movement loop would, and prints how the bound improves.
+    """
+    searcher = make_searcher(rows, cols, density, seed, "array")
+    start, goal = (0, 0), (rows - 1, cols - 1)
+    progress = []
+    total = 0.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for call in range(1, max_calls + 1):
+            t0 = time.perf_counter()
+            path, bound = searcher.find_path_anytime(start, goal, 0, budget_ms=budget_ms)
+            total += (time.perf_counter() - t0) * 1000.0
+            cost = path_cost(searcher, path)
+            if not progress or cost < progress[-1][2]:
+                progress.append((call, bound, cost))
+            if bound is None or bound <= 1.0:
+                break
+    steps = ", ".join(f"#{c}: cost {cost:.1f} (bound {b:.2f})" for c, b, cost in progress[:4])
+    if len(progress) > 4:
+        steps += " ..."
+    status = "optimal" if bound is not None and bound <= 1.0 else f"bound {bound:.3f}"
+    print(f"{rows}x{cols:<6} {budget_ms:g} ms/call: {steps} | {status} after {call} calls, "
+          f"{total:.0f} ms")
+
+
+def path_cost(searcher, path):
+    """Cost of a (row, col, direction) path under the searcher's cost model."""
+    if not path:
+        return float('inf')
+    total = 0.0
+    for (r, c, d), (nr, nc, nd) in zip(path, path[1:]):
+        time_cost = searcher._rotation_cost(d, nd) + 1.0 / searcher.linear_speed
+        total += (searcher.w_time * time_cost
+                  - searcher.w_reward * searcher.cell_rewards.get((nr, nc), 0.0))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SearchClass.find_path backends.")
+    parser.add_argument("--density", type=float, default=0.1, help="fraction of cells blocked")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="runs per query (1 on the largest grid)")
+    parser.add_argument("--backends", nargs="+", default=list(SEARCH_BACKENDS),
+                        choices=SEARCH_BACKENDS)
+    parser.add_argument("--replans", type=int, default=20,
+                        help="obstacle changes in the incremental replanning test (0 to skip)")
+    parser.add_argument("--budget", type=float, default=20.0,
+                        help="ms per find_path_anytime call in the anytime test")
+    parser.add_argument("--agents", type=int, default=8, help="robots in the multi-robot test")
+    parser.add_argument("--maps", type=int, default=50, help="random maps in the multi-robot test")
+    args = parser.parse_args()
+
+    print(f"{'grid':<9} {'query':<9} " + " ".join(f"{b + ' ms':>11}" for b in args.backends)
+          + f" {'speedup':>8}  same path")
+    for rows, cols in GRID_SIZES:
+        repeats = 1 if rows * cols > 100000 else args.repeats
+        queries = {
+            "adjacent": ((0, 0), (0, 1)),
+            "corners": ((0, 0), (rows - 1, cols - 1)),
+        }
+        searchers = {b: make_searcher(rows, cols, args.density, args.seed, b)
+                     for b in args.backends}
+        for searcher in searchers.values():
+            # The array backends allocate their storage once per grid size;
+            # time the queries after that, as the GUI sees them
+            time_query(searcher, (0, 0), (0, 1), 1)
+        for name, (start, goal) in queries.items():
+            times = {}
+            paths = {}
+            for backend, searcher in searchers.items():
+                times[backend], paths[backend] = time_query(searcher, start, goal, repeats)
+            outputs = list(paths.values())
+            same = all(p == outputs[0] for p in outputs[1:])
+            speedup = ""
+            if "dict" in times and "array" in times and times["array"] > 0:
+                speedup = f"{times['dict'] / times['array']:.1f}x"
+            print(f"{rows}x{cols:<6} {name:<9} "
+                  + " ".join(f"{times[b]:>11.2f}" for b in args.backends)
+                  + f" {speedup:>8}  {same} (len {len(outputs[0])})")
+
+    print()
+    for rows, cols in GRID_SIZES[:2]:
+        cache_benchmark(rows, cols, args.density, args.seed)
+
+    print()
+    for rows, cols in GRID_SIZES[:2] + [(200, 200)]:
+        cost_field_benchmark(rows, cols, args.density, args.seed)
+
+    print()
+    multi_robot_benchmark(20, 20, args.agents, args.density, args.maps)
+
+    print()
+    for rows, cols in [(50, 50), (200, 200), (500, 500)]:
+        anytime_benchmark(rows, cols, args.density, args.seed, args.budget)
+
+    if args.replans:
+        print()
+        for rows, cols in GRID_SIZES[:2] + [(200, 200)]:
+            replan_benchmark(rows, cols, args.density, args.seed, args.replans)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import math
+import os
+import sys
+import time
+
+from search_modified import SearchClass
+
+# The movement classes and the fake Pico live in test/ and are imported by module name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test"))
+
+from async_movement import AsyncMovementClass  # noqa: E402
+from fake_pico import FakeCamera, FakePico  # noqa: E402
+from movement_class5 import MovementClass  # noqa: E402
+from visual_servo import VisualServo  # noqa: E402
+
+
+def make_path(rows, cols):
+    """Corner-to-corner path on an empty grid, as the GUI would plan it."""
+    searcher = SearchClass()
+    searcher.set_grid_dimensions(rows, cols)
+    return searcher.find_path((0, 0), (rows - 1, cols - 1), 0)
+
+
+def run_steps(pico, camera, path):
+    mover = MovementClass(pico_ip=pico.host, pico_port=pico.port, detector=camera)
+    mover.connect()
+    t0 = time.perf_counter()
+    mover.execute_path(path)
+    elapsed = time.perf_counter() - t0
+    mover.disconnect()
+    return elapsed
+
+
+async def run_async_steps(pico, camera, path):
+    mover = AsyncMovementClass(pico_ip=pico.host, pico_port=pico.port, detector=camera)
+    await mover.connect()
+    t0 = time.perf_counter()
+    await mover.execute_path(path)
+    elapsed = time.perf_counter() - t0
+    await mover.disconnect()
+    return elapsed
+
+
+async def run_servo(pico, camera, path):
+    mover = AsyncMovementClass(pico_ip=pico.host, pico_port=pico.port, detector=camera)
+    await mover.connect()
+    servo = VisualServo(mover)
+    # Drive no faster than the step commands do
+    servo.max_speed = pico.cell_time and 1.0 / pico.cell_time
+    servo.max_turn_rate = pico.rotation_speed
+    t0 = time.perf_counter()
+    await servo.follow(path)
+    elapsed = time.perf_counter() - t0
+    await mover.disconnect()
+    return elapsed
+
+
+def final_error(pico, camera, state):
+    """(distance from the goal cell centre in cells, heading error in degrees)."""
+    gx, gy = camera.cell_centers[(state[0], state[1])]
+    distance = math.hypot(pico.x - gx, pico.y - gy) / camera.cell_size
+    heading = abs((pico.heading - state[2] + 180) % 360 - 180)
+    return distance, heading
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Step-and-correct execution vs. the visual servo, against the simulated Pico.")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--cell-time", type=float, default=0.5, help="simulated s per cell")
+    parser.add_argument("--rotation-speed", type=float, default=90.0, help="simulated deg/s")
+    parser.add_argument("--turn-error", type=float, default=0.1,
+                        help="relative turn error the corrections have to remove")
+    parser.add_argument("--fps", type=float, default=30.0, help="simulated camera rate")
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.03],
+                        help="one-way network delays to test, s")
+    args = parser.parse_args()
+
+    path = make_path(args.rows, args.cols)
+    print(f"{len(path)}-state path, {args.cell_time} s/cell, {args.rotation_speed:.0f} deg/s, "
+          f"turn error {args.turn_error:.0%}, camera {args.fps:.0f} fps")
+
+    modes = [("steps", lambda p, c: run_steps(p, c, path)),
+             ("async steps", lambda p, c: asyncio.run(run_async_steps(p, c, path))),
+             ("servo", lambda p, c: asyncio.run(run_servo(p, c, path)))]
+    print(f"{'latency':>8} {'mode':<12} {'s':>7} {'cells off':>10} {'deg off':>8}")
+    for latency in args.latencies:
+        pico = FakePico(port=0, cell_time=args.cell_time, rotation_speed=args.rotation_speed,
+                        latency=latency, turn_error=args.turn_error)
+        pico.start_in_thread()
+        camera = FakeCamera(pico, args.rows, args.cols, args.fps)
+        camera.start()
+        for name, run in modes:
+            camera.place(*path[0])
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed = run(pico, camera)
+            distance, heading = final_error(pico, camera, path[-1])
+            print(f"{latency * 1000:>6.0f}ms {name:<12} {elapsed:>7.2f} {distance:>10.3f} {heading:>8.1f}")
+        camera.stop()
+        pico.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from GridDetectionFinal2 import PROCESS_STAGES
+from frame_sources import ImageDirectorySource, SyntheticArenaSource, VideoFileSource
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+# Image_processor.py lives in test/ and is imported by module name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test"))
+
+
+class OneFrame:
+    """Hands one already-read frame to a detector that reads from self.cap."""
+
+    def __init__(self):
+        self.frame = None
+
+    def read(self):
+        return self.frame is not None, self.frame
+
+
+def time_frame(detector, frame, timings):
+    """
+    Runs one frame through the detector and returns the seconds it took.
+    ArucoGridDetector.process_frame fills timings per stage; Image_processor
+    has no stage hooks, so its update_frame is only timed as a whole.
+    """
+    t0 = time.perf_counter()
+    if hasattr(detector, "process_frame"):
+        detector.process_frame(frame, timings)
+    else:
+        detector.cap.frame = frame
+        detector.update_frame()
+    return time.perf_counter() - t0
+
+
+def run(detector_cls, source, label, n_frames, warmup, args):
+    staged = hasattr(detector_cls, "process_frame")
+    detector = detector_cls(robot_id=42, rows=args.rows, cols=args.cols,
+                            cell_size=args.cell_size,
+                            frame_source=source if staged else OneFrame())
+    detector.use_wrap = 1 if args.wrap else 0
+    if hasattr(detector, "set_track_grid"):
+        detector.set_track_grid(1 if args.track else 0)
+    if hasattr(detector, "set_render"):
+        detector.set_render(0 if args.no_render else 1)
+        detector.set_render_every(args.render_every)
+    if hasattr(detector, "set_roi_tracking"):
+        detector.set_roi_tracking(1 if args.roi else 0)
+        detector.set_roi_padding(args.roi_padding)
+    if hasattr(source, "screen_cell_px"):
+        # The default triangle (100 px) is sized for the real camera; it has to
+        # fit inside one synthetic cell for the robot's cell to resolve
+        detector.triangle_side = int(0.6 * source.screen_cell_px)
+
+    timings = {}
+    total = 0.0
+    processed = 0
+    cell_frames = 0
+    for i in range(warmup + n_frames):
+        ret, frame = source.read()
+        if not ret:
+            break
+        if i < warmup:
+            time_frame(detector, frame, {})
+            continue
+        total += time_frame(detector, frame, timings)
+        processed += 1
+        if detector.robot_cell_label is not None:
+            cell_frames += 1
+    source.release()
+
+    if processed == 0:
+        print(f"{label:<14} no frames")
+        return 0
+    fps = processed / total if total > 0 else float('inf')
+    means = [f"{1000.0 * sum(timings[s]) / processed:>10.2f}" if s in timings else f"{'-':>10}"
+             for s in PROCESS_STAGES]
+    found = "yes" if detector.robot_position is not None else "no"
+    print(f"{label:<14} {processed:>6} {fps:>7.1f} " + " ".join(means)
+          + f"  robot={found} cell={detector.robot_cell_label} ({cell_frames}/{processed} frames)")
+    if args.roi and hasattr(detector, "get_aruco_stats"):
+        st = detector.get_aruco_stats()
+        print(f"{'':<14} aruco: avg {st['avg_detect_ms']:.2f} ms, "
+              f"ROI hit rate {st['roi_hit_rate'] * 100:.1f}%, "
+              f"{st['full_scans']} full scans in {st['frames']} frames")
+    return cell_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-stage timing of the ArUco grid detector without a webcam.")
+    parser.add_argument("--module", default="GridDetectionFinal2",
+                        choices=["GridDetectionFinal2", "Image_processor"])
+    parser.add_argument("--video", help="benchmark on a video file instead of the synthetic arena")
+    parser.add_argument("--frames-dir", help="benchmark on a directory of images")
+    parser.add_argument("--frames", type=int, default=60, help="frames measured per run")
+    parser.add_argument("--warmup", type=int, default=10,
+                        help="frames processed first so the grid is already found")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--cell-size", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--wrap", action="store_true", help="run with use_wrap=1")
+    parser.add_argument("--track", action="store_true", help="run with track_grid=1")
+    parser.add_argument("--roi", action="store_true", help="run with roi_tracking=1")
+    parser.add_argument("--roi-padding", type=int, default=100)
+    parser.add_argument("--no-render", action="store_true",
+                        help="detection only, no overlay drawing (render=0)")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="draw overlays on every Nth frame only")
+    args = parser.parse_args()
+
+    detector_cls = importlib.import_module(args.module).ArucoGridDetector
+
+    print(f"{'source':<14} {'frames':>6} {'fps':>7} "
+          + " ".join(f"{s[:10]:>10}" for s in PROCESS_STAGES) + "   (ms/frame)")
+    if args.video:
+        run(detector_cls, VideoFileSource(args.video, loop=True), "video",
+            args.frames, args.warmup, args)
+    elif args.frames_dir:
+        run(detector_cls, ImageDirectorySource(args.frames_dir, loop=True), "images",
+            args.frames, args.warmup, args)
+    else:
+        for w, h in RESOLUTIONS:
+            source = SyntheticArenaSource(rows=args.rows, cols=args.cols, width=w, height=h,
+                                          seed=args.seed)
+            cell_frames = run(detector_cls, source, f"synth {w}x{h}", args.frames, args.warmup, args)
+            # The timings only mean something if the whole pipeline ran, i.e.
+            # the full grid was found and the robot resolved to a cell
+            assert cell_frames > 0, f"robot cell never resolved at {w}x{h}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Frame sources for ArucoGridDetector. Every source has the same two methods
+as cv2.VideoCapture, so the detector can use any of them as self.cap:
+
+    ret, frame = source.read()
+    source.release()
+"""
+import glob
+import os
+
+import cv2
+import numpy as np
+import cv2.aruco as aruco
+
+
+class LiveCameraSource:
+    """Webcam, same as the detector's old hard-wired cv2.VideoCapture."""
+
+    def __init__(self, camera_index=2, width=None, height=None):
+        self.cap = cv2.VideoCapture(camera_index)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Recorded video. With loop=True it rewinds at the end instead of failing."""
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            print(f"Could not open video file {path}")
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource:
+    """Images in a directory, read in sorted filename order."""
+
+    PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+    def __init__(self, directory, loop=False):
+        self.loop = loop
+        self.paths = []
+        for pattern in self.PATTERNS:
+            self.paths.extend(glob.glob(os.path.join(directory, pattern)))
+        self.paths.sort()
+        self.index = 0
+        if not self.paths:
+            print(f"No images found in {directory}")
+
+    def read(self):
+        if self.index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+
+FLOOR_COLOR = (190, 190, 190)
+# Widest a cell gets in the rendered frame. GridDetectionFinal2's pixel
+# parameters (cluster_dist=50, the Hough thresholds) are tuned for cells about
+# this size; with bigger cells the marker edges turn into extra grid lines.
+MAX_CELL_PX = 120
+
+
+def _marker_image(marker_id, size, dictionary):
+    if hasattr(aruco, "generateImageMarker"):
+        return aruco.generateImageMarker(dictionary, marker_id, size)
+    return aruco.drawMarker(dictionary, marker_id, size)
+
+
+class SyntheticArenaSource:
+    """
+    Renders a rows x cols arena (floor, grid lines, ArUco markers) seen through
+    a slight perspective tilt. The robot marker drives around the border cells
+    and the other markers stay put. Everything comes from a seeded RNG, so the
+    same arguments give the same frame sequence on every run.
+    """
+
+    def __init__(self, rows=6, cols=8, width=1280, height=720, robot_id=42,
+                 n_obstacles=3, n_frames=None, seed=0, noise=4.0,
+                 aruco_dictionary=aruco.DICT_6X6_250):
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.height = height
+        self.robot_id = robot_id
+        self.n_frames = n_frames
+        self.noise = noise
+        self.frame_index = 0
+        self.rng = np.random.default_rng(seed)
+        self.dictionary = aruco.getPredefinedDictionary(aruco_dictionary)
+
+        # Arena laid out flat, then tilted into the image
+        self.cell_px = int(min(width * 0.8 / cols, height * 0.8 / rows))
+        arena_w = self.cell_px * cols
+        arena_h = self.cell_px * rows
+        self.flat_size = (arena_w + 2 * self.cell_px, arena_h + 2 * self.cell_px)
+        self.origin = self.cell_px  # border around the grid in the flat image
+
+        flat_corners = np.float32([
+            [0, 0], [self.flat_size[0], 0],
+            [0, self.flat_size[1]], [self.flat_size[0], self.flat_size[1]]
+        ])
+        # The arena spans 90% of the frame, unless a cell would get wider than
+        # MAX_CELL_PX on screen; then it is shrunk about the centre and a larger
+        # frame shows more floor around the same arena
+        span = 0.9 * min(1.0, MAX_CELL_PX * (cols + 2) / (0.9 * width),
+                         MAX_CELL_PX * (rows + 2) / (0.9 * height))
+        # rough side of a cell in the rendered frame, before tilt and jitter
+        self.screen_cell_px = span * min(width / (cols + 2), height / (rows + 2))
+        jitter = self.rng.uniform(-0.04, 0.04, (4, 2)) * [width, height] * span / 0.9
+        half_w, half_h = span * width / 2, span * height / 2
+        img_corners = np.float32([
+            [width / 2 - half_w, height / 2 - half_h], [width / 2 + half_w, height / 2 - half_h],
+            [width / 2 - half_w, height / 2 + half_h], [width / 2 + half_w, height / 2 + half_h]
+        ]) + jitter
+        self.H = cv2.getPerspectiveTransform(flat_corners, np.float32(img_corners))
+
+        self.background = self._draw_floor()
+
+        all_cells = [(r, c) for r in range(rows) for c in range(cols)]
+        picks = self.rng.choice(len(all_cells), size=min(n_obstacles, len(all_cells)), replace=False)
+        obstacle_ids = [k for k in range(1, 250) if k != robot_id]
+        self.obstacles = [(obstacle_ids[i], all_cells[int(p)]) for i, p in enumerate(picks)]
+        self.robot_route = self._border_route()
+
+    def _cell_center(self, r, c):
+        x = self.origin + (c + 0.5) * self.cell_px
+        y = self.origin + (r + 0.5) * self.cell_px
+        return x, y
+
+    def _draw_floor(self):
+        w, h = self.flat_size
+        floor = np.full((h, w, 3), FLOOR_COLOR[0], dtype=np.uint8)
+        thickness = max(2, self.cell_px // 30)
+        for c in range(self.cols + 1):
+            x = self.origin + c * self.cell_px
+            cv2.line(floor, (x, self.origin), (x, self.origin + self.rows * self.cell_px),
+                     (20, 20, 20), thickness)
+        for r in range(self.rows + 1):
+            y = self.origin + r * self.cell_px
+            cv2.line(floor, (self.origin, y), (self.origin + self.cols * self.cell_px, y),
+                     (20, 20, 20), thickness)
+        return floor
+
+    def _border_route(self):
+        route = [(0, c) for c in range(self.cols)]
+        route += [(r, self.cols - 1) for r in range(1, self.rows)]
+        route += [(self.rows - 1, c) for c in range(self.cols - 2, -1, -1)]
+        route += [(r, 0) for r in range(self.rows - 2, 0, -1)]
+        return route
+
+    def _paste_marker(self, img, marker_id, center, angle_deg):
+        size = int(self.cell_px * 0.5)
+        marker = _marker_image(marker_id, size, self.dictionary)
+        # white quiet zone so the marker border is detectable
+        pad = size // 4
+        tile = cv2.copyMakeBorder(marker, pad, pad, pad, pad, cv2.BORDER_CONSTANT, value=255)
+        tile = cv2.cvtColor(tile, cv2.COLOR_GRAY2BGR)
+        t = tile.shape[0]
+        M = cv2.getRotationMatrix2D((t / 2, t / 2), -angle_deg, 1.0)
+        M[:, 2] += np.array(center) - t / 2
+        mask = np.full((t, t), 255, dtype=np.uint8)
+        h, w = img.shape[:2]
+        warped = cv2.warpAffine(tile, M, (w, h))
+        warped_mask = cv2.warpAffine(mask, M, (w, h))
+        img[warped_mask > 0] = warped[warped_mask > 0]
+
+    def robot_cell(self, frame_index=None):
+        """(row, col) of the robot in the given (default: last) frame."""
+        i = self.frame_index - 1 if frame_index is None else frame_index
+        return self.robot_route[max(i, 0) // 5 % len(self.robot_route)]
+
+    def read(self):
+        if self.n_frames is not None and self.frame_index >= self.n_frames:
+            return False, None
+        flat = self.background.copy()
+        for marker_id, (r, c) in self.obstacles:
+            self._paste_marker(flat, marker_id, self._cell_center(r, c), 0.0)
+
+        # Robot moves one cell every 5 frames and faces along the route
+        i = self.frame_index
+        r, c = self.robot_route[i // 5 % len(self.robot_route)]
+        nr, nc = self.robot_route[(i // 5 + 1) % len(self.robot_route)]
+        angle = np.degrees(np.arctan2(nr - r, nc - c))
+        self._paste_marker(flat, self.robot_id, self._cell_center(r, c), angle)
+
+        frame = cv2.warpPerspective(flat, self.H, (self.width, self.height),
+                                    borderValue=FLOOR_COLOR)
+        if self.noise > 0:
+            noise = self.rng.normal(0, self.noise, frame.shape)
+            frame = np.clip(frame + noise, 0, 255).astype(np.uint8)
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        pass
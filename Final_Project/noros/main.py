@@ -1,6 +1,7 @@
 import uasyncio
 import network
 import time
+import math
 import machine
 
 # ---- Import your custom modules/classes ----
@@ -46,6 +47,12 @@ be_loved_neo = BeLovedNeo(
 # Flag to show if a client is connected
 client_connected = False
 
+# Set by STOP to end the motion that is currently running
+motion_abort = False
+
+# True while command_worker runs a queued command; VEL is ignored then
+motion_busy = False
+
 # --------------------------
 #  BACKGROUND TASKS
 # --------------------------
@@ -82,6 +89,9 @@ STEPS_PER_CELL = 50  # Adjust based on calibration
 
 DUTY_CYCLE = 30000  # 0~65535 => about 45% power. Adjust as needed.
 
+# Define pulses needed per degree of in-place rotation (calibrate this value)
+PULSES_PER_DEGREE = 0.3  # Example value, adjust based on calibration
+
 async def move_forward(n_cells: int):
     """
     Move forward by n_cells using encoder counts.
@@ -102,7 +112,7 @@ async def move_forward(n_cells: int):
         pos1 = enc1.get_position()
         pos2 = enc2.get_position()
 
-        if pos1 >= target_pulses and pos2 >= target_pulses:
+        if (pos1 >= target_pulses and pos2 >= target_pulses) or motion_abort:
             break
 
         await uasyncio.sleep(0.01)  # Check every 10ms
@@ -132,7 +142,7 @@ async def move_backward(n_cells: int):
         pos1 = abs(enc1.get_position())
         pos2 = abs(enc2.get_position())
 
-        if pos1 >= target_pulses and pos2 >= target_pulses:
+        if (pos1 >= target_pulses and pos2 >= target_pulses) or motion_abort:
             break
 
         await uasyncio.sleep(0.01)  # Check every 10ms
@@ -149,8 +159,6 @@ async def turn_degrees(deg: float):
     Negative 'deg' => Left motor backward, Right motor forward.
     """
     print(f"[Pico] Turning {deg} degrees.")
-    # Define pulses needed per degree (calibrate this value)
-    PULSES_PER_DEGREE = 0.3  # Example value, adjust based on calibration
     target_pulses = abs(deg) * PULSES_PER_DEGREE
 
     # Reset encoder positions
@@ -171,7 +179,7 @@ async def turn_degrees(deg: float):
         pos1 = abs(enc1.get_position())
         pos2 = abs(enc2.get_position())
 
-        if pos1 >= target_pulses and pos2 >= target_pulses:
+        if (pos1 >= target_pulses and pos2 >= target_pulses) or motion_abort:
             break
 
         await uasyncio.sleep(0.01)  # Check every 10ms
@@ -181,6 +189,52 @@ async def turn_degrees(deg: float):
     two_wheel.motor2_write(0, True)
     print("[Pico] Turn complete.")
 
+async def drive_pulses(target1, target2):
+    """
+    Runs motor1 and motor2 until each has turned target1 / target2 encoder
+    pulses (the sign gives the direction). The shorter distance gets
+    proportionally less duty so both wheels finish together.
+    """
+    enc1.reset_position()
+    enc2.reset_position()
+    longest = max(abs(target1), abs(target2), 1)
+    two_wheel.motor1_write(int(DUTY_CYCLE * abs(target1) / longest), target1 >= 0)
+    two_wheel.motor2_write(int(DUTY_CYCLE * abs(target2) / longest), target2 >= 0)
+
+    done1 = done2 = False
+    while not (done1 and done2) and not motion_abort:
+        if not done1 and abs(enc1.get_position()) >= abs(target1):
+            two_wheel.motor1_write(0, True)
+            done1 = True
+        if not done2 and abs(enc2.get_position()) >= abs(target2):
+            two_wheel.motor2_write(0, True)
+            done2 = True
+        await uasyncio.sleep(0.01)  # Check every 10ms
+
+    two_wheel.motor1_write(0, True)
+    two_wheel.motor2_write(0, True)
+
+async def arc(deg: float):
+    """
+    Drive round a corner without turning on the spot: half a cell straight,
+    a quarter circle of radius half a cell turning by deg (+-90, same sign
+    as TURN), half a cell straight. Ends on the centre of the cell diagonal
+    to the start, like FORWARD 1, TURN deg, FORWARD 1.
+    """
+    if abs(deg) != 90:
+        raise ValueError("BAD_ARC")
+    print(f"[Pico] Arc {deg} degrees.")
+    half_cell = STEPS_PER_CELL / 2
+    # Centre line of the curve, plus/minus what each wheel adds to turn deg
+    curve = half_cell * math.radians(abs(deg))
+    spin = deg * PULSES_PER_DEGREE
+    await drive_pulses(half_cell, half_cell)
+    if not motion_abort:
+        await drive_pulses(curve - spin, curve + spin)
+    if not motion_abort:
+        await drive_pulses(half_cell, half_cell)
+    print("[Pico] Arc complete.")
+
 async def stop_now():
     """
     Immediately stop all robot motion.
@@ -209,22 +263,204 @@ async def dance():
     two_wheel.motor2_write(0, True)
     print("[Pico] Dance complete.")
 
+# --------------------------
+#  VELOCITY MODE (VEL)
+# --------------------------
+# "VEL,<v>,<w>" sets a forward speed in cells/s and a turn rate in deg/s
+# (positive like TURN). The host streams them at camera rate without acks;
+# velocity_task keeps each wheel at its speed with a PI loop on the encoder
+# rate and stops the motors when no VEL came for VEL_TIMEOUT_MS.
+
+MAX_DUTY = 65535
+VEL_PERIOD_MS = 20       # motor update period
+VEL_TIMEOUT_MS = 300     # watchdog: stop when the setpoints stop coming
+VEL_FEEDFORWARD = 300    # duty per pulse/s of wheel speed (calibrate)
+VEL_KP = 150             # duty per pulse/s of speed error
+VEL_KI = 600             # duty per pulse of accumulated error
+VEL_MAX_INTEGRAL = 40    # pulses, anti-windup
+
+vel_active = False
+vel_target = [0.0, 0.0]  # wheel speeds in pulses/s (motor1, motor2)
+vel_deadline = 0
+
+def set_velocity(v, w):
+    """Converts a VEL setpoint to wheel speeds and feeds the watchdog."""
+    global vel_active, vel_deadline
+    # Positive TURN runs motor1 backward and motor2 forward
+    vel_target[0] = v * STEPS_PER_CELL - w * PULSES_PER_DEGREE
+    vel_target[1] = v * STEPS_PER_CELL + w * PULSES_PER_DEGREE
+    vel_deadline = time.ticks_add(time.ticks_ms(), VEL_TIMEOUT_MS)
+    vel_active = True
+
+def stop_velocity():
+    global vel_active
+    if vel_active:
+        vel_active = False
+        two_wheel.motor1_write(0, True)
+        two_wheel.motor2_write(0, True)
+
+async def velocity_task():
+    """
+    Runs for the whole program. Does nothing unless VEL setpoints are
+    arriving; never waits on the network, so a stalled client cannot keep
+    the motors running past the watchdog.
+    """
+    last_pos = [0, 0]
+    integral = [0.0, 0.0]
+    last_ms = time.ticks_ms()
+    was_active = False
+    while True:
+        await uasyncio.sleep_ms(VEL_PERIOD_MS)
+        now = time.ticks_ms()
+        pos = [enc1.get_position(), enc2.get_position()]
+        dt = time.ticks_diff(now, last_ms) / 1000
+        last_ms = now
+
+        if vel_active and time.ticks_diff(now, vel_deadline) > 0:
+            print("[Pico] VEL watchdog: no setpoint, stopping.")
+            stop_velocity()
+        if not vel_active or not was_active or dt <= 0:
+            # Start from the current encoder counts when velocity mode begins
+            was_active = vel_active
+            last_pos = pos
+            integral = [0.0, 0.0]
+            continue
+
+        for i, motor_write in ((0, two_wheel.motor1_write), (1, two_wheel.motor2_write)):
+            rate = (pos[i] - last_pos[i]) / dt
+            error = vel_target[i] - rate
+            integral[i] = max(-VEL_MAX_INTEGRAL, min(VEL_MAX_INTEGRAL, integral[i] + error * dt))
+            duty = VEL_FEEDFORWARD * vel_target[i] + VEL_KP * error + VEL_KI * integral[i]
+            if vel_target[i] == 0 and abs(rate) < 1:
+                duty = 0
+            motor_write(min(int(abs(duty)), MAX_DUTY), duty >= 0)
+        last_pos = pos
+
 # --------------------------
 #  SERVER SETUP & HANDLER
 # --------------------------
+# Protocol (see test/pico_protocol.py on the host side):
+#   "<seq>,<COMMAND>,<params>" is queued and answered with "DONE,<seq>,..."
+#   or "ERROR,<seq>,<reason>" once it has run, so the host can keep several
+#   commands in flight. Lines without a seq are the old stop-and-wait form
+#   and get the old "DONE,<COMMAND>,<param>" reply. "VEL,<v>,<w>" is a
+#   velocity setpoint: never queued or answered (see VELOCITY MODE).
+
+QUEUE_SIZE = 8  # queued commands per client before ERROR,<seq>,QUEUE_FULL
+
+def parse_command(message):
+    """Returns (seq, command, params); seq is None for old-style lines."""
+    tokens = message.split(",")
+    seq = None
+    if tokens[0].isdigit():
+        seq = int(tokens[0])
+        tokens = tokens[1:]
+    command = tokens[0].upper() if tokens else ""
+    return seq, command, tokens[1:]
+
+def format_reply(seq, kind, body):
+    if seq is None:
+        return f"{kind},{body}\n"
+    return f"{kind},{seq},{body}\n"
+
+async def run_command(command, params):
+    """
+    Runs one motion command to completion. Returns the reply body
+    ("FORWARD,2", ...) or raises for unknown or malformed commands.
+    """
+    if command == "FORWARD":
+        n = int(params[0])
+        await move_forward(n)
+        return f"FORWARD,{n}"
+
+    elif command == "BACK":
+        n = int(params[0])
+        await move_backward(n)
+        return f"BACK,{n}"
+
+    elif command == "TURN":
+        deg = float(params[0])
+        await turn_degrees(deg)
+        return f"TURN,{deg}"
+
+    elif command == "ARC":
+        deg = float(params[0])
+        await arc(deg)
+        return f"ARC,{deg}"
+
+    elif command == "CORRECTION":
+        # Small straight nudge from the camera corrections: FORWARD|BACK,<encoder steps>
+        direction = params[0].upper()
+        steps = int(params[1])
+        if direction not in ("FORWARD", "BACK"):
+            raise ValueError("BAD_CORRECTION")
+        print(f"[Pico] Correction {direction} {steps} steps.")
+        target = steps if direction == "FORWARD" else -steps
+        await drive_pulses(target, target)
+        return f"CORRECTION,{direction},{steps}"
+
+    elif command == "STOP":
+        await stop_now()
+        return "STOP,0"
+
+    elif command == "DANCE":
+        await dance()
+        return "DANCE,0"
+
+    raise ValueError("UNKNOWN_COMMAND")
+
+async def send_line(writer, line):
+    writer.write(line.encode())
+    await writer.drain()
+    print(f"[Pico] Sent: {line.strip()}")
+
+async def command_worker(writer, queue, wakeup):
+    """
+    Runs queued commands one after another and streams back an ack for
+    each, while handle_client keeps reading (and queueing) new ones.
+    """
+    global motion_abort, motion_busy
+    while True:
+        if not queue:
+            motion_busy = False
+            wakeup.clear()
+            await wakeup.wait()
+            continue
+        seq, command, params = queue.pop(0)
+        motion_abort = False
+        motion_busy = True
+        stop_velocity()
+        try:
+            body = await run_command(command, params)
+            if motion_abort:
+                # STOP arrived while this one was running
+                await send_line(writer, format_reply(seq, "ERROR", "CANCELLED"))
+            else:
+                await send_line(writer, format_reply(seq, "DONE", body))
+        except Exception as e:
+            print(f"[Pico] Command processing error: {e}")
+            await send_line(writer, format_reply(seq, "ERROR", str(e)))
+
 async def handle_client(reader, writer):
     """
     Handles incoming client connections and commands.
-    We only send back 'DONE' or 'ERROR' after the motion/command is finished.
+    Commands are queued and run by command_worker; each one is answered
+    with 'DONE' or 'ERROR' only after the motion/command is finished.
+    STOP skips the queue and cancels everything still waiting in it.
     """
-    global client_connected
+    global client_connected, motion_abort
     client_connected = True
     client_addr = writer.get_extra_info('peername')
     print(f"[Pico] Client connected from {client_addr}!")
 
+    queue = []
+    wakeup = uasyncio.Event()
+    worker = None
+
     try:
         writer.write(b"Connected to Pico W!\n")
         await writer.drain()
+        worker = uasyncio.create_task(command_worker(writer, queue, wakeup))
 
         while True:
             data = await reader.readline()
@@ -237,49 +473,34 @@ async def handle_client(reader, writer):
                 continue  # Skip empty lines
 
             print(f"[Pico] Received: {message}")
-            tokens = message.split(",")
-            command = tokens[0].upper()
-
-            try:
-                if command == "FORWARD":
-                    n = int(tokens[1])
-                    await move_forward(n)
-                    ack = f"DONE,FORWARD,{n}\n"
-
-                elif command == "BACK":
-                    n = int(tokens[1])
-                    await move_backward(n)
-                    ack = f"DONE,BACK,{n}\n"
-
-                elif command == "TURN":
-                    deg = float(tokens[1])
-                    await turn_degrees(deg)
-                    ack = f"DONE,TURN,{deg}\n"
-
-                elif command == "STOP":
-                    await stop_now()
-                    ack = "DONE,STOP,0\n"
-
-                elif command == "DANCE":
-                    await dance()
-                    ack = "DONE,DANCE,0\n"
-
-                else:
-                    print(f"[Pico] Unknown command: {message}")
-                    ack = "ERROR,UNKNOWN_COMMAND\n"
-
-                # Send acknowledgment after completion
-                if writer is not None:
-                    writer.write(ack.encode())
-                    await writer.drain()
-                    print(f"[Pico] Sent: {ack.strip()}")
-
-            except Exception as e:
-                print(f"[Pico] Command processing error: {e}")
-                error_msg = f"ERROR,{str(e)}\n"
-                if writer is not None:
-                    writer.write(error_msg.encode())
-                    await writer.drain()
+            seq, command, params = parse_command(message)
+
+            if command == "VEL":
+                if motion_busy or queue:
+                    print("[Pico] VEL ignored while queued commands run.")
+                    continue
+                try:
+                    set_velocity(float(params[0]), float(params[1]))
+                except (ValueError, IndexError):
+                    print(f"[Pico] Malformed VEL: {message}")
+            elif command == "STOP":
+                # Drop whatever is still waiting and end the current motion.
+                # The queue is emptied before the first await, so the worker
+                # cannot start a dropped command while the replies go out.
+                dropped = queue[:]
+                del queue[:]
+                motion_abort = True
+                stop_velocity()
+                for dropped_seq, _, _ in dropped:
+                    if dropped_seq is not None:
+                        await send_line(writer, format_reply(dropped_seq, "ERROR", "CANCELLED"))
+                await stop_now()
+                await send_line(writer, format_reply(seq, "DONE", "STOP,0"))
+            elif len(queue) >= QUEUE_SIZE:
+                await send_line(writer, format_reply(seq, "ERROR", "QUEUE_FULL"))
+            else:
+                queue.append((seq, command, params))
+                wakeup.set()
 
     except Exception as e:
         print(f"[Pico] Client connection error: {e}")
@@ -287,6 +508,13 @@ async def handle_client(reader, writer):
     finally:
         print(f"[Pico] Closing connection with {client_addr}...")
         client_connected = False
+        if worker is not None:
+            worker.cancel()
+        motion_abort = True
+        motion_busy = False
+        stop_velocity()
+        two_wheel.motor1_write(0, True)
+        two_wheel.motor2_write(0, True)
         if writer is not None:
             await writer.aclose()
 
@@ -304,6 +532,7 @@ async def start_server():
     # Start background tasks for LED and neopixel
     uasyncio.create_task(blink_onboard_led(wlan))
     uasyncio.create_task(neopixel_connection_task())
+    uasyncio.create_task(velocity_task())
     
     # Wait until connected
     while not wlan.isconnected():
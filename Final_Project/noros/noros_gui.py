@@ -8,6 +8,7 @@ import math
 from GridDetectionFinal2 import ArucoGridDetector  # Robot Position Tracking
 from search_modified import SearchClass               # Pathfinding (A* Search)
 from movement_class import MovementClass           # Movement Control
+from vision_pipeline import VisionPipeline         # Threaded capture/processing
 
 class NorosGUI:
     def __init__(self, root):
@@ -30,6 +31,11 @@ class NorosGUI:
                 robot_id=42, rows=6, cols=8, cell_size=150, camera_index=3
         )
 
+        # Capture + detection run on their own threads; the Tk loop only
+        # picks up finished results so a slow camera read can't stall it.
+        self.pipeline = VisionPipeline(self.detector)
+        self.pipeline.start()
+
         # 2) Initialize search and movement classes
         self.searcher = SearchClass()
         self.mover = MovementClass(pico_ip="192.168.89.106", pico_port=8080)
@@ -134,6 +140,14 @@ class NorosGUI:
         for obstacle in self.obstacles:   
             print(self.converter(obstacle[1]))
 
+        # One DetectionResult snapshot, so label and pose come from the same
+        # processed frame even while the pipeline publishes new ones
+        result = self.detector.get_result()
+        robot_label = result.robot_cell_label if result is not None else None
+        robot_pos = result.robot_position if result is not None else None
+        if robot_pos is None:
+            robot_label = None
+
         cell_index = 1  # For numbering cells from 1..12
         for row in range(self.rows):
             for col in range(self.cols):
@@ -159,13 +173,13 @@ class NorosGUI:
                 #Drawing Grids
                 self.grid_canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
 
-                if self.detector.get_robot_cell_label() != None and self.detector.get_robot_cell_label() % self.cols == 0:
-                    if self.detector.get_robot_cell_label() != None and (row, col) == ((self.detector.get_robot_cell_label() // self.cols)-1, 7):
-                        self.draw_equilateral_triangle(self.grid_canvas, (x1+x2)/2, (y1+y2)/2, self.detector.triangle_side/5, self.detector.get_robot_position()[2])
+                if robot_label != None and robot_label % self.cols == 0:
+                    if (row, col) == ((robot_label // self.cols)-1, 7):
+                        self.draw_equilateral_triangle(self.grid_canvas, (x1+x2)/2, (y1+y2)/2, self.detector.triangle_side/5, robot_pos[2])
 
                 else:
-                    if self.detector.get_robot_cell_label() != None and (row, col) == (self.detector.get_robot_cell_label() // self.cols , (self.detector.get_robot_cell_label() % self.cols)-1):
-                        self.draw_equilateral_triangle(self.grid_canvas, (x1+x2)/2, (y1+y2)/2, self.detector.triangle_side/5, self.detector.get_robot_position()[2])
+                    if robot_label != None and (row, col) == (robot_label // self.cols , (robot_label % self.cols)-1):
+                        self.draw_equilateral_triangle(self.grid_canvas, (x1+x2)/2, (y1+y2)/2, self.detector.triangle_side/5, robot_pos[2])
 
                 # Number the cell in the center
                 cx = x1 + self.cell_size // 2
@@ -282,6 +296,18 @@ class NorosGUI:
         )
         self.detect_button.pack(pady=2)
 
+        self.track_var = tk.IntVar(value=self.detector.track_grid)
+        self.track_button = ttk.Checkbutton(
+            self.control_frame, text="Track Grid", variable=self.track_var, command=self.toggle_tracking
+        )
+        self.track_button.pack(pady=2)
+
+        self.roi_var = tk.IntVar(value=self.detector.roi_tracking)
+        self.roi_button = ttk.Checkbutton(
+            self.control_frame, text="ROI Marker Tracking", variable=self.roi_var, command=self.toggle_roi
+        )
+        self.roi_button.pack(pady=2)
+
         self.intersection_var = tk.IntVar(value=self.detector.show_intersections)
         self.intersection_button = ttk.Checkbutton(
             self.control_frame, text="Show Intersections", variable=self.intersection_var, command=self.toggle_intersections
@@ -322,9 +348,9 @@ class NorosGUI:
         """
         Continuously fetches frames from ArucoGridDetector and updates the feed_label.
         """
-        success = self.detector.update_frame()
-        if success:
-            frame = self.detector.get_frame()
+        result = self.pipeline.get_latest()
+        if result is not None:
+            frame = result.display_frame
             if frame is not None:
                 #frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 #img_pil = Image.fromarray(frame_rgb)
@@ -350,13 +376,14 @@ class NorosGUI:
         """
         Continuously updates the grid
         """
-        if  self.detector.get_robot_cell_label() is None:
+        robot_label = self.detector.get_robot_cell_label()
+        if  robot_label is None:
             self.start_cell = None
         else:
-            if self.detector.get_robot_cell_label() % self.cols == 0:
-                self.start_cell = ((self.detector.get_robot_cell_label() // self.cols)-1, 7)
+            if robot_label % self.cols == 0:
+                self.start_cell = ((robot_label // self.cols)-1, 7)
             else:
-                self.start_cell = (self.detector.get_robot_cell_label() // self.cols, (self.detector.get_robot_cell_label() % self.cols)-1)
+                self.start_cell = (robot_label // self.cols, (robot_label % self.cols)-1)
         
         # Once start & goal are selected, compute path
         if self.start_cell and self.goal_cell:
@@ -384,6 +411,12 @@ class NorosGUI:
     def toggle_detection(self):
         self.detector.set_detect_grid_state(self.detect_var.get())
 
+    def toggle_tracking(self):
+        self.detector.set_track_grid(self.track_var.get())
+
+    def toggle_roi(self):
+        self.detector.set_roi_tracking(self.roi_var.get())
+
     def toggle_intersections(self):
         self.detector.set_show_intersections(self.intersection_var.get())
 
@@ -431,6 +464,7 @@ class NorosGUI:
         """
         Clean up and exit.
         """
+        self.pipeline.stop()
         self.detector.release()
         self.mover.disconnect()
         self.root.destroy()
@@ -444,6 +478,8 @@ class NorosGUI:
         self.threshold_slider.set(self.detector.update_thresh)
         self.triangle_slider.set(self.detector.triangle_side)
         self.detect_var.set(self.detector.detect_grid)
+        self.track_var.set(self.detector.track_grid)
+        self.roi_var.set(self.detector.roi_tracking)
         self.intersection_var.set(self.detector.show_intersections)
         self.wrap_var.set(self.detector.use_wrap)
         self.gridlines_var.set(self.detector.show_lines)
@@ -1,5 +1,18 @@
+import hashlib
+import heapq
+import os
+import time
+from collections import OrderedDict
 from queue import PriorityQueue
 
+import numpy as np
+
+# Headings in the order find_path expands them, and the matching (dr, dc) step
+DIRECTIONS = [0, 90, 180, 270]
+DIRECTION_STEPS = [(0, +1), (+1, 0), (0, -1), (-1, 0)]
+
+SEARCH_BACKENDS = ("dict", "array", "numpy")
+
 class SearchClass:
     """
     A simple A* grid search algorithm implementation that also takes into account:
@@ -14,6 +27,23 @@ class SearchClass:
         3. (Optional) Add obstacles using `add_obstacle(row, col)`.
         4. (Optional) Set speeds, rewards, etc.
         5. Call `find_path(start, goal, initial_direction=0)` to retrieve the path.
+        6. (Optional) Pick the search backend with `set_backend(name)`.
+        7. (Optional) `set_incremental(True)` to keep the search between calls
+           and only repair it when obstacles, rewards or the start change.
+
+    Repeated find_path calls with the same start, goal and heading are served
+    from an LRU cache until the map changes (see `map_version`).
+
+    For many goals from one start, `compute_cost_field(start, direction)`
+    runs Dijkstra once and `field.path_to(goal)` then costs O(path length).
+    Small arenas can precompute every start with `precompute_all_pairs()`.
+
+    Several robots are planned together with `plan_multi(agents)`, which
+    returns collision-free timed paths (see find_conflicts).
+
+    With a deadline, `find_path_anytime(start, goal, direction, budget_ms)`
+    returns the best path found in time plus its suboptimality bound, and
+    continues refining it on the next call.
 
     Attributes:
         rows (int): Number of rows in the grid.
@@ -24,6 +54,21 @@ class SearchClass:
         w_time (float): Weight factor for time cost in the cost function.
         w_reward (float): Weight factor for reward in the cost function.
         cell_rewards (dict): A dictionary mapping (row, col) -> reward value.
+        backend (str): Search backend, one of SEARCH_BACKENDS:
+            "dict"  - the original search: dicts keyed by (row, col, direction)
+                      and a queue.PriorityQueue, prefilled for every state.
+            "array" - (default) states packed into one int, per-state data in
+                      flat lists allocated once per grid size, heapq, and
+                      lazy initialization through generation stamps.
+            "numpy" - same as "array", with the flat storage in NumPy arrays.
+            All three return the same path.
+        incremental (bool): If True, find_path uses D* Lite (see
+            _find_path_incremental) instead of searching from scratch.
+        map_version (int): Bumped by every setter that actually changes
+            obstacles, rewards, speeds, weights or grid size. Cached paths are
+            only reused for the map_version they were computed on, so change
+            the map through the setters, not by editing `obstacles` directly.
+        cache_size (int): Max number of cached paths (0 disables the cache).
     """
 
     def __init__(self):
@@ -45,6 +90,24 @@ class SearchClass:
         # Reward map: cell -> float (positive for reward, negative for penalty)
         self.cell_rewards = {}
 
+        # Search backend and its preallocated per-state storage
+        self.backend = "array"
+        self._state_arrays = None
+
+        # Incremental (D* Lite) planner, kept between find_path calls
+        self.incremental = False
+        self._dstar = None
+
+        # Anytime (ARA*) search, resumed while the query and map stay the same
+        self._anytime = None
+
+        # Path cache: (start, goal, direction, map_version) -> path
+        self.map_version = 0
+        self.cache_size = 128
+        self._path_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     # ---------------------
     # Old Basic Methods
     # ---------------------
@@ -57,8 +120,10 @@ class SearchClass:
             rows (int): Number of rows in the grid.
             cols (int): Number of columns in the grid.
         """
-        self.rows = rows
-        self.cols = cols
+        if (rows, cols) != (self.rows, self.cols):
+            self.rows = rows
+            self.cols = cols
+            self._map_changed()
 
     def add_obstacle(self, row, col):
         """
@@ -69,7 +134,9 @@ class SearchClass:
             col (int): Column index of the obstacle.
         """
         if self._in_bounds((row, col)):
-            self.obstacles.add((row, col))
+            if (row, col) not in self.obstacles:
+                self.obstacles.add((row, col))
+                self._map_changed()
         else:
             print(f"Attempted to add obstacle out of bounds at ({row}, {col})")
 
@@ -81,13 +148,17 @@ class SearchClass:
             row (int): Row index of the obstacle.
             col (int): Column index of the obstacle.
         """
-        self.obstacles.discard((row, col))
+        if (row, col) in self.obstacles:
+            self.obstacles.discard((row, col))
+            self._map_changed()
 
     def clear_obstacles(self):
         """
         Clears all obstacles from the grid.
         """
-        self.obstacles.clear()
+        if self.obstacles:
+            self.obstacles.clear()
+            self._map_changed()
 
     # ---------------------
     # New/Extended Methods
@@ -101,8 +172,10 @@ class SearchClass:
             linear_speed (float): Robot's linear speed (cells per unit time).
             rotation_speed (float): Time cost for a 90-degree rotation.
         """
-        self.linear_speed = linear_speed
-        self.rotation_speed = rotation_speed
+        if (linear_speed, rotation_speed) != (self.linear_speed, self.rotation_speed):
+            self.linear_speed = linear_speed
+            self.rotation_speed = rotation_speed
+            self._map_changed()
 
     def set_weights(self, w_time=1.0, w_reward=1.0):
         """
@@ -112,8 +185,10 @@ class SearchClass:
             w_time (float): Weight for time cost.
             w_reward (float): Weight for reward.
         """
-        self.w_time = w_time
-        self.w_reward = w_reward
+        if (w_time, w_reward) != (self.w_time, self.w_reward):
+            self.w_time = w_time
+            self.w_reward = w_reward
+            self._map_changed()
 
     def set_cell_reward(self, row, col, value):
         """
@@ -125,7 +200,11 @@ class SearchClass:
             value (float): Reward (positive) or penalty (negative) value.
         """
         if self._in_bounds((row, col)):
+            # A missing entry already counts as 0.0 in the cost function
+            changed = self.cell_rewards.get((row, col), 0.0) != value
             self.cell_rewards[(row, col)] = value
+            if changed:
+                self._map_changed()
         else:
             print(f"Attempted to set reward/penalty out of bounds at ({row}, {col})")
 
@@ -133,7 +212,61 @@ class SearchClass:
         """
         Clears all assigned rewards/penalties.
         """
-        self.cell_rewards.clear()
+        if self.cell_rewards:
+            self.cell_rewards.clear()
+            self._map_changed()
+
+    def set_backend(self, backend):
+        """
+        Selects the search backend used by find_path.
+
+        Args:
+            backend (str): One of SEARCH_BACKENDS ("dict", "array", "numpy").
+        """
+        if backend not in SEARCH_BACKENDS:
+            print(f"Unknown search backend '{backend}', keeping '{self.backend}'.")
+            return
+        self.backend = backend
+        self._path_cache.clear()
+
+    def set_incremental(self, enabled):
+        """
+        Turns incremental replanning (D* Lite) on or off.
+
+        Args:
+            enabled (bool): True to keep the search tree between find_path calls.
+        """
+        self.incremental = bool(enabled)
+        if not self.incremental:
+            self._dstar = None
+        # Tied paths may differ between the two modes
+        self._path_cache.clear()
+
+    def set_cache_size(self, size):
+        """
+        Sets how many paths the LRU path cache keeps (0 disables it).
+
+        Args:
+            size (int): Maximum number of cached paths.
+        """
+        self.cache_size = max(0, int(size))
+        while len(self._path_cache) > self.cache_size:
+            self._path_cache.popitem(last=False)
+
+    def get_cache_stats(self):
+        """
+        Returns:
+            dict: hits, misses, hit_rate, entries, cache_size and map_version.
+        """
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "entries": len(self._path_cache),
+            "cache_size": self.cache_size,
+            "map_version": self.map_version,
+        }
 
     # ---------------------
     # Modified A* Search
@@ -156,6 +289,25 @@ class SearchClass:
                   the path from start to goal, including orientation.
                   Returns an empty list if no path is found.
         """
+        if self.cache_size <= 0:
+            return self._find_path_uncached(start, goal, initial_direction)
+
+        key = (tuple(start), tuple(goal), self._normalize_dir(initial_direction), self.map_version)
+        path = self._path_cache.get(key)
+        if path is not None:
+            self._path_cache.move_to_end(key)
+            self.cache_hits += 1
+            return list(path)
+
+        self.cache_misses += 1
+        path = self._find_path_uncached(start, goal, initial_direction)
+        self._path_cache[key] = list(path)
+        if len(self._path_cache) > self.cache_size:
+            self._path_cache.popitem(last=False)
+        return path
+
+    def _find_path_uncached(self, start, goal, initial_direction):
+        """find_path without the cache: bounds/obstacle checks, then the search."""
         if not self._in_bounds(start) or not self._in_bounds(goal):
             print("Start or goal is out of grid bounds.")
             return []
@@ -168,6 +320,57 @@ class SearchClass:
             print("Goal position is blocked by an obstacle.")
             return []
 
+        if self.incremental:
+            return self._find_path_incremental(start, goal, initial_direction)
+        return self._find_path_full(start, goal, initial_direction)
+
+    def _find_path_full(self, start, goal, initial_direction):
+        """A search from scratch with the selected backend."""
+        if self.backend == "dict":
+            return self._find_path_dict(start, goal, initial_direction)
+        return self._find_path_array(start, goal, initial_direction)
+
+    def _find_path_incremental(self, start, goal, initial_direction):
+        """
+        D* Lite over the same (row, col, direction) states. The search runs
+        backwards from the goal cell and is kept between calls; on the next
+        call only the cells whose obstacle/reward changed (compared to the
+        last call) and a moved start are repaired. Dimensions, speeds,
+        weights, a different goal or a reward that lowers the cheapest step
+        cost start a new search.
+
+        D* Lite needs strictly positive step costs, so when a reward is large
+        enough to make a step free or negative this falls back to a full
+        search. The returned path has minimum cost; when several paths tie it
+        can differ from the one the full search picks.
+        """
+        min_step = self._min_step_cost()
+        if min_step <= 0:
+            self._dstar = None
+            return self._find_path_full(start, goal, initial_direction)
+
+        config = (self.rows, self.cols, self.linear_speed, self.rotation_speed,
+                  self.w_time, self.w_reward, tuple(goal))
+        # The heuristic is scaled by the cheapest step when the search was
+        # built; a reward that makes some step cheaper than that would make it
+        # overestimate, so the search starts over (a dearer step only makes it
+        # less informed)
+        if (self._dstar is None or self._dstar.config != config
+                or self._dstar.h_scale > min_step):
+            self._dstar = _DStarLite(self, config, goal, min_step)
+        else:
+            self._dstar.apply_map_changes(self.obstacles, self.cell_rewards)
+
+        start_state = (start[0], start[1], self._normalize_dir(initial_direction))
+        path = self._dstar.plan(start_state)
+        if not path:
+            print("No path found from start to goal.")
+        return path
+
+    def _find_path_dict(self, start, goal, initial_direction):
+        """
+        Original A* over (row, col, direction) tuples, kept as the "dict" backend.
+        """
         # A* using (row, col, direction) as the state
         open_set = PriorityQueue()
         start_state = (start[0], start[1], self._normalize_dir(initial_direction))
@@ -223,10 +426,520 @@ class SearchClass:
         print("No path found from start to goal.")
         return []
 
+    def _find_path_array(self, start, goal, initial_direction):
+        """
+        Same search as _find_path_dict on packed state ids:
+
+            state_id = (row * cols + col) * 4 + direction_index
+
+        g-score, predecessor and "in open set" live in flat storage that is
+        allocated once per grid size. Instead of resetting it on every call,
+        each call gets a new generation number and an entry only counts if its
+        stamp equals the current generation, so setup no longer touches every
+        state. Ties in the heap are broken by state id, which orders states the
+        same way as the (row, col, direction) tuples in the dict backend, so
+        both backends expand states in the same order and return the same path.
+        """
+        arrays = self._get_state_arrays()
+        arrays.generation += 1
+        gen = arrays.generation
+        g_score = arrays.g_score
+        came_from = arrays.came_from
+        stamp = arrays.stamp
+        in_open = arrays.in_open
+
+        rows, cols = self.rows, self.cols
+        goal_r, goal_c = goal
+        blocked = self._blocked_cells()
+
+        # Step costs only depend on (current heading, new heading) and the
+        # reward of the cell entered, so the time part is computed once here
+        base_cost = self._base_step_costs()
+        rewards = self.cell_rewards
+        w_reward = self.w_reward
+
+        start_dir = DIRECTIONS.index(self._normalize_dir(initial_direction))
+        start_id = (start[0] * cols + start[1]) * 4 + start_dir
+        stamp[start_id] = gen
+        g_score[start_id] = 0
+        came_from[start_id] = -1
+        in_open[start_id] = gen
+
+        open_heap = [(0, start_id)]
+        while open_heap:
+            _, current = heapq.heappop(open_heap)
+            in_open[current] = 0
+
+            cell, dir_idx = divmod(current, 4)
+            r, c = divmod(cell, cols)
+            if r == goal_r and c == goal_c:
+                # Reached goal cell (regardless of final orientation).
+                return self._reconstruct_path_array(arrays, current)
+
+            current_g = g_score[current]
+            costs = base_cost[dir_idx]
+            for ndir_idx in range(4):
+                dr, dc = DIRECTION_STEPS[ndir_idx]
+                nr, nc = r + dr, c + dc
+                if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                    continue
+                ncell = nr * cols + nc
+                if blocked[ncell]:
+                    continue
+
+                if rewards:
+                    cost = costs[ndir_idx] - (w_reward * rewards.get((nr, nc), 0.0))
+                else:
+                    cost = costs[ndir_idx]
+                tentative_g_score = current_g + cost
+                nxt = ncell * 4 + ndir_idx
+                if stamp[nxt] != gen or tentative_g_score < g_score[nxt]:
+                    stamp[nxt] = gen
+                    came_from[nxt] = current
+                    g_score[nxt] = tentative_g_score
+                    if in_open[nxt] != gen:
+                        f = tentative_g_score + abs(nr - goal_r) + abs(nc - goal_c)
+                        heapq.heappush(open_heap, (f, nxt))
+                        in_open[nxt] = gen
+
+        print("No path found from start to goal.")
+        return []
+
+    # ---------------------
+    # Anytime Search
+    # ---------------------
+
+    def find_path_anytime(self, start, goal, initial_direction=0, budget_ms=50.0,
+                          epsilon=3.0, epsilon_step=0.5):
+        """
+        ARA*: weighted A* with an inflated heuristic (epsilon) that finds a
+        path quickly, then lowers epsilon and reuses the earlier search effort
+        to improve it, until the path is optimal or the time budget runs out.
+
+        Calling again with the same start, goal and heading (and an unchanged
+        map) continues where the last call stopped, so a caller can start
+        driving on the first path and ask for a better one later.
+
+        Args:
+            start (tuple): Starting cell as (row, col).
+            goal (tuple): Goal cell as (row, col).
+            initial_direction (int): Initial heading in degrees.
+            budget_ms (float): Time budget for this call in milliseconds.
+            epsilon (float): Initial heuristic inflation (>= 1).
+            epsilon_step (float): How much epsilon drops per improvement round.
+
+        Returns:
+            tuple: (path, bound). path is a list of (row, col, direction) like
+                   find_path returns ([] if none was found in time); its cost
+                   is at most `bound` times the optimal cost (1.0 = optimal,
+                   inf = no path yet). When a reward makes a step cost
+                   negative no bound can be given: this falls back to
+                   find_path and returns bound None.
+        """
+        if not self._in_bounds(start) or not self._in_bounds(goal):
+            print("Start or goal is out of grid bounds.")
+            return [], float('inf')
+        if start in self.obstacles:
+            print("Start position is blocked by an obstacle.")
+            return [], float('inf')
+        if goal in self.obstacles:
+            print("Goal position is blocked by an obstacle.")
+            return [], float('inf')
+
+        if self._min_step_cost() <= 0:
+            return self._find_path_full(start, goal, initial_direction), None
+
+        key = (tuple(start), tuple(goal), self._normalize_dir(initial_direction), self.map_version)
+        search = self._anytime
+        if search is None or search.key != key:
+            search = _AnytimeSearch(self, key, max(1.0, epsilon), epsilon_step)
+            self._anytime = search
+        path, bound = search.run(budget_ms / 1000.0)
+        if not path and search.exhausted():
+            print("No path found from start to goal.")
+        return path, bound
+
+    # ---------------------
+    # Cost Fields
+    # ---------------------
+
+    def compute_cost_field(self, start, initial_direction=0):
+        """
+        Runs Dijkstra once from `start` over every (row, col, direction) state,
+        with the same cost model as find_path.
+
+        Args:
+            start (tuple): Starting cell as (row, col).
+            initial_direction (int): Initial heading in degrees.
+
+        Returns:
+            CostField: use `cost_to(goal)` / `path_to(goal)` for any goal,
+                       or None if the start is invalid or some step cost is
+                       negative (rewards larger than the move cost), which
+                       Dijkstra cannot handle.
+        """
+        if not self._in_bounds(start):
+            print("Start is out of grid bounds.")
+            return None
+        if start in self.obstacles:
+            print("Start position is blocked by an obstacle.")
+            return None
+        if self._min_step_cost() < 0:
+            print("Cost field needs non-negative step costs; a reward is larger than the move cost.")
+            return None
+
+        start_dir = DIRECTIONS.index(self._normalize_dir(initial_direction))
+        start_id = (start[0] * self.cols + start[1]) * 4 + start_dir
+        dist, parent = self._dijkstra(start_id, self._base_step_costs(), self._blocked_cells())
+        return CostField(self.rows, self.cols, start_id, dist, parent, self.map_version)
+
+    def precompute_all_pairs(self, cache_file=None, max_cells=400):
+        """
+        Cost fields from every (cell, direction) start, for small arenas.
+        With `cache_file` the tables are loaded from / saved to an .npz file;
+        a saved table is only used if it was built for the same grid size,
+        obstacles, rewards, speeds and weights.
+
+        Args:
+            cache_file (str): Optional .npz path to persist the tables.
+            max_cells (int): Refuse grids with more cells than this (the
+                             tables grow with the square of the state count).
+
+        Returns:
+            AllPairsTable, or None if the grid is too large or a step cost
+            is negative.
+        """
+        if self.rows * self.cols > max_cells:
+            print(f"Grid has {self.rows * self.cols} cells, all-pairs tables are limited to {max_cells}.")
+            return None
+        if self._min_step_cost() < 0:
+            print("All-pairs tables need non-negative step costs; a reward is larger than the move cost.")
+            return None
+
+        signature = self._map_signature()
+        if cache_file and os.path.exists(cache_file):
+            table = AllPairsTable.load(cache_file)
+            if table is not None and table.signature == signature:
+                table.map_version = self.map_version
+                return table
+            print(f"Ignoring {cache_file}: it was computed for a different map.")
+
+        n_states = self.rows * self.cols * 4
+        base_cost = self._base_step_costs()
+        blocked = self._blocked_cells()
+        dist = np.full((n_states, n_states), np.inf)
+        parent = np.full((n_states, n_states), -1, dtype=np.int32)
+        for start_id in range(n_states):
+            if blocked[start_id // 4]:
+                continue
+            d, p = self._dijkstra(start_id, base_cost, blocked)
+            dist[start_id] = d
+            parent[start_id] = p
+
+        table = AllPairsTable(self.rows, self.cols, dist, parent, signature, self.map_version)
+        if cache_file:
+            table.save(cache_file)
+        return table
+
+    def _dijkstra(self, start_id, base_cost, blocked):
+        """
+        Single-source Dijkstra over packed state ids.
+
+        Returns:
+            (dist, parent): flat lists indexed by state id; dist is inf and
+                            parent -1 for unreachable states.
+        """
+        rows, cols = self.rows, self.cols
+        rewards = self.cell_rewards
+        w_reward = self.w_reward
+        n_states = rows * cols * 4
+        dist = [float('inf')] * n_states
+        parent = [-1] * n_states
+        done = bytearray(n_states)
+
+        dist[start_id] = 0.0
+        heap = [(0.0, start_id)]
+        while heap:
+            d, current = heapq.heappop(heap)
+            if done[current]:
+                continue
+            done[current] = 1
+            cell, dir_idx = divmod(current, 4)
+            r, c = divmod(cell, cols)
+            costs = base_cost[dir_idx]
+            for ndir_idx in range(4):
+                dr, dc = DIRECTION_STEPS[ndir_idx]
+                nr, nc = r + dr, c + dc
+                if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                    continue
+                ncell = nr * cols + nc
+                if blocked[ncell]:
+                    continue
+                if rewards:
+                    cost = costs[ndir_idx] - (w_reward * rewards.get((nr, nc), 0.0))
+                else:
+                    cost = costs[ndir_idx]
+                nxt = ncell * 4 + ndir_idx
+                nd = d + cost
+                if nd < dist[nxt]:
+                    dist[nxt] = nd
+                    parent[nxt] = current
+                    heapq.heappush(heap, (nd, nxt))
+        return dist, parent
+
+    def _map_signature(self):
+        """Hash of everything the step costs depend on, to validate saved tables."""
+        desc = repr((self.rows, self.cols, self.linear_speed, self.rotation_speed,
+                     self.w_time, self.w_reward, sorted(self.obstacles),
+                     sorted(self.cell_rewards.items())))
+        return hashlib.sha1(desc.encode()).hexdigest()
+
+    # ---------------------
+    # Multi-Robot Planning
+    # ---------------------
+
+    def plan_multi(self, agents, horizon=None):
+        """
+        Cooperative A*: plans the robots one after another in space-time, each
+        avoiding the cells and moves reserved by the robots planned before it.
+        A robot that reached its goal stays there, so its goal cell is
+        reserved from then on.
+
+        One path entry is one time step: either a move to a neighbouring cell
+        (turning included, same cost as in find_path) or waiting in place
+        (costs one move's worth of time). Two robots never share a cell at
+        the same step and never swap cells in one step.
+
+        Robots are planned in the order given. If some cannot be planned, they
+        are moved to the front and everything is planned again; robots that
+        still fail are treated as parked on their start cell for good and the
+        others are planned around them.
+
+        Args:
+            agents (dict): robot_id -> (start, goal, initial_direction), in
+                           priority order. start/goal are (row, col).
+            horizon (int): Max number of steps per path. Defaults to
+                           rows * cols plus the longest path planned so far.
+
+        Returns:
+            dict: robot_id -> list of (row, col, direction), one per time step.
+                  An empty list means no path was found; that robot stays on
+                  its start cell.
+        """
+        if self._min_step_cost() <= 0:
+            print("Multi-robot planning needs positive step costs; a reward is too large.")
+            return {rid: [] for rid in agents}
+
+        order = list(agents)
+        stuck = set()
+        paths, failed = self._plan_prioritized(agents, order, stuck, horizon)
+        if failed:
+            order = failed + [rid for rid in order if rid not in failed]
+            paths, failed = self._plan_prioritized(agents, order, stuck, horizon)
+        while failed:
+            stuck.update(failed)
+            paths, failed = self._plan_prioritized(agents, order, stuck, horizon)
+
+        for rid in stuck:
+            print(f"Robot {rid}: no collision-free path found, it stays where it is.")
+        return {rid: paths[rid] for rid in agents}
+
+    def _plan_prioritized(self, agents, order, stuck, horizon):
+        """One planning pass in the given order; returns (paths, failed robot ids)."""
+        table = ReservationTable(self.cols)
+        # Nobody may drive into a robot that has not started moving yet,
+        # or into one that cannot move at all
+        for rid, (start, goal, _) in agents.items():
+            if self._in_bounds(start):
+                cell = start[0] * self.cols + start[1]
+                table.reserve(cell, 0, rid)
+                if rid in stuck:
+                    table.park(cell, 0, rid)
+
+        paths = {rid: [] for rid in agents}
+        failed = []
+        for rid in order:
+            if rid in stuck:
+                continue
+            start, goal, initial_direction = agents[rid]
+            start, goal = tuple(start), tuple(goal)
+            if not self._in_bounds(start) or not self._in_bounds(goal):
+                print(f"Robot {rid}: start or goal is out of grid bounds.")
+                continue
+            if start in self.obstacles or goal in self.obstacles:
+                print(f"Robot {rid}: start or goal is blocked by an obstacle.")
+                continue
+            limit = horizon if horizon is not None else self.rows * self.cols + table.max_time
+            path = self._plan_space_time(rid, start, goal, initial_direction, table, limit)
+            if path:
+                table.add_path(path, rid)
+                paths[rid] = path
+            else:
+                failed.append(rid)
+        return paths, failed
+
+    def _plan_space_time(self, rid, start, goal, initial_direction, table, horizon):
+        """
+        A* over (cell, heading, time) for one robot against the reservation
+        table. The heuristic is the obstacle-aware BFS distance to the goal
+        times the cheapest step cost. After the last reserved step the table
+        no longer changes, so later times are merged into one (that keeps an
+        impossible query from searching all the way to the horizon).
+        """
+        rows, cols = self.rows, self.cols
+        blocked = self._blocked_cells()
+        goal_id = goal[0] * cols + goal[1]
+        parked = table.parked.get(goal_id)
+        if parked is not None and parked[1] != rid:
+            return []
+        dist = self._cell_distances(goal_id, blocked)
+        start_cell = start[0] * cols + start[1]
+        if dist[start_cell] < 0:
+            return []
+
+        base_cost = self._base_step_costs()
+        rewards = self.cell_rewards
+        w_reward = self.w_reward
+        min_step = self._min_step_cost()
+        wait_cost = self.w_time * (1.0 / self.linear_speed)
+        static_after = table.max_time + 1
+
+        start_dir = DIRECTIONS.index(self._normalize_dir(initial_direction))
+        start_state = (start_cell, start_dir, 0)
+        g_score = {start_state: 0.0}
+        came_from = {}
+        open_heap = [(dist[start_cell] * min_step, 0, start_state)]
+        closed = set()
+        while open_heap:
+            _, _, state = heapq.heappop(open_heap)
+            cell, dir_idx, t = state
+            key = (cell, dir_idx, min(t, static_after))
+            if key in closed:
+                continue
+            closed.add(key)
+            if cell == goal_id and table.can_stay(cell, t, rid):
+                path = []
+                while state is not None:
+                    c, d, _ = state
+                    path.append((c // cols, c % cols, DIRECTIONS[d]))
+                    state = came_from.get(state)
+                path.reverse()
+                return path
+            if t >= horizon:
+                continue
+
+            r, c = divmod(cell, cols)
+            g = g_score[state]
+            nt = t + 1
+            moves = [(cell, dir_idx, wait_cost)]   # waiting in place
+            for ndir_idx in range(4):
+                dr, dc = DIRECTION_STEPS[ndir_idx]
+                nr, nc = r + dr, c + dc
+                if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                    continue
+                ncell = nr * cols + nc
+                if blocked[ncell]:
+                    continue
+                cost = base_cost[dir_idx][ndir_idx]
+                if rewards:
+                    cost -= w_reward * rewards.get((nr, nc), 0.0)
+                moves.append((ncell, ndir_idx, cost))
+
+            for ncell, ndir_idx, cost in moves:
+                if not table.is_free(ncell, nt, rid) or not table.move_is_free(cell, ncell, nt, rid):
+                    continue
+                if (ncell, ndir_idx, min(nt, static_after)) in closed:
+                    continue
+                nxt = (ncell, ndir_idx, nt)
+                tentative = g + cost
+                if tentative < g_score.get(nxt, float('inf')):
+                    g_score[nxt] = tentative
+                    came_from[nxt] = state
+                    # Ties: prefer later (deeper) states, they are closer to done
+                    heapq.heappush(open_heap, (tentative + dist[ncell] * min_step, -nt, nxt))
+        return []
+
+    def _cell_distances(self, goal_cell, blocked):
+        """BFS step count from every cell to goal_cell around obstacles (-1 = unreachable)."""
+        rows, cols = self.rows, self.cols
+        dist = [-1] * (rows * cols)
+        dist[goal_cell] = 0
+        frontier = [goal_cell]
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                r, c = divmod(cell, cols)
+                for dr, dc in DIRECTION_STEPS:
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < rows and 0 <= nc < cols:
+                        ncell = nr * cols + nc
+                        if dist[ncell] < 0 and not blocked[ncell]:
+                            dist[ncell] = dist[cell] + 1
+                            next_frontier.append(ncell)
+            frontier = next_frontier
+        return dist
+
     # ---------------------
     # Internal Helpers
     # ---------------------
 
+    def _map_changed(self):
+        """Called by the setters whenever the map actually changes."""
+        self.map_version += 1
+        # Entries for older versions can never hit again
+        self._path_cache.clear()
+
+    def _base_step_costs(self):
+        """
+        4x4 table (current heading index, new heading index) of the weighted
+        time cost of one step, i.e. the part of the step cost without rewards.
+        """
+        move_cost = 1.0 / self.linear_speed
+        return [[self.w_time * (self._rotation_cost(d, nd) + move_cost)
+                 for nd in DIRECTIONS] for d in DIRECTIONS]
+
+    def _min_step_cost(self):
+        """
+        Lowest cost any single step can have with the current speeds, weights
+        and rewards (no rotation, entering the most rewarding cell).
+        """
+        move_cost = self.w_time * (1.0 / self.linear_speed)
+        best_bonus = min([0.0] + [-self.w_reward * v for v in self.cell_rewards.values()])
+        return move_cost + best_bonus
+
+    def _get_state_arrays(self):
+        """
+        Per-state storage for the array backends, reallocated only when the
+        grid size or the backend changes.
+        """
+        n_states = self.rows * self.cols * 4
+        arrays = self._state_arrays
+        if arrays is None or arrays.n_states != n_states or arrays.backend != self.backend:
+            arrays = _StateArrays(n_states, self.backend)
+            self._state_arrays = arrays
+        return arrays
+
+    def _blocked_cells(self):
+        """Flat bytearray, 1 for every obstacle cell (indexed row * cols + col)."""
+        blocked = bytearray(self.rows * self.cols)
+        for (r, c) in self.obstacles:
+            if self._in_bounds((r, c)):
+                blocked[r * self.cols + c] = 1
+        return blocked
+
+    def _reconstruct_path_array(self, arrays, current):
+        """
+        Path from the start to state id `current`, as (row, col, direction) tuples.
+        """
+        cols = self.cols
+        path = []
+        while current != -1:
+            cell, dir_idx = divmod(current, 4)
+            path.append((cell // cols, cell % cols, DIRECTIONS[dir_idx]))
+            current = arrays.came_from[current]
+        path.reverse()
+        return path
+
     def _heuristic(self, a, b):
         """
         Heuristic function for A* (Manhattan distance ignoring orientation).
@@ -340,3 +1053,612 @@ class SearchClass:
         path.reverse()
         return path
 
+
+
+class _StateArrays:
+    """
+    Flat per-state storage for the array backends, indexed by packed state id.
+    An entry is only valid when stamp[id] == generation; in_open[id] holds
+    the generation in which the state was last pushed and not yet popped.
+    """
+
+    def __init__(self, n_states, backend):
+        self.n_states = n_states
+        self.backend = backend
+        self.generation = 0
+        if backend == "numpy":
+            self.g_score = np.full(n_states, np.inf)
+            self.came_from = np.full(n_states, -1, dtype=np.int64)
+            self.stamp = np.zeros(n_states, dtype=np.int64)
+            self.in_open = np.zeros(n_states, dtype=np.int64)
+        else:
+            # Scalar indexing of a list is several times faster than of a
+            # NumPy array, and the search touches one state at a time
+            self.g_score = [float('inf')] * n_states
+            self.came_from = [-1] * n_states
+            self.stamp = [0] * n_states
+            self.in_open = [0] * n_states
+
+
+class _DStarLite:
+    """
+    D* Lite (Koenig & Likhachev) state for SearchClass._find_path_incremental.
+
+    States are packed ids like in the array backend. g/rhs are dicts, since
+    an incremental search usually touches only part of the grid. Every
+    heading in the goal cell is a goal state (rhs = 0). The heuristic is the
+    Manhattan distance from the start cell times the cheapest possible step,
+    so it stays consistent for any speeds/weights.
+    """
+
+    def __init__(self, searcher, config, goal, min_step):
+        self.config = config
+        self.rows = searcher.rows
+        self.cols = searcher.cols
+        self.goal = tuple(goal)
+        self.w_reward = searcher.w_reward
+        self.h_scale = min_step
+        self.base_cost = searcher._base_step_costs()
+        # Map as seen by the current search tree
+        self.obstacles = set(searcher.obstacles)
+        self.rewards = dict(searcher.cell_rewards)
+
+        self.g = {}
+        self.rhs = {}
+        self.open_heap = []
+        self.open_keys = {}      # state -> key it is queued with (lazy deletion)
+        self.km = 0.0
+        self.last_start = None
+        self.expansions = 0      # states expanded, summed over all calls
+
+        goal_cell = self.goal[0] * self.cols + self.goal[1]
+        self.goal_ids = {goal_cell * 4 + k for k in range(4)}
+        self._start_cell = None
+
+    # ---- costs / graph ----
+    def _enter_cost(self, r, c, dir_idx, ndir_idx):
+        """Cost of stepping into (r, c) with heading ndir_idx, coming from heading dir_idx."""
+        if (r, c) in self.obstacles:
+            return float('inf')
+        return self.base_cost[dir_idx][ndir_idx] - self.w_reward * self.rewards.get((r, c), 0.0)
+
+    def _successors(self, state):
+        cell, dir_idx = divmod(state, 4)
+        r, c = divmod(cell, self.cols)
+        for ndir_idx in range(4):
+            dr, dc = DIRECTION_STEPS[ndir_idx]
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                yield (nr * self.cols + nc) * 4 + ndir_idx, self._enter_cost(nr, nc, dir_idx, ndir_idx)
+
+    def _predecessors(self, state):
+        """States with an edge into `state`: the cell behind it, any heading."""
+        cell, ndir_idx = divmod(state, 4)
+        r, c = divmod(cell, self.cols)
+        dr, dc = DIRECTION_STEPS[ndir_idx]
+        pr, pc = r - dr, c - dc
+        if 0 <= pr < self.rows and 0 <= pc < self.cols:
+            pcell = pr * self.cols + pc
+            for dir_idx in range(4):
+                yield pcell * 4 + dir_idx
+
+    # ---- D* Lite core ----
+    def _h(self, state):
+        cell = state // 4
+        r, c = divmod(cell, self.cols)
+        sr, sc = self._start_cell
+        return self.h_scale * (abs(r - sr) + abs(c - sc))
+
+    def _key(self, state):
+        m = min(self.g.get(state, float('inf')), self.rhs.get(state, float('inf')))
+        return (m + self._h(state) + self.km, m)
+
+    def _push(self, state):
+        key = self._key(state)
+        self.open_keys[state] = key
+        heapq.heappush(self.open_heap, (key, state))
+
+    def _top_key(self):
+        while self.open_heap:
+            key, state = self.open_heap[0]
+            if self.open_keys.get(state) == key:
+                return key
+            heapq.heappop(self.open_heap)   # stale entry
+        return (float('inf'), float('inf'))
+
+    def _update_vertex(self, state):
+        """Queues `state` if it is inconsistent (g != rhs), unqueues it otherwise."""
+        inf = float('inf')
+        self.open_keys.pop(state, None)
+        if self.g.get(state, inf) != self.rhs.get(state, inf):
+            self._push(state)
+
+    def _best_rhs(self, state):
+        """min over successors of edge cost + g."""
+        inf = float('inf')
+        best = inf
+        for nxt, cost in self._successors(state):
+            total = cost + self.g.get(nxt, inf)
+            if total < best:
+                best = total
+        return best
+
+    def _edge_cost(self, pred, state):
+        pdir = pred % 4
+        cell, ndir_idx = divmod(state, 4)
+        r, c = divmod(cell, self.cols)
+        return self._enter_cost(r, c, pdir, ndir_idx)
+
+    def _compute_shortest_path(self, start_id):
+        # "Optimized" D* Lite: when g(u) drops, predecessors only take a min;
+        # when it rises, only predecessors whose rhs came through u recompute.
+        inf = float('inf')
+        g, rhs = self.g, self.rhs
+        while (self._top_key() < self._key(start_id)
+               or rhs.get(start_id, inf) != g.get(start_id, inf)):
+            k_old = self._top_key()
+            if k_old[0] == inf:
+                break   # queue empty: start is unreachable
+            _, u = heapq.heappop(self.open_heap)
+            del self.open_keys[u]
+            self.expansions += 1
+            k_new = self._key(u)
+            g_u = g.get(u, inf)
+            if k_old < k_new:
+                self._push(u)
+            elif g_u > rhs.get(u, inf):
+                g_u = g[u] = rhs[u]
+                for p in self._predecessors(u):
+                    if p not in self.goal_ids:
+                        total = self._edge_cost(p, u) + g_u
+                        if total < rhs.get(p, inf):
+                            rhs[p] = total
+                    self._update_vertex(p)
+            else:
+                g[u] = inf
+                for p in self._predecessors(u):
+                    if p not in self.goal_ids and rhs.get(p, inf) == self._edge_cost(p, u) + g_u:
+                        rhs[p] = self._best_rhs(p)
+                    self._update_vertex(p)
+                if u not in self.goal_ids:
+                    rhs[u] = self._best_rhs(u)
+                self._update_vertex(u)
+
+    # ---- public ----
+    def apply_map_changes(self, obstacles, rewards):
+        """Repairs the search for every cell whose obstacle/reward changed."""
+        changed = set(obstacles ^ self.obstacles)
+        for cell in set(rewards) | set(self.rewards):
+            if rewards.get(cell, 0.0) != self.rewards.get(cell, 0.0):
+                changed.add(cell)
+        changed = [(r, c) for (r, c) in changed if 0 <= r < self.rows and 0 <= c < self.cols]
+        if not changed:
+            return
+
+        # Only edges entering a changed cell change cost; note their old cost
+        edges = []
+        for (r, c) in changed:
+            for ndir_idx in range(4):
+                state = (r * self.cols + c) * 4 + ndir_idx
+                for p in self._predecessors(state):
+                    edges.append((p, state, self._edge_cost(p, state)))
+        self.obstacles = set(obstacles)
+        self.rewards = dict(rewards)
+
+        inf = float('inf')
+        for p, state, old_cost in edges:
+            if p in self.goal_ids:
+                continue
+            new_cost = self._edge_cost(p, state)
+            g_state = self.g.get(state, inf)
+            if new_cost < old_cost:
+                total = new_cost + g_state
+                if total < self.rhs.get(p, inf):
+                    self.rhs[p] = total
+            elif self.rhs.get(p, inf) == old_cost + g_state:
+                self.rhs[p] = self._best_rhs(p)
+            self._update_vertex(p)
+
+    def plan(self, start_state):
+        """(row, col, direction) path from start_state to the goal cell, or []."""
+        start_cell = (start_state[0], start_state[1])
+        start_id = (start_cell[0] * self.cols + start_cell[1]) * 4 \
+            + DIRECTIONS.index(start_state[2])
+
+        if self._start_cell is None:
+            self._start_cell = start_cell
+            for gid in self.goal_ids:
+                self.rhs[gid] = 0.0
+                self._push(gid)
+        elif start_cell != self._start_cell:
+            # Start moved: keys already queued stay valid lower bounds via km
+            self.km += self.h_scale * (abs(start_cell[0] - self._start_cell[0])
+                                       + abs(start_cell[1] - self._start_cell[1]))
+            self._start_cell = start_cell
+
+        self._compute_shortest_path(start_id)
+        return self._extract_path(start_id)
+
+    def _extract_path(self, start_id):
+        inf = float('inf')
+        if self.g.get(start_id, inf) == inf:
+            return []
+        path = []
+        current = start_id
+        for _ in range(self.rows * self.cols * 4):
+            cell, dir_idx = divmod(current, 4)
+            path.append((cell // self.cols, cell % self.cols, DIRECTIONS[dir_idx]))
+            if current in self.goal_ids:
+                return path
+            best, best_state = inf, None
+            for nxt, cost in self._successors(current):
+                total = cost + self.g.get(nxt, inf)
+                if total < best:
+                    best, best_state = total, nxt
+            if best_state is None:
+                return []
+            current = best_state
+        return []
+
+
+def _path_from_parents(parent, state, cols):
+    """Follows parent links back from `state`; returns (row, col, direction) tuples."""
+    path = []
+    while state != -1:
+        cell, dir_idx = divmod(state, 4)
+        path.append((cell // cols, cell % cols, DIRECTIONS[dir_idx]))
+        state = int(parent[state])
+    path.reverse()
+    return path
+
+
+def _best_goal_state(dist, goal, cols):
+    """Cheapest heading in the goal cell: (state id, cost), or (None, inf)."""
+    base = (goal[0] * cols + goal[1]) * 4
+    best, best_cost = None, float('inf')
+    for k in range(4):
+        if dist[base + k] < best_cost:
+            best, best_cost = base + k, float(dist[base + k])
+    return best, best_cost
+
+
+class CostField:
+    """
+    Result of SearchClass.compute_cost_field: cost and predecessor of every
+    state, seen from one start state. Only valid while the searcher's
+    map_version equals `map_version`.
+    """
+
+    def __init__(self, rows, cols, start_id, dist, parent, map_version):
+        self.rows = rows
+        self.cols = cols
+        self.start_id = start_id
+        self.dist = dist
+        self.parent = parent
+        self.map_version = map_version
+
+    def cost_to(self, goal):
+        """Lowest cost to reach the goal cell (any heading), inf if unreachable."""
+        if not (0 <= goal[0] < self.rows and 0 <= goal[1] < self.cols):
+            return float('inf')
+        return _best_goal_state(self.dist, goal, self.cols)[1]
+
+    def path_to(self, goal):
+        """(row, col, direction) path from the start to the goal cell, or []."""
+        if not (0 <= goal[0] < self.rows and 0 <= goal[1] < self.cols):
+            return []
+        state, _ = _best_goal_state(self.dist, goal, self.cols)
+        if state is None:
+            return []
+        return _path_from_parents(self.parent, state, self.cols)
+
+
+class AllPairsTable:
+    """
+    Cost fields for every start state, as (n_states, n_states) arrays:
+    dist[start_id, state_id] and parent[start_id, state_id].
+    """
+
+    def __init__(self, rows, cols, dist, parent, signature, map_version=None):
+        self.rows = rows
+        self.cols = cols
+        self.dist = dist
+        self.parent = parent
+        self.signature = signature
+        self.map_version = map_version
+
+    def _start_id(self, start, initial_direction):
+        d = initial_direction % 360
+        dir_idx = min(range(4), key=lambda k: abs(DIRECTIONS[k] - d))
+        return (start[0] * self.cols + start[1]) * 4 + dir_idx
+
+    def cost(self, start, goal, initial_direction=0):
+        """Lowest cost from start (with heading) to the goal cell, inf if unreachable."""
+        for cell in (start, goal):
+            if not (0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols):
+                return float('inf')
+        row = self.dist[self._start_id(start, initial_direction)]
+        return _best_goal_state(row, goal, self.cols)[1]
+
+    def path(self, start, goal, initial_direction=0):
+        """(row, col, direction) path like find_path returns, or []."""
+        for cell in (start, goal):
+            if not (0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols):
+                return []
+        start_id = self._start_id(start, initial_direction)
+        state, _ = _best_goal_state(self.dist[start_id], goal, self.cols)
+        if state is None:
+            return []
+        return _path_from_parents(self.parent[start_id], state, self.cols)
+
+    def save(self, filename):
+        np.savez(filename, rows=self.rows, cols=self.cols, dist=self.dist,
+                 parent=self.parent, signature=np.array(self.signature))
+
+    @classmethod
+    def load(cls, filename):
+        try:
+            data = np.load(filename)
+            return cls(int(data["rows"]), int(data["cols"]), data["dist"],
+                       data["parent"], str(data["signature"]))
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Could not load all-pairs table from {filename}: {e}")
+            return None
+
+
+class ReservationTable:
+    """
+    Space-time reservations for SearchClass.plan_multi. Cells are flat ids
+    (row * cols + col), times are path step indices.
+      cells  - (cell, t) -> robot holding the cell at step t
+      moves  - (from_cell, to_cell, t) -> robot making that move into step t
+      parked - cell -> (t, robot): held by a robot from step t on, for good
+    """
+
+    def __init__(self, cols):
+        self.cols = cols
+        self.cells = {}
+        self.moves = {}
+        self.parked = {}
+        self.last_use = {}       # cell -> last step any robot holds it
+        self.max_time = 0
+
+    def reserve(self, cell, t, rid):
+        self.cells[(cell, t)] = rid
+        if t > self.last_use.get(cell, -1):
+            self.last_use[cell] = t
+        self.max_time = max(self.max_time, t)
+
+    def park(self, cell, t, rid):
+        self.parked[cell] = (t, rid)
+
+    def add_path(self, path, rid):
+        """Reserves every step of a (row, col, direction) path, then parks at its end."""
+        prev = None
+        for t, (r, c, _) in enumerate(path):
+            cell = r * self.cols + c
+            self.reserve(cell, t, rid)
+            if prev is not None and prev != cell:
+                self.moves[(prev, cell, t)] = rid
+            prev = cell
+        self.park(prev, len(path) - 1, rid)
+
+    def is_free(self, cell, t, rid):
+        owner = self.cells.get((cell, t))
+        if owner is not None and owner != rid:
+            return False
+        parked = self.parked.get(cell)
+        return parked is None or parked[1] == rid or t < parked[0]
+
+    def move_is_free(self, from_cell, to_cell, t, rid):
+        """False if another robot moves the opposite way in the same step (swap)."""
+        if from_cell == to_cell:
+            return True
+        owner = self.moves.get((to_cell, from_cell, t))
+        return owner is None or owner == rid
+
+    def can_stay(self, cell, t, rid):
+        """True if rid can stop on cell at step t and stay there for good."""
+        parked = self.parked.get(cell)
+        if parked is not None and parked[1] != rid:
+            return False
+        for step in range(t + 1, self.last_use.get(cell, -1) + 1):
+            owner = self.cells.get((cell, step))
+            if owner is not None and owner != rid:
+                return False
+        return True
+
+
+def find_conflicts(paths, agents=None):
+    """
+    Checks timed paths from plan_multi. A robot stays on its last cell after
+    its path ends. A robot with an empty path stays on its start cell if
+    `agents` (the dict given to plan_multi) is passed, otherwise it is ignored.
+
+    Args:
+        paths (dict): robot_id -> list of (row, col, direction).
+        agents (dict): Optional robot_id -> (start, goal, initial_direction).
+
+    Returns:
+        list: (step, robot_a, robot_b, kind) for every shared cell ("cell")
+              or swap of two neighbours ("swap"); empty if collision-free.
+    """
+    if agents is not None:
+        paths = {rid: p or [tuple(agents[rid][0]) + (0,)] for rid, p in paths.items()}
+    paths = {rid: p for rid, p in paths.items() if p}
+    horizon = max((len(p) for p in paths.values()), default=0)
+
+    def cell_at(path, t):
+        r, c, _ = path[min(t, len(path) - 1)]
+        return (r, c)
+
+    conflicts = []
+    rids = list(paths)
+    for t in range(horizon):
+        for i, a in enumerate(rids):
+            for b in rids[i + 1:]:
+                pa, pb = paths[a], paths[b]
+                if cell_at(pa, t) == cell_at(pb, t):
+                    conflicts.append((t, a, b, "cell"))
+                elif t > 0 and cell_at(pa, t) == cell_at(pb, t - 1) \
+                        and cell_at(pb, t) == cell_at(pa, t - 1):
+                    conflicts.append((t, a, b, "swap"))
+    return conflicts
+
+
+class _AnytimeSearch:
+    """
+    ARA* (Likhachev, Gordon & Thrun) state for SearchClass.find_path_anytime.
+    States are packed ids; every heading in the goal cell counts as the goal.
+    The heuristic is Manhattan distance times the cheapest step cost, which
+    keeps it consistent so the reported bounds hold.
+    """
+
+    CHECK_EVERY = 64   # expansions between clock checks
+
+    def __init__(self, searcher, key, epsilon, epsilon_step):
+        start, goal, direction, _ = key
+        self.key = key
+        self.rows = searcher.rows
+        self.cols = searcher.cols
+        self.goal = goal
+        self.epsilon = epsilon
+        self.epsilon_step = epsilon_step
+        self.h_scale = searcher._min_step_cost()
+        self.base_cost = searcher._base_step_costs()
+        self.blocked = searcher._blocked_cells()
+        self.rewards = dict(searcher.cell_rewards)
+        self.w_reward = searcher.w_reward
+
+        start_id = (start[0] * self.cols + start[1]) * 4 + DIRECTIONS.index(direction)
+        self.g = {start_id: 0.0}
+        self.parent = {start_id: -1}
+        self.open = {start_id}
+        self.closed = set()
+        self.incons = set()
+        self.heap = [(self._f(start_id), start_id)]
+        self.best_goal = None          # goal state with the lowest g so far
+        self.finished_round = False    # current epsilon round ran to completion
+        self.expansions = 0
+
+    def _h(self, state):
+        r, c = divmod(state // 4, self.cols)
+        return self.h_scale * (abs(r - self.goal[0]) + abs(c - self.goal[1]))
+
+    def _f(self, state):
+        return self.g[state] + self.epsilon * self._h(state)
+
+    def _goal_g(self):
+        return self.g[self.best_goal] if self.best_goal is not None else float('inf')
+
+    def _min_open_f(self):
+        heap = self.heap
+        while heap:
+            f, state = heap[0]
+            if state in self.open and f == self._f(state):
+                return f
+            heapq.heappop(heap)   # stale entry
+        return float('inf')
+
+    def _improve_path(self, deadline):
+        """One ARA* round at the current epsilon. False if the deadline hit first."""
+        rows, cols = self.rows, self.cols
+        goal_r, goal_c = self.goal
+        g, parent = self.g, self.parent
+        inf = float('inf')
+        while self._goal_g() > self._min_open_f():
+            self.expansions += 1
+            if self.expansions % self.CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                return False
+            _, current = heapq.heappop(self.heap)
+            self.open.discard(current)
+            self.closed.add(current)
+
+            cell, dir_idx = divmod(current, 4)
+            r, c = divmod(cell, cols)
+            if r == goal_r and c == goal_c:
+                if g[current] < self._goal_g():
+                    self.best_goal = current
+                continue   # paths through the goal cell never beat stopping there
+
+            current_g = g[current]
+            costs = self.base_cost[dir_idx]
+            for ndir_idx in range(4):
+                dr, dc = DIRECTION_STEPS[ndir_idx]
+                nr, nc = r + dr, c + dc
+                if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                    continue
+                ncell = nr * cols + nc
+                if self.blocked[ncell]:
+                    continue
+                cost = costs[ndir_idx]
+                if self.rewards:
+                    cost -= self.w_reward * self.rewards.get((nr, nc), 0.0)
+                nxt = ncell * 4 + ndir_idx
+                tentative = current_g + cost
+                if tentative < g.get(nxt, inf):
+                    g[nxt] = tentative
+                    parent[nxt] = current
+                    if nr == goal_r and nc == goal_c and tentative < self._goal_g():
+                        self.best_goal = nxt
+                    if nxt in self.closed:
+                        self.incons.add(nxt)
+                    else:
+                        self.open.add(nxt)
+                        heapq.heappush(self.heap, (self._f(nxt), nxt))
+        return True
+
+    def _bound(self):
+        """Suboptimality bound of the current best path: g(goal) / lower bound."""
+        goal_g = self._goal_g()
+        if goal_g == float('inf'):
+            return float('inf')
+        if self.epsilon <= 1.0 and not self.incons:
+            # f is g + h now, so the heap top already is the lower bound
+            lower = min(self._min_open_f(), goal_g)
+        else:
+            g, h = self.g, self._h
+            lower = min(min((g[s] + h(s) for s in self.open), default=goal_g),
+                        min((g[s] + h(s) for s in self.incons), default=goal_g))
+        bound = goal_g / lower if lower > 0 else float('inf')
+        if self.finished_round:
+            bound = min(bound, self.epsilon)
+        return max(1.0, bound)
+
+    def _next_round(self):
+        """Lower epsilon and move INCONS back to OPEN for the next round."""
+        self.epsilon = max(1.0, self.epsilon - self.epsilon_step)
+        self.open |= self.incons
+        self.incons = set()
+        self.closed = set()
+        self.heap = [(self._f(s), s) for s in self.open]
+        heapq.heapify(self.heap)
+        self.finished_round = False
+
+    def _path(self):
+        path = []
+        state = self.best_goal
+        while state is not None and state != -1:
+            cell, dir_idx = divmod(state, 4)
+            path.append((cell // self.cols, cell % self.cols, DIRECTIONS[dir_idx]))
+            state = self.parent[state]
+        path.reverse()
+        return path
+
+    def exhausted(self):
+        """True once every reachable state was searched at epsilon 1."""
+        return self.finished_round and self.epsilon <= 1.0 and not self.open and not self.incons
+
+    def run(self, budget_s):
+        deadline = time.perf_counter() + budget_s
+        while True:
+            if self.finished_round:
+                if self._bound() <= 1.0 or self.epsilon <= 1.0:
+                    break
+                self._next_round()
+            if not self._improve_path(deadline):
+                break
+            self.finished_round = True
+            if time.perf_counter() > deadline:
+                break
+        return self._path(), self._bound()
@@ -166,7 +166,7 @@ class ArucoGridDetector:
     the old midpoint-based line.
     """
 
-    def __init__(self, robot_id, rows, cols, cell_size, camera_index=2):
+    def __init__(self, robot_id, rows, cols, cell_size, camera_index=2, frame_source=None):
         self.robot_id = robot_id
         self.rows = rows
         self.cols = cols
@@ -190,7 +190,12 @@ class ArucoGridDetector:
         self.cell_centers = []
 
         # Internal state
-        self.cap = cv2.VideoCapture(camera_index)
+        # Anything with read()/release() like cv2.VideoCapture works here,
+        # e.g. the sources in frame_sources.py (video file, image folder, synthetic arena)
+        if frame_source is not None:
+            self.cap = frame_source
+        else:
+            self.cap = cv2.VideoCapture(camera_index)
         #self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 200)
         #self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
         self.last_valid_grid = None
@@ -318,7 +323,7 @@ class ArucoGridDetector:
                 dy = corner_pts[1][1] - corner_pts[0][1]
                 angle_deg = np.degrees(np.arctan2(dy, dx))
 
-                marker_id = int(ids[i])
+                marker_id = int(ids[i][0])
                 if marker_id == self.robot_id:
                     self.robot_position = (cx, cy, angle_deg)
                 else:
@@ -0,0 +1,368 @@
+"""
+asyncio version of MovementClass (movement_class5.py).
+
+One connection to the Pico and three coroutines sharing it:
+
+    _stream_commands  writes queued commands, keeping at most `window` of
+                      them unacknowledged (several go out in one write)
+    _handle_acks      frames the replies and resolves each command's future
+                      (pico_protocol.dispatch_replies)
+    _watch_pose       polls the detector and wakes everything waiting for a
+                      new robot pose
+
+The corrections wait for the first pose captured after the last command
+was acknowledged instead of sleeping a fixed 0.5 s, so a correction step
+costs one ack plus the camera's own delay, and a pose already taken since
+the robot stopped is used straight away.
+
+    mover = AsyncMovementClass("192.168.106.106", detector=detector)
+    await mover.connect()
+    await mover.execute_path(path)
+    await mover.disconnect()
+
+The blocking send methods inherited from MovementClass are not used here;
+the path, angle and threshold helpers are.
+"""
+import asyncio
+import math
+import time
+
+from motion_compiler import compile_path
+from movement_class5 import MovementClass
+from pico_protocol import QUEUE_SIZE, AckDispatcher, LineFramer, dispatch_replies, format_command, format_velocity
+
+
+class AsyncMovementClass(MovementClass):
+    def __init__(self, pico_ip="192.168.106.106", pico_port=12346, detector=None):
+        super().__init__(pico_ip, pico_port, detector)
+        # The streamer sends whatever is queued in one write, up to what the
+        # Pico's queue holds, so a compiled program usually goes out at once
+        self.window = QUEUE_SIZE
+        self.pose_interval = 0.005  # s between detector polls
+        self.pose_timeout = 1.0     # s to wait for a fresh pose before giving up
+        # s from frame capture until the pose is seen here (camera, detection,
+        # polling); poses are dated this much earlier, so one taken before
+        # the robot stopped is never mistaken for a fresh one
+        self.pose_latency = 0.04
+
+        self.reader = None
+        self.writer = None
+        self._outbox = None        # PendingCommands waiting for a window slot
+        self._held = None          # the one taken off _outbox, waiting for the slot
+        self._window_slots = None
+        self._tasks = []
+
+        self.pose = None       # latest (x, y, angle_deg) from the detector
+        self.pose_time = 0.0   # estimated time.perf_counter() when its frame was captured
+        self.motion_time = 0.0  # time.perf_counter() of the last acknowledged command
+        self._pose_changed = None
+
+    async def connect(self):
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self.pico_ip, self.pico_port)
+        except OSError as e:
+            print("[AsyncMovementClass] Error connecting to Pico:", e)
+            return False
+        print("[AsyncMovementClass] Connected to Pico at", self.pico_ip)
+
+        try:
+            initial_msg = await asyncio.wait_for(self.reader.readline(), self.ack_timeout)
+            print(f"[AsyncMovementClass] Initial Pico message: {initial_msg.decode().strip()}")
+        except asyncio.TimeoutError:
+            print("[AsyncMovementClass] No initial message received from Pico.")
+
+        self.acks = AckDispatcher()
+        self._outbox = asyncio.Queue()
+        self._window_slots = asyncio.Semaphore(self.window)
+        self._pose_changed = asyncio.Condition()
+        self._tasks = [asyncio.ensure_future(self._stream_commands()),
+                       asyncio.ensure_future(self._handle_acks())]
+        if self.detector:
+            self._tasks.append(asyncio.ensure_future(self._watch_pose()))
+        return True
+
+    async def disconnect(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.acks.fail_all("DISCONNECTED")
+            print("[AsyncMovementClass] Disconnected from Pico.")
+
+    # ---- the three coroutines ----
+
+    async def _stream_commands(self):
+        while True:
+            batch = [await self._next_to_send()]
+            # Whatever was queued in the meantime goes out in the same write
+            while not self._outbox.empty() and not self._window_slots.locked():
+                batch.append(await self._next_to_send())
+            batch = [p for p in batch if p is not None]
+            if not batch:
+                continue
+            self.writer.write(b"".join(format_command(p.seq, p.command, *p.params) for p in batch))
+            await self.writer.drain()
+            print(f"[AsyncMovementClass] Sent {len(batch)} command(s).")
+
+    async def _next_to_send(self):
+        """Takes the next queued command and a window slot, which its ack gives back."""
+        pending = self._held = await self._outbox.get()
+        try:
+            await self._window_slots.acquire()
+        finally:
+            self._held = None
+        if pending.done:  # cancelled while queued
+            self._window_slots.release()
+            return None
+        pending.future.add_done_callback(lambda _: self._window_slots.release())
+        return pending
+
+    async def _handle_acks(self):
+        def unmatched(line):
+            print(f"[AsyncMovementClass] Ignoring reply: {line}")
+
+        await dispatch_replies(self.reader, self.acks, LineFramer(), on_line=unmatched)
+        print("[AsyncMovementClass] Connection to Pico closed.")
+
+    async def _watch_pose(self):
+        last_key = None
+        while True:
+            key, pose = self._read_detector()
+            if pose is not None and key != last_key:
+                last_key = key
+                self.pose, self.pose_time = pose, time.perf_counter() - self.pose_latency
+                async with self._pose_changed:
+                    self._pose_changed.notify_all()
+            await asyncio.sleep(self.pose_interval)
+
+    def _read_detector(self):
+        """
+        (freshness key, pose). GridDetectionFinal2 results carry a frame_id;
+        detectors without get_result() are compared by the pose itself.
+        """
+        get_result = getattr(self.detector, "get_result", None)
+        if get_result is None:
+            pose = self.detector.get_robot_position()
+            return pose, pose
+        result = get_result()
+        if result is None:
+            return None, None
+        return result.frame_id, result.robot_position
+
+    # ---- commands ----
+
+    def submit(self, command, param):
+        """Queues one sequenced command; returns a future resolved with its PendingCommand."""
+        future = asyncio.get_running_loop().create_future()
+        pending = self.acks.register(self._next_seq(), command, [param], future)
+        self._outbox.put_nowait(pending)
+        return future
+
+    async def wait_ack(self, future, timeout=None):
+        """
+        Waits for a submitted command's reply, at most `timeout` s (default
+        ack_timeout; _ack_timeout gives the one for a command that has to
+        move first). True on DONE.
+        """
+        try:
+            pending = await asyncio.wait_for(asyncio.shield(future), timeout or self.ack_timeout)
+        except asyncio.TimeoutError:
+            print("[AsyncMovementClass] Ack timeout.")
+            return False
+        if not pending.ok:
+            print(f"[AsyncMovementClass] Command {pending.command},{','.join(pending.params)} "
+                  f"failed: {pending.reply}")
+            return False
+        self.motion_time = time.perf_counter()
+        print(f"[AsyncMovementClass] Received ack: {pending.reply}")
+        return True
+
+    async def send(self, command, param):
+        """Sends one command and waits for its ack. True on DONE."""
+        return await self.wait_ack(self.submit(command, param), self._ack_timeout(command, param))
+
+    async def stop(self):
+        """Drops everything still queued here, cancels the Pico's queue and stops the motors."""
+        if self._held is not None:
+            self.acks.fail(self._held, "CANCELLED")
+        while not self._outbox.empty():
+            self.acks.fail(self._outbox.get_nowait(), "CANCELLED")
+        # STOP skips both queues, so it does not wait for a window slot
+        future = asyncio.get_running_loop().create_future()
+        pending = self.acks.register(self._next_seq(), "STOP", [0], future)
+        self.writer.write(format_command(pending.seq, "STOP", 0))
+        await self.writer.drain()
+        return await self.wait_ack(future)
+
+    async def send_velocity(self, v, w):
+        """
+        Streams one VEL setpoint (cells/s, deg/s). Not acknowledged: the next
+        one replaces it, and the Pico stops by itself when they stop coming.
+        """
+        self.writer.write(format_velocity(v, w))
+        await self.writer.drain()
+
+    async def send_status_message(self, message):
+        """Sends a status message to the Pico and waits for the acknowledgment "Taken"."""
+        if self.writer is None:
+            print("[AsyncMovementClass] Not connected to Pico. Cannot send status message.")
+            return False
+        future = asyncio.get_running_loop().create_future()
+        self.acks.register(None, "STATUS", [message], future)
+        self.writer.write(f"STATUS,{message}\n".encode())
+        await self.writer.drain()
+        return await self.wait_ack(future)
+
+    # ---- pose feedback ----
+
+    async def next_pose(self, after):
+        """First pose captured after `after` (a time.perf_counter() value), None on timeout."""
+        async def fresh():
+            async with self._pose_changed:
+                await self._pose_changed.wait_for(lambda: self.pose_time > after)
+            return self.pose
+
+        try:
+            return await asyncio.wait_for(fresh(), self.pose_timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def correct_angle(self):
+        """
+        Turns in steps of at most 5 degrees until the camera heading is within
+        orientation_threshold of expected_angle, checking a fresh pose after
+        every step.
+        """
+        if not self.detector:
+            print("[AsyncMovementClass] No detector available for angle correction.")
+            return False
+        while True:
+            position = await self.next_pose(self.motion_time)
+            if position is None:
+                print("[AsyncMovementClass] Unable to get robot position for correction.")
+                return False
+
+            angle_diff = self._calculate_angle_difference(position[2], self.expected_angle)
+            if abs(angle_diff) <= self.orientation_threshold:
+                return True
+
+            correction_deg = min(abs(angle_diff), 5)
+            correction_deg = correction_deg if angle_diff < 0 else -correction_deg
+            print(f"[AsyncMovementClass] Applying correction: {correction_deg} degrees")
+            if not await self.send("TURN", correction_deg):
+                print("[AsyncMovementClass] Failed to apply correction.")
+                return False
+
+    async def correct_position(self, expected_x, expected_y):
+        """
+        Moves back and forth with CORRECTION commands along the axis of
+        expected_angle until the camera position is within position_threshold,
+        checking a fresh pose after every step.
+        """
+        if not self.detector:
+            print("[AsyncMovementClass] No detector available for position correction.")
+            return False
+        conversion_factor = 51 / 135  # encoder steps per detector unit, as in MovementClass
+        while True:
+            position = await self.next_pose(self.motion_time)
+            if position is None:
+                print("[AsyncMovementClass] Unable to get robot position for correction.")
+                return False
+
+            error = self._position_error(position, expected_x, expected_y)
+            if error is None:
+                print(f"[AsyncMovementClass] Unexpected angle: {self.expected_angle} degrees.")
+                return False
+            direction, diff = error
+            if direction is None:
+                return True
+
+            correction_steps = max(5, int(round(abs(diff) * conversion_factor)))
+            correction_param = f"{direction},{correction_steps}"
+            print(f"[AsyncMovementClass] Applying position correction: CORRECTION,{correction_param} "
+                  f"(diff = {diff})")
+            if not await self.send("CORRECTION", correction_param):
+                print(f"[AsyncMovementClass] Failed to apply position correction: CORRECTION,{correction_param}")
+                return False
+
+    def _position_error(self, position, expected_x, expected_y):
+        """
+        (direction, diff) for the CORRECTION that brings the robot to the
+        expected point along expected_angle, direction None when within
+        threshold; None for a heading that is not axis-aligned. diff is the
+        distance still to go along the heading (the detector's angle is
+        atan2(dy, dx) in image coordinates), negative when past the point.
+        """
+        if self.expected_angle not in (0, 90, 180, 270):
+            return None
+        current_x, current_y, _ = position
+        heading = math.radians(self.expected_angle)
+        diff = ((expected_x - current_x) * math.cos(heading)
+                + (expected_y - current_y) * math.sin(heading))
+        if diff > self.position_threshold:
+            return "FORWARD", diff
+        if diff < -self.position_threshold:
+            return "BACK", diff
+        return None, diff
+
+    # ---- paths ----
+
+    async def execute_path(self, path, pipelined=False):
+        """
+        Drives the robot along a (row, col, direction) path, like
+        MovementClass.execute_path: by default every command is followed by
+        camera corrections; with pipelined=True the path is compiled into
+        merged runs and turns (motion_compiler.py), queued at once and
+        corrected at the end. Returns True when every command succeeded.
+        """
+        if self.writer is None:
+            print("[AsyncMovementClass] Not connected to Pico.")
+            return False
+        if not path:
+            print("[AsyncMovementClass] Path is empty.")
+            return False
+
+        self.expected_angle = path[0][2]
+        self.current_step_index = 0
+
+        if pipelined:
+            program = compile_path(path, arcs=self.use_arcs)
+            futures = [self.submit(command, param) for command, param in program]
+            # Acks come back in order, each once its own motion is done
+            for (command, param), future in zip(program, futures):
+                if not await self.wait_ack(future, self._ack_timeout(command, param)):
+                    print("[AsyncMovementClass] Pipelined path execution stopped early.")
+                    await self.stop()
+                    return False
+            self.expected_angle = path[-1][2]
+            self.current_step_index = len(path) - 1
+            return await self._correct_at(path[-1])
+
+        for command, value in self._compress_path(path):
+            if command == "TURN":
+                self.expected_angle = (self.expected_angle + value) % 360
+                if not await self.send("TURN", value):
+                    return False
+                await self.correct_angle()
+                continue
+            for _ in range(value):
+                self.current_step_index += 1
+                if not await self.send("FORWARD", 1):
+                    return False
+                if self.current_step_index < len(path):
+                    await self._correct_at(path[self.current_step_index])
+        return True
+
+    async def _correct_at(self, state):
+        """Angle, then position correction for the cell of a path state."""
+        if not self.detector:
+            return True
+        await self.correct_angle()
+        expected_position = self.detector.cell_centers.get((state[0], state[1]))
+        if expected_position is None:
+            print(f"[AsyncMovementClass] Expected cell center not found for cell {state[:2]}")
+            return True
+        return await self.correct_position(*expected_position)
@@ -0,0 +1,305 @@
+"""
+Simulated Pico server for running MovementClass without the robot.
+
+Speaks the same protocol as main.py (see pico_protocol.py): sequenced
+commands are queued and acknowledged when their simulated motion ends, old
+unsequenced lines get the old replies, STOP cancels the queue. Motions take
+as long as the real robot would (cell_time per cell, rotation_speed for
+turns), and every line can be delayed by a one-way network latency.
+The simulated pose (x, y in detector units, cell_size per cell, heading in
+degrees, same axes as GridDetectionFinal2) follows the completed motions and
+VEL setpoints; turns over- or undershoot by turn_error (a fraction) so
+camera corrections have something to correct. VEL has the same watchdog as
+main.py.
+
+    python fake_pico.py --port 12346 --cell-time 0.5
+"""
+import argparse
+import asyncio
+import math
+import threading
+import time
+
+from motion_compiler import ARC_CURVE
+from pico_protocol import QUEUE_SIZE, VEL_TIMEOUT, format_reply, parse_command
+
+
+class FakePico:
+    def __init__(self, host="127.0.0.1", port=12346, cell_time=0.5, rotation_speed=90.0,
+                 latency=0.0, steps_per_cell=51, turn_error=0.0, cell_size=135.0):
+        self.host = host
+        self.port = port
+        self.cell_time = cell_time            # s per FORWARD/BACK cell
+        self.rotation_speed = rotation_speed  # deg/s for TURN
+        self.latency = latency                # one-way delay added to every line, s
+        self.steps_per_cell = steps_per_cell  # CORRECTION steps per cell
+        self.turn_error = turn_error          # actual turn = commanded * (1 + turn_error)
+        self.cell_size = cell_size            # detector units per cell
+        self.x = self.y = cell_size / 2       # simulated position, centre of cell (0, 0)
+        self.heading = 0.0                    # simulated robot heading, deg
+        self.velocity = (0.0, 0.0)            # current VEL setpoint (cells/s, deg/s)
+        self.busy = False                     # a queued command is running
+        self._vel_deadline = 0.0
+        self.commands_run = 0
+        self.server = None
+        self.loop = None
+        self._ready = threading.Event()
+
+    # ---- motion simulation ----
+
+    def motion_time(self, command, params):
+        """How long the simulated robot needs for one command, in seconds."""
+        if command in ("FORWARD", "BACK"):
+            return int(params[0]) * self.cell_time
+        if command == "TURN":
+            return abs(float(params[0])) / self.rotation_speed
+        if command == "ARC":
+            if abs(float(params[0])) != 90:
+                raise ValueError("BAD_ARC")
+            return (1 + ARC_CURVE) * self.cell_time
+        if command == "CORRECTION":
+            if params[0].upper() not in ("FORWARD", "BACK"):
+                raise ValueError("BAD_CORRECTION")
+            return int(params[1]) / self.steps_per_cell * self.cell_time
+        if command == "DANCE":
+            return 2.0
+        if command == "STOP":
+            return 0.0
+        raise ValueError("UNKNOWN_COMMAND")
+
+    def apply_motion(self, command, params):
+        """Moves the simulated pose by one completed command."""
+        if command == "TURN":
+            self.heading = (self.heading + float(params[0]) * (1 + self.turn_error)) % 360
+            return
+        if command == "ARC":
+            # Ends one cell ahead and one cell to the turned side
+            self.apply_motion("FORWARD", ["1"])
+            self.heading = (self.heading + float(params[0]) * (1 + self.turn_error)) % 360
+            self.apply_motion("FORWARD", ["1"])
+            return
+        if command in ("FORWARD", "BACK"):
+            cells = int(params[0])
+        elif command == "CORRECTION":
+            cells = int(params[1]) / self.steps_per_cell
+            command = params[0].upper()
+        else:
+            return
+        distance = cells * self.cell_size * (1 if command == "FORWARD" else -1)
+        self.x += distance * math.cos(math.radians(self.heading))
+        self.y += distance * math.sin(math.radians(self.heading))
+
+    def set_velocity(self, v, w):
+        self.velocity = (v, w)
+        self._vel_deadline = self.loop.time() + VEL_TIMEOUT
+
+    async def _velocity_loop(self, period=0.01):
+        """Integrates the VEL setpoint into the pose; the watchdog zeroes it."""
+        last = self.loop.time()
+        while True:
+            await asyncio.sleep(period)
+            now = self.loop.time()
+            dt, last = now - last, now
+            if self.velocity != (0.0, 0.0) and now > self._vel_deadline:
+                self.velocity = (0.0, 0.0)
+            v, w = self.velocity
+            self.heading = (self.heading + w * (1 + self.turn_error) * dt) % 360
+            self.x += v * self.cell_size * math.cos(math.radians(self.heading)) * dt
+            self.y += v * self.cell_size * math.sin(math.radians(self.heading)) * dt
+
+    def reply_body(self, command, params):
+        # Same echo as main.py: TURN and ARC come back as a float
+        if command in ("TURN", "ARC"):
+            return f"{command},{float(params[0])}"
+        if command in ("STOP", "DANCE"):
+            return f"{command},0"
+        if command == "CORRECTION":
+            return f"{command},{params[0].upper()},{int(params[1])}"
+        return ",".join([command] + params)
+
+    # ---- server ----
+
+    def _send(self, writer, data):
+        # Delivered after the network delay without holding up the sender
+        if self.latency:
+            self.loop.call_later(self.latency, writer.write, data)
+        else:
+            writer.write(data)
+
+    async def _worker(self, writer, queue, wakeup, state):
+        while True:
+            if not queue:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            seq, command, params = queue.pop(0)
+            state["abort"] = asyncio.Event()
+            self.busy = True
+            self.velocity = (0.0, 0.0)
+            try:
+                duration = self.motion_time(command, params)
+            except (ValueError, IndexError) as e:
+                self.busy = False
+                self._send(writer, format_reply(seq, "ERROR", str(e)))
+                continue
+            try:
+                await asyncio.wait_for(state["abort"].wait(), duration)
+                cancelled = True
+            except asyncio.TimeoutError:
+                cancelled = False
+            self.commands_run += 1
+            self.busy = False
+            if cancelled:
+                self._send(writer, format_reply(seq, "ERROR", "CANCELLED"))
+            else:
+                self.apply_motion(command, params)
+                self._send(writer, format_reply(seq, "DONE", self.reply_body(command, params)))
+
+    def _receive(self, writer, message, queue, wakeup, state):
+        """Handles one command line once it has 'arrived' (after the network delay)."""
+        seq, command, params = parse_command(message)
+        if command == "VEL":
+            try:
+                if not (self.busy or queue):
+                    self.set_velocity(float(params[0]), float(params[1]))
+            except (ValueError, IndexError):
+                print(f"[FakePico] Malformed VEL: {message}")
+        elif command == "STOP":
+            for dropped_seq, _, _ in queue:
+                if dropped_seq is not None:
+                    self._send(writer, format_reply(dropped_seq, "ERROR", "CANCELLED"))
+            del queue[:]
+            state["abort"].set()
+            self.velocity = (0.0, 0.0)
+            self._send(writer, format_reply(seq, "DONE", "STOP", 0))
+        elif len(queue) >= QUEUE_SIZE:
+            self._send(writer, format_reply(seq, "ERROR", "QUEUE_FULL"))
+        else:
+            queue.append((seq, command, params))
+            wakeup.set()
+
+    async def handle_client(self, reader, writer):
+        queue = []
+        wakeup = asyncio.Event()
+        state = {"abort": asyncio.Event()}
+        writer.write(b"Connected to Pico W!\n")
+        await writer.drain()
+        worker = asyncio.ensure_future(self._worker(writer, queue, wakeup, state))
+        try:
+            while True:
+                data = await reader.readline()
+                if not data:
+                    break
+                message = data.decode().strip()
+                if not message:
+                    continue
+                if self.latency:
+                    self.loop.call_later(self.latency, self._receive, writer, message, queue, wakeup, state)
+                else:
+                    self._receive(writer, message, queue, wakeup, state)
+        except ConnectionError:
+            pass
+        finally:
+            worker.cancel()
+            writer.close()
+
+    async def serve(self):
+        self.loop = asyncio.get_event_loop()
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        velocity = asyncio.ensure_future(self._velocity_loop())
+        self._ready.set()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            velocity.cancel()
+
+    def start_in_thread(self):
+        """Runs the server on a daemon thread; returns once it is listening."""
+        thread = threading.Thread(target=lambda: asyncio.run(self._serve_quietly()), daemon=True)
+        thread.start()
+        self._ready.wait()
+        return thread
+
+    async def _serve_quietly(self):
+        try:
+            await self.serve()
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        if self.server is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
+
+
+class CameraResult:
+    def __init__(self, frame_id, robot_position):
+        self.frame_id = frame_id
+        self.robot_position = robot_position
+
+
+class FakeCamera:
+    """
+    Stands in for GridDetectionFinal2: publishes the FakePico's pose as a new
+    result every 1/fps seconds, with cell_centers for a rows x cols grid in
+    the same coordinates.
+    """
+
+    def __init__(self, pico, rows, cols, fps=30.0):
+        self.pico = pico
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = pico.cell_size
+        self.cell_centers = {(r, c): ((c + 0.5) * self.cell_size, (r + 0.5) * self.cell_size)
+                             for r in range(rows) for c in range(cols)}
+        self.period = 1.0 / fps
+        self._result = None
+        self._running = False
+
+    def place(self, row, col, heading):
+        """Puts the simulated robot on a cell centre."""
+        self.pico.x, self.pico.y = self.cell_centers[(row, col)]
+        self.pico.heading = float(heading)
+
+    def _run(self):
+        frame_id = 0
+        while self._running:
+            frame_id += 1
+            self._result = CameraResult(frame_id, (self.pico.x, self.pico.y, self.pico.heading))
+            time.sleep(self.period)
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def get_result(self):
+        return self._result
+
+    def get_robot_position(self):
+        return self._result.robot_position if self._result is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated Pico W movement server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12346)
+    parser.add_argument("--cell-time", type=float, default=0.5, help="seconds per cell")
+    parser.add_argument("--rotation-speed", type=float, default=90.0, help="deg/s")
+    parser.add_argument("--latency", type=float, default=0.0, help="one-way delay per line, s")
+    parser.add_argument("--turn-error", type=float, default=0.0, help="relative turn error, e.g. 0.1")
+    args = parser.parse_args()
+    pico = FakePico(args.host, args.port, args.cell_time, args.rotation_speed, args.latency,
+                    turn_error=args.turn_error)
+    print(f"[FakePico] Listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(pico.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
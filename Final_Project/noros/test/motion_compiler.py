@@ -0,0 +1,93 @@
+"""
+Compiles a SearchClass path into a short motion program for the Pico.
+
+A path is a list of (row, col, direction) states one cell apart. The
+program is a list of (command, param) pairs like MovementClass._compress_path
+returns, but every straight run is one FORWARD,<cells> and every heading
+change one TURN the shorter way round, so a corner-to-corner path is a
+handful of commands that fit the Pico's queue in a single write
+(MovementClass.execute_program).
+
+With arcs=True a 90 degree corner between two runs becomes ARC,<+-90>: half
+a cell straight, a quarter circle of radius half a cell, half a cell
+straight, ending on the centre of the cell after the corner. It takes one
+cell from each neighbouring run and replaces stop, turn on the spot, go.
+
+estimate_time() prices a program with SearchClass's time model (1 /
+linear_speed per cell, rotation_speed per 90 degrees); without arcs and
+overhead it equals the time part of the search's path cost.
+"""
+import math
+
+ARC_CURVE = math.pi / 4  # cells along the quarter circle of an ARC (radius half a cell)
+
+
+def turn_between(d1, d2):
+    """Signed turn from heading d1 to d2 in (-180, 180]."""
+    diff = (d2 - d1) % 360
+    if diff > 180:
+        diff -= 360
+    return diff
+
+
+def compile_path(path, arcs=False):
+    """Merged (command, param) program for a (row, col, direction) path."""
+    program = []
+    for (r1, c1, d1), (r2, c2, d2) in zip(path, path[1:]):
+        turn = turn_between(d1, d2)
+        if turn:
+            if program and program[-1][0] == "TURN":
+                turn = turn_between(0, program.pop()[1] + turn)
+            if turn:
+                program.append(("TURN", turn))
+        cells = abs(r2 - r1) + abs(c2 - c1)
+        if cells:
+            if program and program[-1][0] == "FORWARD":
+                cells += program.pop()[1]
+            program.append(("FORWARD", cells))
+    if arcs:
+        program = smooth_corners(program)
+    return program
+
+
+def smooth_corners(program):
+    """
+    Replaces FORWARD a, TURN +-90, FORWARD b with FORWARD a-1, ARC +-90,
+    FORWARD b-1 (zero runs dropped), left to right. A run shortened to
+    nothing by one arc cannot feed the next corner, which stays a TURN.
+    """
+    out = []
+    for command, param in program:
+        out.append((command, param))
+        if (command == "FORWARD" and len(out) >= 3 and out[-2][0] == "TURN"
+                and abs(out[-2][1]) == 90 and out[-3][0] == "FORWARD"):
+            before, turn, after = out[-3][1], out[-2][1], param
+            del out[-3:]
+            if before > 1:
+                out.append(("FORWARD", before - 1))
+            out.append(("ARC", turn))
+            if after > 1:
+                out.append(("FORWARD", after - 1))
+    return out
+
+
+def command_time(command, param, linear_speed=1.0, rotation_speed=1.0):
+    """Time for one command in SearchClass units (rotation_speed = time per 90 degrees)."""
+    if command in ("FORWARD", "BACK"):
+        return param / linear_speed
+    if command == "TURN":
+        return abs(param) / 90.0 * rotation_speed
+    if command == "ARC":
+        # The straight halves at driving speed; the curve as slow as the
+        # slower of driving it and turning by param
+        return 1.0 / linear_speed + max(ARC_CURVE / linear_speed, abs(param) / 90.0 * rotation_speed)
+    return 0.0
+
+
+def estimate_time(program, linear_speed=1.0, rotation_speed=1.0, command_overhead=0.0):
+    """
+    Execution time of a program in SearchClass units. command_overhead is
+    added per command (start/stop, ack), in the same units.
+    """
+    return sum(command_time(command, param, linear_speed, rotation_speed) + command_overhead
+               for command, param in program)
@@ -3,6 +3,10 @@ import socket
 import time
 import math
 import threading
+from collections import deque
+
+from motion_compiler import command_time, compile_path
+from pico_protocol import QUEUE_SIZE, AckDispatcher, LineFramer, format_command
 
 class MovementClass:
     def __init__(self, pico_ip="192.168.106.106", pico_port=12346, detector=None):
@@ -24,7 +28,28 @@ class MovementClass:
 
         self.socket_lock = threading.Lock()
 
+        # Pipelined protocol (see pico_protocol.py): up to `window` sequenced
+        # commands are sent ahead of their acks
+        self.window = 4
+        self.use_arcs = False  # pipelined paths drive corners as ARCs (motion_compiler.py)
+        # An ack is waited for as long as the command's motion should take
+        # (command_time with these calibrated speeds) plus ack_timeout, so a
+        # merged FORWARD,7 gets more time than a FORWARD,1
+        self.seconds_per_cell = 1.0  # s the robot needs per cell
+        self.seconds_per_turn = 1.0  # s per 90 degrees of turning
+        self.ack_timeout = 5.0  # s margin on top of that (start/stop, network)
+        self._seq = 0
+
+        # Every reply goes through one framer and one dispatcher, so acks
+        # split across recv() calls or arriving together are never lost
+        self._framer = LineFramer()
+        self._lines = deque()
+        self.acks = AckDispatcher()
+
     def connect(self):
+        self._framer.reset()
+        self._lines.clear()
+        self.acks = AckDispatcher()
         try:
             self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.client_socket.connect((self.pico_ip, self.pico_port))
@@ -46,7 +71,13 @@ class MovementClass:
             self.client_socket = None
             print("[MovementClass] Disconnected from Pico.")
 
-    def execute_path(self, path):
+    def execute_path(self, path, pipelined=False):
+        """
+        Drives the robot along a (row, col, direction) path. By default every
+        command waits for its ack and is followed by camera corrections; with
+        pipelined=True the path is compiled into merged runs and turns
+        (motion_compiler.py), sent in one batch and corrected once at the end.
+        """
         if not self.client_socket:
             print("[MovementClass] Not connected to Pico.")
             return
@@ -55,6 +86,10 @@ class MovementClass:
             print("[MovementClass] Path is empty.")
             return
 
+        if pipelined:
+            self._execute_pipelined(path)
+            return
+
         segments = self._compress_path(path)
 
         # Initialize expected_angle based on the first step's angle from the path
@@ -109,32 +144,189 @@ class MovementClass:
                     if expected_x is not None and expected_y is not None:
                         self._continuous_position_correction(expected_x, expected_y)
 
+    def _execute_pipelined(self, path):
+        program = compile_path(path, arcs=self.use_arcs)
+        print(f"[MovementClass] Compiled {len(path)}-state path into {len(program)} command(s): {program}")
+        if not self.execute_program(program):
+            print("[MovementClass] Pipelined path execution stopped early.")
+            return
+        self.expected_angle = path[-1][2]
+        self.current_step_index = len(path) - 1
+        if self.detector:
+            self._continuous_angle_correction()
+            expected_position = self.detector.cell_centers.get((path[-1][0], path[-1][1]))
+            if expected_position:
+                self._continuous_position_correction(*expected_position)
+
+    def execute_program(self, program):
+        """
+        Sends a compiled motion program (motion_compiler.py) in as few writes
+        as the Pico's queue allows: all of it at once when it fits in
+        QUEUE_SIZE commands. Returns True when every command came back DONE.
+        """
+        return self.send_pipelined(program, window=max(1, min(len(program), QUEUE_SIZE)))
+
+    def send_pipelined(self, commands, window=None):
+        """
+        Sends (command, param) pairs as sequenced commands, keeping up to
+        `window` of them unacknowledged so the Pico's queue never runs dry.
+        Returns True when every command came back DONE. On an ERROR or a
+        timeout the rest of the Pico's queue is cancelled with STOP.
+        """
+        if not self.client_socket:
+            print("[MovementClass] Not connected to Pico.")
+            return False
+
+        window = window or self.window
+        commands = list(commands)
+        pending = {}  # seq -> PendingCommand sent but not yet acknowledged
+        next_index = 0
+
+        with self.socket_lock:
+            try:
+                while next_index < len(commands) or pending:
+                    # Top the window up in one write
+                    batch = []
+                    while next_index < len(commands) and len(pending) < window:
+                        command, param = commands[next_index]
+                        next_index += 1
+                        seq = self._next_seq()
+                        pending[seq] = self.acks.register(seq, command, [param])
+                        batch.append(format_command(seq, command, param))
+                    if batch:
+                        self.client_socket.sendall(b"".join(batch))
+                        print(f"[MovementClass] Sent {len(batch)} command(s), {len(pending)} in flight.")
+
+                    # The Pico runs its queue in order, so the next ack is the
+                    # oldest command's, due once that one has finished moving
+                    oldest = next(iter(pending.values()))
+                    self.client_socket.settimeout(self._ack_timeout(oldest.command, ",".join(oldest.params)))
+                    done = self._next_ack()
+                    if done is None:
+                        print("[MovementClass] Connection closed while waiting for acks.")
+                        return False
+                    if pending.pop(done.seq, None) is None:
+                        continue
+                    if not done.ok:
+                        print(f"[MovementClass] Command {done.command},{','.join(done.params)} failed: {done.reply}")
+                        self._cancel_queue(pending)
+                        return False
+                    print(f"[MovementClass] Received ack: {done.reply}")
+                return True
+            except socket.timeout:
+                print(f"[MovementClass] Ack timeout with {len(pending)} command(s) in flight.")
+                self._cancel_queue(pending)
+                return False
+            except Exception as e:
+                print(f"[MovementClass] Error during pipelined send: {e}")
+                return False
+            finally:
+                for seq in pending:
+                    self.acks.by_seq.pop(seq, None)
+                self.client_socket.settimeout(None)
+
+    def _cancel_queue(self, pending):
+        """
+        Sends STOP and reads replies until it and every command still in
+        flight have been answered. Caller holds socket_lock.
+        """
+        seq = self._next_seq()
+        pending[seq] = self.acks.register(seq, "STOP", [0])
+        try:
+            self.client_socket.settimeout(self.ack_timeout)
+            self.client_socket.sendall(format_command(seq, "STOP", 0))
+            while any(not p.done for p in pending.values()):
+                if self._next_ack() is None:
+                    break
+        except Exception as e:
+            print(f"[MovementClass] Error cancelling queued commands: {e}")
+        finally:
+            # Whatever was not answered will never be waited for again
+            for p in pending.values():
+                self.acks.by_seq.pop(p.seq, None)
+            pending.clear()
+
+    def _ack_timeout(self, command, param):
+        """Seconds to wait for one command's ack: its expected motion time plus ack_timeout."""
+        command = command.upper()
+        if command == "CORRECTION":
+            # param is "<FORWARD|BACK>,<encoder steps>"
+            steps = int(str(param).split(",")[-1])
+            motion = steps / self.steps_per_cell * self.seconds_per_cell
+        else:
+            try:
+                motion = command_time(command, float(param), 1.0 / self.seconds_per_cell,
+                                      self.seconds_per_turn)
+            except ValueError:
+                motion = 0.0
+        return motion + self.ack_timeout
+
+    def _next_seq(self):
+        self._seq += 1
+        return self._seq
+
+    def _readline(self):
+        """Next non-empty line from the socket (without the newline), None on EOF."""
+        while not self._lines:
+            data = self.client_socket.recv(1024)
+            if not data:
+                return None
+            self._lines.extend(self._framer.feed(data))
+        return self._lines.popleft()
+
+    def _next_ack(self):
+        """
+        Reads lines until one answers an outstanding command and returns
+        that PendingCommand, None on EOF. Lines that answer nothing are
+        logged and skipped. Caller holds socket_lock.
+        """
+        while True:
+            line = self._readline()
+            if line is None:
+                self.acks.fail_all("CONNECTION_CLOSED")
+                return None
+            done = self.acks.dispatch(line)
+            if done is not None:
+                return done
+            print(f"[MovementClass] Ignoring reply: {line}")
+
+    def _wait_for(self, pending, timeout):
+        """Dispatches replies until `pending` is answered. Caller holds socket_lock."""
+        self.client_socket.settimeout(timeout)
+        try:
+            while not pending.done:
+                if self._next_ack() is None:
+                    break
+        finally:
+            self.client_socket.settimeout(None)
+        return pending.ok
+
     def _send_command_wait_ack(self, command, param):
-        valid_commands = ["FORWARD", "BACK", "TURN", "STOP", "DANCE", "CORRECTION"]
+        valid_commands = ["FORWARD", "BACK", "TURN", "ARC", "STOP", "DANCE", "CORRECTION"]
         if command.upper() not in valid_commands:
             print(f"[MovementClass] Invalid command type: {command}")
             return False
 
-        message = f"{command.upper()},{param}\n"
-
         with self.socket_lock: 
+            # Sequenced, so a reply that arrives after the timeout matches
+            # nothing instead of being taken for the next command's ack
+            pending = self.acks.register(self._next_seq(), command, [param])
+            message = format_command(pending.seq, command.upper(), param)
             try:
-                self.client_socket.sendall(message.encode())
-                print(f"[MovementClass] Sent: {message.strip()}")
+                self.client_socket.sendall(message)
+                print(f"[MovementClass] Sent: {message.decode().strip()}")
             except Exception as e:
                 print(f"[MovementClass] Error sending command '{command}': {e}")
+                self.acks.abandon(pending)
                 return False
 
-            self.client_socket.settimeout(5.0)
             try:
-                ack = self.client_socket.recv(1024).decode().strip()
-                print(f"[MovementClass] Received ack: {ack}")
-                expected_ack = f"DONE,{command.upper()},{param}"
-                if ack == expected_ack:
+                if self._wait_for(pending, self._ack_timeout(command, param)):
+                    print(f"[MovementClass] Received ack: {pending.reply}")
                     return True
-                else:
-                    print(f"[MovementClass] Unexpected ack. Expected: '{expected_ack}', Got: '{ack}'")
-                    return False
+                expected_ack = f"DONE,{pending.seq},{command.upper()},{param}"
+                print(f"[MovementClass] Unexpected ack. Expected: '{expected_ack}', Got: '{pending.reply}'")
+                return False
             except socket.timeout:
                 print("[MovementClass] Ack timeout.")
                 return False
@@ -142,12 +334,11 @@ class MovementClass:
                 print(f"[MovementClass] Error receiving ack for command '{command}': {e}")
                 return False
             finally:
-                self.client_socket.settimeout(None)
+                self.acks.abandon(pending)
 
     def _recv_line(self):
         try:
-            response = self.client_socket.recv(1024).decode().strip()
-            return response
+            return self._readline()
         except Exception as e:
             print(f"[MovementClass] Error receiving line: {e}")
             return None
@@ -351,22 +542,20 @@ class MovementClass:
             print("[MovementClass] Not connected to Pico. Cannot send status message.")
             return False
 
+        pending = None
         with self.socket_lock:
             try:
                 # Send the status message
                 self.client_socket.sendall(f"STATUS,{message}\n".encode())
                 print(f"[MovementClass] Sent status message: {message}")
-
-                # Set a timeout for the acknowledgment response
-                self.client_socket.settimeout(5.0)
+                pending = self.acks.register(None, "STATUS", [message])
 
                 # Wait for acknowledgment
-                ack = self.client_socket.recv(1024).decode().strip()
-                if ack == "Taken":
+                if self._wait_for(pending, self.ack_timeout):
                     print(f"[MovementClass] Status message '{message}' acknowledged by Pico.")
                     return True
                 else:
-                    print(f"[MovementClass] Unexpected acknowledgment: {ack}")
+                    print(f"[MovementClass] Unexpected acknowledgment: {pending.reply}")
                     return False
 
             except socket.timeout:
@@ -376,6 +565,8 @@ class MovementClass:
                 print(f"[MovementClass] Error sending status message: {e}")
                 return False
             finally:
-                # Reset timeout to None for regular operations
-                self.client_socket.settimeout(None)
+                if pending is not None:
+                    # "Taken" carries no seq; a late one is swallowed by
+                    # this entry instead of answering the next STATUS
+                    self.acks.abandon(pending)
 
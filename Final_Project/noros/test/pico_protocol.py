@@ -0,0 +1,236 @@
+"""
+Line protocol between MovementClass and the Pico server (main.py).
+
+Sequenced commands carry an id so several can be in flight at once:
+
+    host -> pico   <seq>,<COMMAND>[,<param>...]\n      e.g. 7,FORWARD,1
+    pico -> host   DONE,<seq>,<COMMAND>[,<param>...]\n  after the motion finished
+                   ERROR,<seq>,<reason>\n               rejected, failed or cancelled
+
+The Pico runs sequenced commands from a queue in arrival order, so DONEs come
+back in the order the commands were sent. STOP skips the queue: it cancels
+everything still waiting (ERROR,<seq>,CANCELLED for each), stops the motors
+and is acknowledged itself.
+
+Lines without a leading id are the old stop-and-wait commands and still get
+the old replies (DONE,<COMMAND>,<param>).
+
+    host -> pico   VEL,<v>,<w>\n    forward speed in cells/s, turn rate in deg/s
+
+VEL is a velocity setpoint for closed-loop driving (visual_servo.py): it is
+neither queued nor answered, each one replaces the last, and the Pico stops
+the motors by itself when they stop arriving. It is ignored while queued
+commands are running.
+
+main.py runs on MicroPython and keeps its own copy of the parsing; this
+module is for the host side and fake_pico.py.
+
+TCP does not keep message boundaries: one recv() can hold several acks or
+half of one. LineFramer rebuilds the lines and AckDispatcher matches each
+reply to the command it answers, the same way for the blocking socket in
+MovementClass and for asyncio streams (dispatch_replies).
+"""
+from collections import deque
+
+COMMANDS = ("FORWARD", "BACK", "TURN", "ARC", "STOP", "DANCE", "CORRECTION", "VEL")
+VEL_TIMEOUT = 0.3  # s without a VEL before the Pico stops (VEL_TIMEOUT_MS in main.py)
+QUEUE_SIZE = 8  # commands the Pico accepts before answering ERROR,<seq>,QUEUE_FULL
+
+
+def format_command(seq, command, *params):
+    """One sequenced command line, as bytes ready for sendall."""
+    fields = [str(seq), command.upper()] + [str(p) for p in params]
+    return (",".join(fields) + "\n").encode()
+
+
+def parse_command(line):
+    """
+    Splits a received command line into (seq, command, params). seq is None
+    for an old-style line without an id.
+    """
+    tokens = line.strip().split(",")
+    seq = None
+    if tokens[0].isdigit():
+        seq = int(tokens[0])
+        tokens = tokens[1:]
+    command = tokens[0].upper() if tokens else ""
+    return seq, command, tokens[1:]
+
+
+def format_reply(seq, kind, *fields):
+    """DONE/ERROR reply; seq None gives the old unsequenced form."""
+    head = [kind] if seq is None else [kind, str(seq)]
+    return (",".join(head + [str(f) for f in fields]) + "\n").encode()
+
+
+def format_velocity(v, w):
+    """One VEL setpoint line, as bytes ready for sendall."""
+    return f"VEL,{v:.3f},{w:.1f}\n".encode()
+
+
+def parse_reply(line):
+    """
+    Splits a reply line into (kind, seq, fields). seq is None when the line
+    carries no id (old replies, greetings, "Taken").
+    """
+    tokens = line.strip().split(",")
+    kind = tokens[0]
+    if len(tokens) > 1 and tokens[1].isdigit():
+        return kind, int(tokens[1]), tokens[2:]
+    return kind, None, tokens[1:]
+
+
+def same_params(expected, received):
+    """Compares parameter lists, numbers by value (so -90 matches -90.0)."""
+    if len(expected) != len(received):
+        return False
+    for a, b in zip(expected, received):
+        a, b = str(a).strip(), str(b).strip()
+        try:
+            if float(a) != float(b):
+                return False
+        except ValueError:
+            if a.upper() != b.upper():
+                return False
+    return True
+
+
+class LineFramer:
+    """
+    Turns a byte stream into lines. feed() takes whatever recv()/read()
+    returned and gives back the complete lines in it (decoded, stripped,
+    empty ones dropped); a trailing partial line waits for the next feed.
+    """
+
+    def __init__(self, max_line=4096):
+        self.max_line = max_line
+        self.buffer = b""
+
+    def feed(self, data):
+        self.buffer += data
+        if b"\n" not in self.buffer:
+            if len(self.buffer) > self.max_line:
+                print(f"[LineFramer] Dropping {len(self.buffer)} bytes without a newline.")
+                self.buffer = b""
+            return []
+        *lines, self.buffer = self.buffer.split(b"\n")
+        return [text for text in (line.decode(errors="replace").strip() for line in lines) if text]
+
+    def reset(self):
+        self.buffer = b""
+
+
+class PendingCommand:
+    """A command waiting for its reply. ok/reply are filled in by AckDispatcher."""
+
+    def __init__(self, seq, command, params, future=None):
+        self.seq = seq
+        self.command = command
+        self.params = params
+        self.future = future  # optional asyncio future, resolved with this object
+        self.ok = None
+        self.reply = None
+        self.abandoned = False  # timed out; its late reply is absorbed (AckDispatcher.abandon)
+
+    @property
+    def done(self):
+        return self.ok is not None
+
+
+class AckDispatcher:
+    """
+    Matches reply lines to outstanding commands: sequenced replies by seq,
+    old-style replies (DONE,<COMMAND>,<param> and the "Taken" answer to
+    STATUS) to the oldest unsequenced command, in order.
+    """
+
+    def __init__(self):
+        self.by_seq = {}
+        self.unsequenced = deque()
+
+    def register(self, seq, command, params=(), future=None):
+        # Composite params like CORRECTION's "FORWARD,5" come back as separate fields
+        fields = [field for p in params for field in str(p).split(",")]
+        pending = PendingCommand(seq, command.upper(), fields, future)
+        if seq is None:
+            self.unsequenced.append(pending)
+        else:
+            self.by_seq[seq] = pending
+        return pending
+
+    def outstanding(self):
+        return len(self.by_seq) + len(self.unsequenced)
+
+    def dispatch(self, line):
+        """
+        Resolves the command this line answers and returns it, or returns
+        None for lines that answer nothing outstanding (greetings, stale
+        replies, the late reply of an abandoned command).
+        """
+        kind, seq, fields = parse_reply(line)
+        if seq is not None and seq in self.by_seq:
+            pending = self.by_seq.pop(seq)
+            ok = kind == "DONE"
+        elif seq is None and self.unsequenced and kind in ("DONE", "ERROR", "Taken"):
+            pending = self.unsequenced.popleft()
+            if pending.abandoned:
+                return None
+            if pending.command == "STATUS":
+                ok = kind == "Taken"
+            else:
+                ok = (kind == "DONE" and bool(fields) and fields[0].upper() == pending.command
+                      and same_params(pending.params, fields[1:]))
+        else:
+            return None
+        pending.ok = ok
+        pending.reply = line
+        if pending.future is not None and not pending.future.done():
+            pending.future.set_result(pending)
+        return pending
+
+    def fail(self, pending, reason):
+        """Resolves one command as failed without a reply (cancelled before sending, ...)."""
+        if pending.seq is not None:
+            self.by_seq.pop(pending.seq, None)
+        elif pending in self.unsequenced:
+            self.unsequenced.remove(pending)
+        pending.ok = False
+        pending.reply = reason
+        if pending.future is not None and not pending.future.done():
+            pending.future.set_result(pending)
+
+    def abandon(self, pending):
+        """
+        Gives up on a command that was not answered in time. A sequenced one
+        is dropped, so its late reply matches nothing. An unsequenced one
+        keeps its place in the queue and swallows its late reply, which would
+        otherwise be taken for the answer to the next unsequenced command.
+        """
+        if pending.done:
+            return
+        if pending.seq is not None:
+            self.by_seq.pop(pending.seq, None)
+        else:
+            pending.abandoned = True
+
+    def fail_all(self, reason):
+        """Resolves every outstanding command as failed (connection lost)."""
+        for pending in list(self.by_seq.values()) + list(self.unsequenced):
+            self.fail(pending, reason)
+
+
+async def dispatch_replies(reader, dispatcher, framer=None, on_line=None):
+    """
+    Reads an asyncio StreamReader until EOF and feeds every reply line to
+    the dispatcher; lines that answer nothing go to on_line if given.
+    Outstanding commands are failed when the connection closes.
+    """
+    framer = framer or LineFramer()
+    while True:
+        data = await reader.read(1024)
+        if not data:
+            break
+        for line in framer.feed(data):
+            if dispatcher.dispatch(line) is None and on_line is not None:
+                on_line(line)
+    dispatcher.fail_all("CONNECTION_CLOSED")
@@ -0,0 +1,151 @@
+"""
+Closed-loop path following from camera poses.
+
+Instead of TURN/FORWARD steps each followed by camera checks, the host
+streams velocity setpoints (VEL,<v>,<w>, see pico_protocol.py) at camera
+rate and the Pico's velocity_task keeps the wheels at them. Every fresh pose
+gives one setpoint:
+
+  - pure pursuit picks a target point on the path: the first cell centre
+    further than `lookahead` cells from the robot, so corners are cut into
+    arcs instead of stop-turn-go;
+  - a PID on the bearing error to that point gives the turn rate;
+  - the forward speed drops with the bearing error (turning on the spot when
+    the target is behind) and near the goal.
+
+At the last cell the robot turns on the spot to the path's final direction.
+If poses stop arriving the host sends a zero setpoint; the Pico's watchdog
+stops the motors anyway when the setpoints stop.
+
+    mover = AsyncMovementClass(pico_ip, detector=detector)
+    await mover.connect()
+    await VisualServo(mover).follow(path)
+"""
+import math
+import time
+
+
+class PID:
+    def __init__(self, kp, ki=0.0, kd=0.0, limit=None):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.limit = limit  # output clamp (and anti-windup bound for the integral term)
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.last_error = None
+
+    def update(self, error, dt):
+        derivative = 0.0
+        if dt > 0:
+            self.integral += error * dt
+            if self.limit is not None and self.ki:
+                bound = self.limit / self.ki
+                self.integral = max(-bound, min(bound, self.integral))
+            if self.last_error is not None:
+                derivative = (error - self.last_error) / dt
+        self.last_error = error
+        output = self.kp * error + self.ki * self.integral + self.kd * derivative
+        if self.limit is not None:
+            output = max(-self.limit, min(self.limit, output))
+        return output
+
+
+def wrap_angle(deg):
+    """Angle in [-180, 180)."""
+    return (deg + 180) % 360 - 180
+
+
+class VisualServo:
+    def __init__(self, mover, cell_size=None):
+        self.mover = mover  # connected AsyncMovementClass with a detector
+        self.cell_size = cell_size or getattr(mover.detector, "cell_size", 135)  # detector units
+
+        self.lookahead = 0.6          # cells
+        self.max_speed = 1.0          # cells/s
+        self.min_speed = 0.15         # cells/s while still approaching the goal
+        self.max_turn_rate = 180.0    # deg/s
+        self.slowdown_distance = 1.0  # cells before the goal where the speed ramps down
+        self.goal_tolerance = mover.position_threshold  # detector units
+        self.timeout = 60.0           # s for the whole path
+        self.heading_pid = PID(kp=4.0, ki=0.5, kd=0.1, limit=self.max_turn_rate)
+
+    def waypoints(self, path):
+        """Cell centres along a (row, col, direction) path, None if one is unknown."""
+        points = []
+        for row, col, _ in path:
+            centre = self.mover.detector.cell_centers.get((row, col))
+            if centre is None:
+                print(f"[VisualServo] Expected cell center not found for cell {(row, col)}")
+                return None
+            if not points or points[-1] != centre:
+                points.append(centre)
+        return points
+
+    def lookahead_point(self, points, index, x, y):
+        """Skips the waypoints already within the lookahead radius; returns (index, target)."""
+        radius = self.lookahead * self.cell_size
+        while index < len(points) - 1 and math.hypot(points[index][0] - x, points[index][1] - y) <= radius:
+            index += 1
+        return index, points[index]
+
+    def setpoint(self, pose, points, index, dt):
+        """(index, v, w, heading_error) for one pose while driving to the goal."""
+        x, y, angle = pose
+        index, (tx, ty) = self.lookahead_point(points, index, x, y)
+        error = wrap_angle(math.degrees(math.atan2(ty - y, tx - x)) - angle)
+        goal_distance = math.hypot(points[-1][0] - x, points[-1][1] - y) / self.cell_size
+        speed = self.max_speed * min(1.0, goal_distance / self.slowdown_distance)
+        v = max(speed, self.min_speed) * max(0.0, math.cos(math.radians(error)))
+        return index, v, self.heading_pid.update(error, dt), error
+
+    async def follow(self, path):
+        """
+        Drives along the path until the robot is within goal_tolerance of the
+        last cell centre and within orientation_threshold of its direction.
+        Returns True on success, False on a lost pose or timeout.
+        """
+        if not path:
+            print("[VisualServo] Path is empty.")
+            return False
+        points = self.waypoints(path)
+        if points is None:
+            return False
+
+        final_angle = path[-1][2]
+        self.heading_pid.reset()
+        aligning = False
+        index = 0
+        last_time = None
+        deadline = time.perf_counter() + self.timeout
+        try:
+            while time.perf_counter() < deadline:
+                pose = await self.mover.next_pose(self.mover.pose_time)
+                if pose is None:
+                    print("[VisualServo] Lost the robot pose.")
+                    return False
+                now = self.mover.pose_time
+                dt = now - last_time if last_time is not None else 0.0
+                last_time = now
+
+                x, y, angle = pose
+                if not aligning and math.hypot(points[-1][0] - x, points[-1][1] - y) <= self.goal_tolerance:
+                    aligning = True
+                    self.heading_pid.reset()
+                if aligning:
+                    error = wrap_angle(final_angle - angle)
+                    if abs(error) <= self.mover.orientation_threshold:
+                        self.mover.expected_angle = final_angle
+                        self.mover.current_step_index = len(path) - 1
+                        print("[VisualServo] Reached the end of the path.")
+                        return True
+                    v, w = 0.0, self.heading_pid.update(error, dt)
+                else:
+                    index, v, w, _ = self.setpoint(pose, points, index, dt)
+                await self.mover.send_velocity(v, w)
+            print("[VisualServo] Timed out following the path.")
+            return False
+        finally:
+            await self.mover.send_velocity(0.0, 0.0)
@@ -0,0 +1,207 @@
+import threading
+import time
+
+
+class StageStats:
+    """
+    Latency and frame-age counters for one pipeline stage.
+    latency = how long the stage took on its last frame.
+    frame_age = how old that frame was (since capture) when the stage finished it
+                (always 0 for the capture stage itself).
+    Averages are exponential moving averages.
+    """
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.frames = 0
+        self.latency_ms = 0.0
+        self.avg_latency_ms = 0.0
+        self.frame_age_ms = 0.0
+        self.avg_frame_age_ms = 0.0
+
+    def record(self, latency_s, frame_age_s):
+        self.latency_ms = latency_s * 1000.0
+        self.frame_age_ms = frame_age_s * 1000.0
+        if self.frames == 0:
+            self.avg_latency_ms = self.latency_ms
+            self.avg_frame_age_ms = self.frame_age_ms
+        else:
+            a = self.alpha
+            self.avg_latency_ms += a * (self.latency_ms - self.avg_latency_ms)
+            self.avg_frame_age_ms += a * (self.frame_age_ms - self.avg_frame_age_ms)
+        self.frames += 1
+
+    def as_dict(self):
+        return {
+            "frames": self.frames,
+            "latency_ms": self.latency_ms,
+            "avg_latency_ms": self.avg_latency_ms,
+            "frame_age_ms": self.frame_age_ms,
+            "avg_frame_age_ms": self.avg_frame_age_ms,
+        }
+
+
+class PipelineResult:
+    """Snapshot of one processed frame, handed from the worker to consumers."""
+
+    def __init__(self, frame_id, capture_time, done_time, display_frame,
+                 robot_position, robot_cell_label, other_markers, other_markers_cells,
+                 detection=None):
+        self.frame_id = frame_id
+        self.capture_time = capture_time
+        self.done_time = done_time
+        self.display_frame = display_frame
+        self.robot_position = robot_position
+        self.robot_cell_label = robot_cell_label
+        self.other_markers = other_markers
+        self.other_markers_cells = other_markers_cells
+        self.detection = detection    # the detector's DetectionResult
+
+    def age(self):
+        """Seconds since this frame was captured."""
+        return time.perf_counter() - self.capture_time
+
+
+class VisionPipeline:
+    """
+    Runs an ArucoGridDetector off the Tk thread in three stages:
+
+      1. capture thread  - reads detector.cap as fast as the camera allows and
+                           keeps only the newest frame (older ones are dropped)
+      2. process worker  - runs detector.process_frame on the newest frame
+      3. handoff         - the finished PipelineResult goes into a double
+                           buffer; consumers call get_latest() without locking
+
+    Usage:
+        pipeline = VisionPipeline(detector)
+        pipeline.start()
+        result = pipeline.get_latest()   # None until the first frame is done
+        pipeline.stop()
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+
+        # Latest-frame slot (capture -> process). Guarded by a Condition so the
+        # worker can sleep until a new frame arrives.
+        self._frame_cond = threading.Condition()
+        self._latest_frame = None    # (frame_id, capture_time, frame)
+        self._next_frame_id = 0
+
+        # Result double buffer (process -> consumers). The worker writes the
+        # back slot, then flips _front; a reference assignment is atomic in
+        # CPython so readers never see a half-written result.
+        self._buffers = [None, None]
+        self._front = 0
+
+        self.capture_stats = StageStats()
+        self.process_stats = StageStats()
+        self.handoff_stats = StageStats()
+        self.dropped_frames = 0
+        self.read_failures = 0
+        self.process_errors = 0
+
+        self._running = False
+        self._capture_thread = None
+        self._process_thread = None
+
+    # ======= Control =======
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._process_thread = threading.Thread(target=self._process_loop, daemon=True)
+        self._capture_thread.start()
+        self._process_thread.start()
+
+    def stop(self):
+        self._running = False
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        for t in (self._capture_thread, self._process_thread):
+            if t is not None:
+                t.join(timeout=2.0)
+        self._capture_thread = None
+        self._process_thread = None
+
+    def is_running(self):
+        return self._running
+
+    # ======= Stage 1: capture =======
+    def _capture_loop(self):
+        while self._running:
+            t0 = time.perf_counter()
+            ret, frame = self.detector.cap.read()
+            t1 = time.perf_counter()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+            self.capture_stats.record(t1 - t0, 0.0)
+
+            with self._frame_cond:
+                if self._latest_frame is not None:
+                    # The worker never picked up the previous frame
+                    self.dropped_frames += 1
+                self._latest_frame = (self._next_frame_id, t1, frame)
+                self._next_frame_id += 1
+                self._frame_cond.notify()
+
+    # ======= Stage 2: process =======
+    def _process_loop(self):
+        while self._running:
+            with self._frame_cond:
+                while self._latest_frame is None and self._running:
+                    self._frame_cond.wait(timeout=0.5)
+                if not self._running:
+                    break
+                frame_id, capture_time, frame = self._latest_frame
+                self._latest_frame = None
+
+            t0 = time.perf_counter()
+            try:
+                detection = self.detector.process_frame(frame)
+            except Exception as e:
+                # One bad frame must not end the worker; the last result stays published
+                self.process_errors += 1
+                print(f"[VisionPipeline] Frame {frame_id} failed: {e!r}")
+                continue
+            t1 = time.perf_counter()
+            self.process_stats.record(t1 - t0, t1 - capture_time)
+
+            # display_frame is the detector's last rendered frame; with
+            # render_every > 1 it can be older than the detection
+            result = PipelineResult(
+                frame_id, capture_time, t1,
+                self.detector.get_frame(),
+                detection.robot_position,
+                detection.robot_cell_label,
+                detection.other_markers,
+                detection.other_markers_cells,
+                detection,
+            )
+
+            # Stage 3: handoff
+            back = 1 - self._front
+            self._buffers[back] = result
+            self._front = back
+
+    # ======= Consumers =======
+    def get_latest(self):
+        """Newest finished PipelineResult, or None if nothing is processed yet."""
+        result = self._buffers[self._front]
+        if result is not None:
+            self.handoff_stats.record(time.perf_counter() - result.done_time, result.age())
+        return result
+
+    def get_stats(self):
+        """Per-stage latency / frame-age counters, e.g. for a status label."""
+        return {
+            "capture": self.capture_stats.as_dict(),
+            "process": self.process_stats.as_dict(),
+            "handoff": self.handoff_stats.as_dict(),
+            "dropped_frames": self.dropped_frames,
+            "read_failures": self.read_failures,
+            "process_errors": self.process_errors,
+        }
@@ -1,6 +1,7 @@
 import pygame
 import random
-import heapq
+
+from reward_search import a_star
 
 # Constants
 MARGIN = 2
@@ -50,46 +51,6 @@ def generate_food(grid, n_foods):
                 break
     return food_objects
 
-# Heuristic function
-def heuristic(node, target):
-    return abs(node[0] - target[0]) + abs(node[1] - target[1])
-
-# A* Pathfinding Algorithm
-def a_star(grid, food_objects, start, target, max_steps):
-    pq = [(0, start, 0, 0, [])]  # (negative_score, current, steps, collected_points, path)
-    visited = set()
-
-    while pq:
-        negative_score, current, steps, collected_points, path = heapq.heappop(pq)
-
-        if steps > max_steps:
-            continue
-
-        if current == target:
-            return visited, path + [current], collected_points, steps
-
-        if current in visited:
-            continue
-
-        visited.add(current)
-        path = path + [current]
-
-        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nr, nc = current[0] + dr, current[1] + dc
-            if 0 <= nr < len(grid) and 0 <= nc < len(grid[0]) and (nr, nc) not in visited:
-                neighbor_points = food_objects[(nr, nc)].points if (nr, nc) in food_objects else 0
-                heapq.heappush(
-                    pq, (
-                        -(collected_points + neighbor_points),
-                        (nr, nc),
-                        steps + 1,
-                        collected_points + neighbor_points,
-                        path
-                    )
-                )
-
-    return visited, [], None, None  # No solution
-
 # Draw the grid
 def draw_grid(grid, food_objects, visited, path, start, target):
     for row in range(len(grid)):
@@ -1,11 +1,11 @@
 import pygame
 import random
-import heapq
-from collections import deque
+import time
+
+from search_algorithms import ALGORITHM_FUNCTIONS, ALGORITHMS
 
 # Constants
 MARGIN = 2  # Margin between cells
-ALGORITHMS = ["BFS", "DFS", "UCS", "Greedy", "A*"]  # Available algorithms
 
 # Colors
 WHITE = (255, 255, 255)
@@ -38,6 +38,8 @@ CELL_HEIGHT = (SCREEN_HEIGHT - 100 - (GRID_ROWS + 1) * MARGIN) // GRID_ROWS
 CELL_SIZE = min(CELL_WIDTH, CELL_HEIGHT)
 GRID_COLS = (SCREEN_WIDTH - MARGIN) // (CELL_SIZE + MARGIN)
 GRID_ROWS = (SCREEN_HEIGHT - 100 - MARGIN) // (CELL_SIZE + MARGIN)
+# Horizontal distance between the algorithm buttons, shrunk to fit the screen
+ALGORITHM_SPACING = min(175, (SCREEN_WIDTH - 190) // len(ALGORITHMS))
 
 class Food:
     def __init__(self, shape, color, position):
@@ -46,9 +48,10 @@ class Food:
         self.position = position
         self.points = 0
 
-def draw_ui(selected_algorithm):
+def draw_ui(selected_algorithm, result=None):
     """
     Draws the algorithm selection UI at the bottom of the screen.
+    result is (algorithm, nodes expanded, path length, ms) of the last search.
     """
     ui_start_y = SCREEN_HEIGHT - 90  # UI panel's vertical start position
     screen.fill(WHITE, (0, SCREEN_HEIGHT - 100, SCREEN_WIDTH, 100))  # Clear UI area
@@ -57,10 +60,15 @@ def draw_ui(selected_algorithm):
     for i, algorithm in enumerate(ALGORITHMS):
         # Highlight the selected algorithm
         color = BLACK if algorithm == selected_algorithm else GRAY
-        pygame.draw.circle(screen, color, (175 + i * 175, ui_start_y + 20), 10)
+        pygame.draw.circle(screen, color, (175 + i * ALGORITHM_SPACING, ui_start_y + 20), 10)
         label = font.render(algorithm, True, TEXT_COLOR)
-        screen.blit(label, (190 + i * 175, ui_start_y + 10))
-    pygame.display.flip()
+        screen.blit(label, (190 + i * ALGORITHM_SPACING, ui_start_y + 10))
+    if result:
+        algorithm, expanded, path_length, elapsed_ms = result
+        text = font.render(f"{algorithm}: {expanded} nodes expanded, path length {path_length}, "
+                           f"{elapsed_ms:.2f} ms", True, TEXT_COLOR)
+        screen.blit(text, (10, ui_start_y + 45))
+    pygame.display.update(pygame.Rect(0, SCREEN_HEIGHT - 100, SCREEN_WIDTH, 100))
 
 
 def generate_grid():
@@ -81,97 +89,107 @@ def generate_grid():
     return grid, food_objects
 
 
-def neighbors(node):
-    """
-    Returns valid neighbors (adjacent cells) of a node in the grid.
-    """
-    row, col = node
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Right, Down, Left, Up
-    result = []
-    for dr, dc in directions:
-        r, c = row + dr, col + dc
-        if 0 <= r < GRID_ROWS and 0 <= c < GRID_COLS and grid[r][c] == 0:
-            result.append((r, c))
-    return result
-
-
-def update_frame(grid,foods, start, target, visited=None, path=None):
-    """
-    Updates the grid display, highlighting the visited nodes, the solution path, and redraws grid lines.
-    """
-    screen.fill(WHITE)  # Clear the screen to redraw
-
-    for row in range(GRID_ROWS):
-        for col in range(GRID_COLS):
-            # Determine cell color
-            #color = GRAY if grid[row][col] == 1 else WHITE  # Obstacle or empty
-            color = WHITE if grid[row][col] == 1 else WHITE  # Obstacle or empty
-            if path and (row, col) in path:
-                color = PATH_COLOR  # Highlight solution path
-            elif visited and (row, col) in visited:
-                color = VISITED_COLOR  # Highlight visited cells
-            if (row, col) == start:
-                color = START_COLOR  # Start node
-            elif (row, col) == target:
-                color = TARGET_COLOR  # Target node
-            
-            # Draw the cell rectangle
-            rect = pygame.Rect(
-                col * (CELL_SIZE + MARGIN) + MARGIN,
-                row * (CELL_SIZE + MARGIN) + MARGIN,
-                CELL_SIZE,
-                CELL_SIZE,
-            )
-            pygame.draw.rect(screen, color, rect)
-
-    # Draw grid lines to ensure visibility
+# update_frame keeps the static part of the grid (white cells, grid lines and
+# foods) in a cached background surface and only redraws the cells whose
+# color changed since the last frame.
+background = None
+background_key = None  # foods the background was drawn with; None forces a full redraw
+cell_colors = {}  # (row, col) -> highlight color currently on screen
+
+
+def cell_rect(row, col):
+    return pygame.Rect(
+        col * (CELL_SIZE + MARGIN) + MARGIN,
+        row * (CELL_SIZE + MARGIN) + MARGIN,
+        CELL_SIZE,
+        CELL_SIZE,
+    )
+
+
+def draw_food(surface, food):
+    row, col = food.position
+    rect = cell_rect(row, col)
+    if food.shape == "circle":
+        pygame.draw.circle(surface, food.color, rect.center, CELL_SIZE // 2)
+    elif food.shape == "square":
+        pygame.draw.rect(surface, food.color, rect)
+    elif food.shape == "triangle":
+        pygame.draw.polygon(surface, food.color,
+                            [(rect.left + CELL_SIZE // 2, rect.top),
+                             (rect.left, rect.top + CELL_SIZE),
+                             (rect.left + CELL_SIZE, rect.top + CELL_SIZE)])
+
+
+def build_background(foods):
+    """Grid area with every cell empty: white cells, grid lines and foods."""
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT - 100))
+    surface.fill(WHITE)
     for row in range(GRID_ROWS + 1):
         pygame.draw.line(
-            screen,
+            surface,
             BLACK,
             (MARGIN, row * (CELL_SIZE + MARGIN)),
             (GRID_COLS * (CELL_SIZE + MARGIN), row * (CELL_SIZE + MARGIN))
         )
     for col in range(GRID_COLS + 1):
         pygame.draw.line(
-            screen,
+            surface,
             BLACK,
             (col * (CELL_SIZE + MARGIN), MARGIN),
             (col * (CELL_SIZE + MARGIN), GRID_ROWS * (CELL_SIZE + MARGIN))
         )
-
     for food in foods.values():
-        col = food.position[1]
-        row = food.position[0]
-        if food.shape == "circle":
-            pygame.draw.circle(
-                screen, food.color,
-                (col * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2,
-                 row * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2),
-                 CELL_SIZE // 2
-            )
-
-        elif food.shape == "square":
-            pygame.draw.rect(
-                screen, food.color,
-                pygame.Rect(
-                    col * (CELL_SIZE + MARGIN) + MARGIN,
-                    row * (CELL_SIZE + MARGIN) + MARGIN,
-                    CELL_SIZE,
-                    CELL_SIZE,
-                )
-            )
-        elif food.shape == "triangle":
-            pygame.draw.polygon(
-                screen, food.color,
-                [(col * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE // 2, row * (CELL_SIZE + MARGIN) + MARGIN),
-                 (col * (CELL_SIZE + MARGIN) + MARGIN, row * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE),
-                 (col * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE, row * (CELL_SIZE + MARGIN) + MARGIN + CELL_SIZE)]
-            )
-
-    pygame.display.flip()  # Update the entire display
+        draw_food(surface, food)
+    return surface
 
 
+def update_frame(grid,foods, start, target, visited=None, path=None):
+    """
+    Updates the grid display, highlighting the visited nodes, the solution path, and redraws grid lines.
+    """
+    global background, background_key, cell_colors
+
+    # Highlight per cell; later entries win, same priority as before
+    colors = {}
+    for cell in visited or ():
+        colors[cell] = VISITED_COLOR
+    for cell in path or ():
+        colors[cell] = PATH_COLOR
+    if target:
+        colors[target] = TARGET_COLOR
+    if start:
+        colors[start] = START_COLOR
+
+    key = frozenset((position, food.shape, food.color) for position, food in foods.items())
+    if background is None or key != background_key:
+        background = build_background(foods)
+        background_key = key
+        screen.blit(background, (0, 0))
+        for (row, col), color in colors.items():
+            rect = cell_rect(row, col)
+            screen.fill(color, rect)
+            if (row, col) in foods:
+                draw_food(screen, foods[(row, col)])
+        cell_colors = colors
+        pygame.display.update(background.get_rect())
+        return
+
+    dirty = []
+    for cell in set(colors) | set(cell_colors):
+        color = colors.get(cell)
+        if color == cell_colors.get(cell):
+            continue
+        rect = cell_rect(*cell)
+        screen.blit(background, rect, rect)  # back to the empty cell, food included
+        if color:
+            screen.fill(color, rect)
+            if cell in foods:
+                draw_food(screen, foods[cell])
+        dirty.append(rect)
+    cell_colors = colors
+    if dirty:
+        pygame.display.update(dirty)
+
 
 def get_selected_algorithm(pos):
     """
@@ -179,7 +197,7 @@ def get_selected_algorithm(pos):
     """
     ui_start_y = SCREEN_HEIGHT - 90
     for i, algorithm in enumerate(ALGORITHMS):
-        center_x, center_y = 175 + i * 175, ui_start_y + 20
+        center_x, center_y = 175 + i * ALGORITHM_SPACING, ui_start_y + 20
         if (pos[0] - center_x) ** 2 + (pos[1] - center_y) ** 2 <= 100:  # Inside circle
             return algorithm
     return None
@@ -199,133 +217,12 @@ def show_no_solution_message():
     pygame.display.flip()
 
     # Restart the game
-    global grid
+    global grid, background_key
+    background_key = None  # the message covered the grid; redraw all of it next frame
     grid = generate_grid()[0]  # Regenerate grid
     pygame.time.wait(2000)  # Pause briefly before resuming
 
 
-### Pathfinding Algorithms ###
-
-def bfs(grid, start, target):
-    """Breadth-First Search."""
-    queue = deque([start])
-    visited = set([start])
-    parent = {}
-
-    while queue:
-        current = queue.popleft()
-        if current == target:
-            return visited, reconstruct_path(parent, start, target), True
-        for neighbor in neighbors(current):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                parent[neighbor] = current
-                queue.append(neighbor)
-    return visited, [], False  # No solution found
-
-
-def dfs(grid, start, target):
-    """Depth-First Search."""
-    stack = [start]
-    visited = set([start])
-    parent = {}
-
-    while stack:
-        current = stack.pop()
-        if current == target:
-            return visited, reconstruct_path(parent, start, target), True
-        for neighbor in neighbors(current):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                parent[neighbor] = current
-                stack.append(neighbor)
-    return visited, [], False  # No solution found
-
-
-def ucs(grid, start, target):
-    """Uniform Cost Search."""
-    pq = [(0, start)]  # Priority queue with cost and node
-    visited = set()
-    parent = {}
-    cost = {start: 0}
-
-    while pq:
-        current_cost, current = heapq.heappop(pq)
-        if current in visited:
-            continue
-        visited.add(current)
-        if current == target:
-            return visited, reconstruct_path(parent, start, target), True
-        for neighbor in neighbors(current):
-            new_cost = current_cost + 1  # All edges have uniform cost
-            if neighbor not in cost or new_cost < cost[neighbor]:
-                cost[neighbor] = new_cost
-                parent[neighbor] = current
-                heapq.heappush(pq, (new_cost, neighbor))
-    return visited, [], False  # No solution found
-
-
-def greedy(grid, start, target):
-    """Greedy Best-First Search."""
-    pq = [(heuristic(start, target), start)]
-    visited = set()
-    parent = {}
-
-    while pq:
-        _, current = heapq.heappop(pq)
-        if current in visited:
-            continue
-        visited.add(current)
-        if current == target:
-            return visited, reconstruct_path(parent, start, target), True
-        for neighbor in neighbors(current):
-            if neighbor not in visited:
-                parent[neighbor] = current
-                heapq.heappush(pq, (heuristic(neighbor, target), neighbor))
-    return visited, [], False  # No solution found
-
-
-def a_star(grid, start, target):
-    """A* Search."""
-    pq = [(heuristic(start, target), 0, start)]  # (f, g, node)
-    visited = set()
-    parent = {}
-    cost = {start: 0}
-
-    while pq:
-        _, current_cost, current = heapq.heappop(pq)
-        if current in visited:
-            continue
-        visited.add(current)
-        if current == target:
-            return visited, reconstruct_path(parent, start, target), True
-        for neighbor in neighbors(current):
-            new_cost = current_cost + 1
-            if neighbor not in cost or new_cost < cost[neighbor]:
-                cost[neighbor] = new_cost
-                parent[neighbor] = current
-                heapq.heappush(pq, (new_cost + heuristic(neighbor, target), new_cost, neighbor))
-    return visited, [], False  # No solution found
-
-
-def heuristic(node, target):
-    """Manhattan Distance Heuristic."""
-    return abs(node[0] - target[0]) + abs(node[1] - target[1])
-
-
-def reconstruct_path(parent, start, target):
-    """Reconstructs the path from start to target using the parent dictionary."""
-    path = []
-    current = target
-    while current != start:
-        path.append(current)
-        current = parent.get(current)
-        if current is None:
-            return []  # No path exists
-    path.append(start)
-    return path[::-1]  # Reverse the path
-
-
 # Main Function
 def main():
     global grid
@@ -333,13 +230,14 @@ def main():
     start, target = None, None  # Start and target positions
     selected_algorithm = None  # No algorithm selected initially
     visited, path = None, None  # Tracking visited nodes and the solution path
+    result = None  # (algorithm, nodes expanded, path length, ms) of the last search
     running = True
     needs_update = True  # Initial update to draw the grid and UI
 
     while running:
         if needs_update:
             update_frame(grid,foods, start, target, visited, path)  # Update grid visualization
-            draw_ui(selected_algorithm)  # Update algorithm selection UI
+            draw_ui(selected_algorithm, result)  # Update algorithm selection UI
             needs_update = False  # Reset the update flag
 
         for event in pygame.event.get():
@@ -348,7 +246,7 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:  # Reset the grid
                     grid, foods = generate_grid()
-                    start, target, visited, path = None, None, None, None
+                    start, target, visited, path, result = None, None, None, None, None
                     needs_update = True  # Trigger UI update
                 elif event.key == pygame.K_ESCAPE:  # Exit the program
                     running = False
@@ -372,16 +270,13 @@ def main():
 
             elif event.type == pygame.MOUSEBUTTONUP:
                 if selected_algorithm and start and target:
-                    if selected_algorithm == "BFS":
-                        visited, path, success = bfs(grid, start, target)
-                    elif selected_algorithm == "DFS":
-                        visited, path, success = dfs(grid, start, target)
-                    elif selected_algorithm == "UCS":
-                        visited, path, success = ucs(grid, start, target)
-                    elif selected_algorithm == "Greedy":
-                        visited, path, success = greedy(grid, start, target)
-                    elif selected_algorithm == "A*":
-                        visited, path, success = a_star(grid, start, target)
+                    t0 = time.perf_counter()
+                    visited, path, success, expanded = ALGORITHM_FUNCTIONS[selected_algorithm](
+                        grid, start, target)
+                    elapsed_ms = (time.perf_counter() - t0) * 1000.0
+                    result = (selected_algorithm, expanded, len(path), elapsed_ms)
+                    print(f"{selected_algorithm}: {expanded} nodes expanded, "
+                          f"path length {len(path)}, {elapsed_ms:.2f} ms")
 
                     if not success:
                         show_no_solution_message()
@@ -0,0 +1,104 @@
+import argparse
+import csv
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from search_algorithms import ALGORITHM_FUNCTIONS, ALGORITHMS
+
+FIELDS = ["rows", "cols", "density", "seed", "algorithm", "success", "expanded",
+          "path_length", "ms"]
+
+
+def make_grid(rows, cols, density, seed):
+    """Seeded random obstacle map; the start and target corners are kept free."""
+    rng = random.Random(seed)
+    grid = [[1 if rng.random() < density else 0 for _ in range(cols)] for _ in range(rows)]
+    start, target = (0, 0), (rows - 1, cols - 1)
+    grid[start[0]][start[1]] = 0
+    grid[target[0]][target[1]] = 0
+    return grid, start, target
+
+
+def run_map(task):
+    """Runs every requested algorithm on one map. Returns one record per algorithm."""
+    rows, cols, density, seed, algorithms = task
+    grid, start, target = make_grid(rows, cols, density, seed)
+    records = []
+    for name in algorithms:
+        t0 = time.perf_counter()
+        _, path, success, expanded = ALGORITHM_FUNCTIONS[name](grid, start, target)
+        ms = (time.perf_counter() - t0) * 1000.0
+        records.append({
+            "rows": rows, "cols": cols, "density": density, "seed": seed,
+            "algorithm": name, "success": success, "expanded": expanded,
+            "path_length": len(path), "ms": round(ms, 3),
+        })
+    return records
+
+
+def print_summary(records, algorithms):
+    """Mean expansions, path length and time per grid size and algorithm."""
+    print(f"{'grid':<10} {'algorithm':<8} {'solved':>7} {'expanded':>10} {'path len':>9} {'ms':>9}")
+    sizes = sorted({(r["rows"], r["cols"]) for r in records})
+    for rows, cols in sizes:
+        for name in algorithms:
+            runs = [r for r in records
+                    if (r["rows"], r["cols"]) == (rows, cols) and r["algorithm"] == name]
+            solved = [r for r in runs if r["success"]]
+            expanded = sum(r["expanded"] for r in runs) / len(runs)
+            ms = sum(r["ms"] for r in runs) / len(runs)
+            length = sum(r["path_length"] for r in solved) / len(solved) if solved else 0.0
+            grid = f"{rows}x{cols}"
+            print(f"{grid:<10} {name:<8} {len(solved):>3}/{len(runs):<3} {expanded:>10.0f} "
+                  f"{length:>9.1f} {ms:>9.2f}")
+
+
+def parse_size(text):
+    rows, cols = text.lower().split("x")
+    return int(rows), int(cols)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the SnakeSearch algorithms on seeded random maps without pygame.")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[(30, 30), (100, 100), (300, 300)],
+                        help="grid sizes as ROWSxCOLS")
+    parser.add_argument("--density", type=float, default=0.2, help="fraction of cells blocked")
+    parser.add_argument("--seeds", type=int, default=10, help="random maps per grid size")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to spread the maps over (1 runs everything here)")
+    parser.add_argument("--csv", help="write one row per (map, algorithm) to this file")
+    parser.add_argument("--json", help="write the same records as a JSON list to this file")
+    args = parser.parse_args()
+
+    tasks = [(rows, cols, args.density, seed, args.algorithms)
+             for rows, cols in args.sizes
+             for seed in range(args.first_seed, args.first_seed + args.seeds)]
+    records = []
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for map_records in pool.map(run_map, tasks):
+                records.extend(map_records)
+    else:
+        for task in tasks:
+            records.extend(run_map(task))
+
+    print_summary(records, args.algorithms)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        print(f"Wrote {len(records)} rows to {args.csv}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(records, f, indent=2)
+        print(f"Wrote {len(records)} records to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
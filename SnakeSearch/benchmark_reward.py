@@ -0,0 +1,64 @@
+import argparse
+import random
+import time
+
+from orienteering import solve
+from reward_search import a_star
+
+# Same point values as SHAPE_COLOR_POINTS in Search.py
+FOOD_POINTS = [-2, 1, -4, 3, -6, 5, -8, 7, 9]
+
+
+class Food:
+    def __init__(self, points):
+        self.points = points
+
+
+def make_map(size, n_foods, seed):
+    """Seeded open size x size map with foods placed the way Search.py does."""
+    rng = random.Random(seed)
+    grid = [[0] * size for _ in range(size)]
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    start, target = (0, 0), (size - 1, size - 1)
+    cells = [cell for cell in cells if cell not in (start, target)]
+    foods = {cell: Food(rng.choice(FOOD_POINTS)) for cell in rng.sample(cells, n_foods)}
+    for r, c in foods:
+        grid[r][c] = 1
+    return grid, foods, start, target
+
+
+def timed(function, *args, **kwargs):
+    t0 = time.perf_counter()
+    _, _, points, steps = function(*args, **kwargs)
+    return points, (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the orienteering solver with the reward a_star on seeded maps.")
+    parser.add_argument("--seeds", type=int, default=5, help="maps per configuration")
+    parser.add_argument("--astar-max-foods", type=int, default=40,
+                        help="skip a_star on maps with more foods than this")
+    args = parser.parse_args()
+
+    # (grid size, foods, max_steps)
+    configs = [(10, 8, 24), (20, 20, 50), (30, 30, 70), (50, 60, 110), (100, 200, 230)]
+    print(f"{'map':<16} {'a_star pts':>10} {'ms':>9} | {'solver pts':>10} {'ms':>8} | "
+          f"{'greedy pts':>10} {'ms':>7}")
+    for size, n_foods, max_steps in configs:
+        for seed in range(args.seeds):
+            grid, foods, start, target = make_map(size, n_foods, seed)
+            if n_foods <= args.astar_max_foods:
+                a_points, a_ms = timed(a_star, grid, foods, start, target, max_steps)
+                a_text = f"{a_points!s:>10} {a_ms:>9.1f}"
+            else:
+                a_text = f"{'-':>10} {'-':>9}"
+            s_points, s_ms = timed(solve, grid, foods, start, target, max_steps)
+            g_points, g_ms = timed(solve, grid, foods, start, target, max_steps, max_states=0)
+            label = f"{size}x{size} f{n_foods} s{max_steps}"
+            print(f"{label:<16} {a_text} | {s_points!s:>10} {s_ms:>8.1f} | "
+                  f"{g_points!s:>10} {g_ms:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
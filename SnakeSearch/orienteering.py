@@ -0,0 +1,222 @@
+"""
+Food-collection route planner for the reward game in Search.py, without
+pygame.
+
+The route runs from start to target in at most max_steps moves and picks up
+positive foods on the way. Only the foods matter, so the grid is reduced to
+a small graph: BFS distances between start, target and every positive food,
+with negative-food cells treated as walls so the legs never lose points.
+The food subset and visiting order are then chosen exactly with a bitmask
+DP over food subsets, or with greedy insertion when the DP grows too large.
+"""
+
+MAX_DP_STATES = 100000  # (subset, last food) states before giving up on the exact DP
+
+
+def bfs_distances(grid, source, blocked, max_distance=None):
+    """
+    BFS over the in-bounds cells not in blocked, stopping at max_distance
+    if given. Cells are flat ids r * cols + c; returns (distance, parent)
+    lists with -1 for cells not reached.
+    """
+    rows, cols = len(grid), len(grid[0])
+    distance = [-1] * (rows * cols)
+    parent = [-1] * (rows * cols)
+    for r, c in blocked:
+        distance[r * cols + c] = -2  # never entered, reset below
+    start = source[0] * cols + source[1]
+    distance[start] = 0
+    if max_distance is None:
+        max_distance = rows * cols
+    frontier = [start]
+    depth = 0
+    while frontier and depth < max_distance:
+        depth += 1
+        next_frontier = []
+        for cell in frontier:
+            c = cell % cols
+            for neighbor in (cell - cols, cell + cols,
+                             cell - 1 if c > 0 else -1, cell + 1 if c < cols - 1 else -1):
+                if 0 <= neighbor < rows * cols and distance[neighbor] == -1:
+                    distance[neighbor] = depth
+                    parent[neighbor] = cell
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    for r, c in blocked:
+        if distance[r * cols + c] == -2:
+            distance[r * cols + c] = -1
+    return distance, parent
+
+
+def route_points(path, food_objects):
+    """Points a route actually collects: every food counted once, the start cell not at all."""
+    seen = {path[0]} if path else set()
+    total = 0
+    for cell in path[1:]:
+        if cell not in seen:
+            seen.add(cell)
+            if cell in food_objects:
+                total += food_objects[cell].points
+    return total
+
+
+def solve_exact(dist, values, max_steps, max_states=MAX_DP_STATES):
+    """
+    Bitmask DP over food subsets. Node 0 is the start, 1..n the foods and
+    n + 1 the target. steps[(mask, i)] is the fewest moves that collect
+    exactly the foods in mask and end at food i; only states that can
+    still reach the target within max_steps are kept.
+
+    Returns the best visiting order as a list of food indices (1..n), or
+    None when more than max_states states would be needed.
+    """
+    n = len(values)
+    target = n + 1
+    best_value, best_state = 0, None
+    layer = {}
+    for i in range(1, n + 1):
+        if dist[0][i] + dist[i][target] <= max_steps:
+            layer[(1 << (i - 1), i)] = (dist[0][i], values[i - 1], None)
+    came_from = {}
+    while layer:
+        came_from.update(layer)
+        next_layer = {}
+        for (mask, i), (steps, value, _) in layer.items():
+            if value > best_value:
+                best_value, best_state = value, (mask, i)
+            for j in range(1, n + 1):
+                bit = 1 << (j - 1)
+                if mask & bit:
+                    continue
+                new_steps = steps + dist[i][j]
+                if new_steps + dist[j][target] > max_steps:
+                    continue
+                key = (mask | bit, j)
+                if key not in next_layer:
+                    if len(came_from) + len(next_layer) >= max_states:
+                        return None
+                    next_layer[key] = (new_steps, value + values[j - 1], (mask, i))
+                elif new_steps < next_layer[key][0]:
+                    next_layer[key] = (new_steps, value + values[j - 1], (mask, i))
+        layer = next_layer
+
+    order = []
+    state = best_state
+    while state is not None:
+        order.append(state[1])
+        state = came_from[state][2]
+    order.reverse()
+    return order
+
+
+def route_length(dist, route):
+    return sum(dist[a][b] for a, b in zip(route, route[1:]))
+
+
+def two_opt(dist, route):
+    """Reverses inner segments of the route while that makes it shorter."""
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 2):
+            for j in range(i + 1, len(route) - 1):
+                a, b, c, d = route[i - 1], route[i], route[j], route[j + 1]
+                if dist[a][c] + dist[b][d] < dist[a][b] + dist[c][d]:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    improved = True
+    return route
+
+
+def solve_greedy(dist, values, max_steps):
+    """
+    Cheapest-insertion heuristic: keep inserting the food with the best
+    points per extra move while the route still fits in max_steps. When
+    nothing fits any more, 2-opt shortens the route and insertion resumes
+    with the moves it saved.
+    """
+    n = len(values)
+    target = n + 1
+    route = [0, target]
+    remaining = set(range(1, n + 1))
+    while True:
+        insert_greedily(dist, values, max_steps, route, remaining)
+        length = route_length(dist, route)
+        two_opt(dist, route)
+        if not remaining or route_length(dist, route) >= length:
+            return route[1:-1]
+
+
+def insert_greedily(dist, values, max_steps, route, remaining):
+    length = route_length(dist, route)
+    while remaining:
+        best = None
+        for j in remaining:
+            for k in range(len(route) - 1):
+                a, b = route[k], route[k + 1]
+                extra = dist[a][j] + dist[j][b] - dist[a][b]
+                if length + extra > max_steps:
+                    continue
+                ratio = values[j - 1] / max(extra, 1)
+                if best is None or ratio > best[0]:
+                    best = (ratio, j, k + 1, extra)
+        if best is None:
+            break
+        _, j, position, extra = best
+        route.insert(position, j)
+        length += extra
+        remaining.discard(j)
+
+
+def solve(grid, food_objects, start, target, max_steps, max_states=MAX_DP_STATES):
+    """
+    Max-point route from start to target within max_steps.
+
+    Uses the exact DP unless it needs more than max_states states, greedy
+    insertion otherwise (max_states=0 forces greedy). Returns (visited, path, collected_points, steps)
+    like reward_search.a_star, with visited the food cells considered, or
+    (visited, [], None, None) when the target cannot be reached in time.
+    """
+    def manhattan(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    # Foods that cannot fit in the step budget even in a straight line are dropped
+    foods = [cell for cell, food in food_objects.items()
+             if food.points > 0 and cell not in (start, target)
+             and manhattan(start, cell) + manhattan(cell, target) <= max_steps]
+    blocked = {cell for cell, food in food_objects.items()
+               if food.points < 0 and cell not in (start, target)}
+    values = [food_objects[cell].points for cell in foods]
+    nodes = [start] + foods + [target]
+
+    # Distances and BFS trees from every node except the target
+    cols = len(grid[0])
+    ids = [r * cols + c for r, c in nodes]
+    trees = [bfs_distances(grid, node, blocked, max_steps) for node in nodes[:-1]]
+    unreachable = max_steps + 1
+    dist = [[d if d >= 0 else unreachable for d in (tree[0][i] for i in ids)] for tree in trees]
+    dist.append([unreachable] * len(nodes))
+
+    direct_tree = None
+    if dist[0][-1] > max_steps:
+        # No clean way to the target in time: allow walking over negative foods
+        direct_tree = bfs_distances(grid, start, set(), max_steps)
+        if direct_tree[0][ids[-1]] < 0:
+            return set(foods), [], None, None
+
+    order = []
+    if direct_tree is None:
+        order = solve_exact(dist, values, max_steps, max_states)
+        if order is None:
+            order = solve_greedy(dist, values, max_steps)
+
+    path = [start]
+    legs = [0] + order + [len(nodes) - 1]
+    for a, b in zip(legs, legs[1:]):
+        parent = (direct_tree or trees[a])[1]
+        leg = []
+        cell = ids[b]
+        while cell != ids[a]:
+            leg.append(divmod(cell, cols))
+            cell = parent[cell]
+        path.extend(reversed(leg))
+    return set(foods), path, route_points(path, food_objects), len(path) - 1
@@ -0,0 +1,142 @@
+"""
+Reward-maximizing route search used by Search.py, without pygame.
+
+The route goes from start to target in at most max_steps 4-connected moves
+and may pass any in-bounds cell (foods included) as often as it likes; each
+food's points count the first time the route enters its cell.
+"""
+import heapq
+
+
+def heuristic(node, target):
+    return abs(node[0] - target[0]) + abs(node[1] - target[1])
+
+
+def a_star(grid, food_objects, start, target, max_steps):
+    """
+    Best-first label search over (cell, steps, collected mask) states.
+
+    Labels are stored in flat lists and point at their parent, so extending
+    one costs O(1) instead of copying the whole path. Labels are expanded in
+    order of an optimistic bound (points + every positive food still
+    reachable within the remaining steps). A new label is dropped when a
+    label already at that cell dominates it: no more steps and at least as
+    many points, even counting foods the two have collected differently.
+    The search stops once no queued bound beats the best route to the
+    target, so the result is the maximum-point route.
+
+    Returns (visited, path, collected_points, steps), or
+    (visited, [], None, None) when the target is out of reach.
+    """
+    rows, cols = len(grid), len(grid[0])
+    if heuristic(start, target) > max_steps:
+        return {start}, [], None, None
+
+    # Foods as bits of the collected mask
+    food_cells = [cell for cell, food in food_objects.items() if food.points != 0]
+    food_bit = {cell: 1 << i for i, cell in enumerate(food_cells)}
+    points = [food_objects[cell].points for cell in food_cells]
+    positive_mask = sum(1 << i for i, p in enumerate(points) if p > 0)
+    negative_mask = sum(1 << i for i, p in enumerate(points) if p < 0)
+    tr, tc = target
+    positive_foods = [(r, c, abs(r - tr) + abs(c - tc), 1 << i, points[i])
+                      for i, (r, c) in enumerate(food_cells) if points[i] > 0]
+    mask_totals = {}
+
+    def mask_points(mask):
+        total = mask_totals.get(mask)
+        if total is None:
+            total = 0
+            m = mask
+            while m:
+                low = m & -m
+                total += points[low.bit_length() - 1]
+                m ^= low
+            mask_totals[mask] = total
+        return total
+
+    def dominates(a_points, a_mask, b_points, b_mask):
+        """True when label a is at least as good as b for every way the route can continue."""
+        if a_mask == b_mask or a_points < b_points:
+            # With different masks a still needs at least b's points
+            return a_points >= b_points and a_mask == b_mask
+        # b can still collect positive foods a already took; a still has to
+        # step on negative foods b already paid for
+        loss = mask_points(a_mask & ~b_mask & positive_mask) - mask_points(b_mask & ~a_mask & negative_mask)
+        return a_points - loss >= b_points
+
+    def upper_bound(cell, steps, score, mask):
+        left = max_steps - steps
+        r, c = cell
+        bound = score
+        for fr, fc, to_target, bit, p in positive_foods:
+            if not mask & bit and abs(r - fr) + abs(c - fc) + to_target <= left:
+                bound += p
+        return bound
+
+    # Label storage: parallel lists indexed by label id
+    label_cell = [start]
+    label_parent = [-1]
+    label_steps = [0]
+    label_points = [0]
+    label_mask = [food_bit.get(start, 0)]  # the start cell is never collected
+    labels_at = {start: [0]}
+    # Most promising label first; ties go to the deeper one so a complete
+    # route (and with it a pruning threshold) turns up early
+    pq = [(-upper_bound(start, 0, 0, label_mask[0]), 0, 0)]
+    best_label, best_points = -1, None
+    if start == target:
+        best_label, best_points = 0, 0
+
+    while pq:
+        negative_bound, _, label = heapq.heappop(pq)
+        if best_points is not None and -negative_bound <= best_points:
+            break  # nothing left in the queue can beat the best route
+        cell = label_cell[label]
+        steps = label_steps[label] + 1
+        score = label_points[label]
+        mask = label_mask[label]
+
+        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            nr, nc = cell[0] + dr, cell[1] + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            neighbor = (nr, nc)
+            if steps + abs(nr - tr) + abs(nc - tc) > max_steps:
+                continue
+            new_points, new_mask = score, mask
+            bit = food_bit.get(neighbor, 0)
+            if bit and not mask & bit:
+                new_points += points[bit.bit_length() - 1]
+                new_mask |= bit
+
+            existing = labels_at.setdefault(neighbor, [])
+            if any(label_steps[other] <= steps
+                   and dominates(label_points[other], label_mask[other], new_points, new_mask)
+                   for other in existing):
+                continue
+            new_label = len(label_cell)
+            label_cell.append(neighbor)
+            label_parent.append(label)
+            label_steps.append(steps)
+            label_points.append(new_points)
+            label_mask.append(new_mask)
+            existing.append(new_label)
+
+            if neighbor == target and (best_points is None or new_points > best_points):
+                best_label, best_points = new_label, new_points
+            if steps < max_steps:
+                bound = upper_bound(neighbor, steps, new_points, new_mask)
+                if best_points is None or bound > best_points:
+                    heapq.heappush(pq, (-bound, -steps, new_label))
+
+    visited = set(labels_at)
+    if best_label < 0:
+        return visited, [], None, None  # No solution
+    path = []
+    label = best_label
+    while label >= 0:
+        path.append(label_cell[label])
+        label = label_parent[label]
+    path.reverse()
+    return visited, path, best_points, len(path) - 1
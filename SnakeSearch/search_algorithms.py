@@ -0,0 +1,330 @@
+"""
+Grid pathfinding algorithms used by SnakeSearch.py, without pygame, so they
+can be imported and benchmarked on their own.
+
+grid is a list of rows, 0 = free and 1 = blocked; cells are (row, col) and
+moves are 4-connected with unit cost. Every algorithm has the signature
+algorithm(grid, start, target) and returns (visited, path, success, expanded),
+where expanded is the number of nodes taken off the open list.
+"""
+import heapq
+from collections import deque
+
+ALGORITHMS = ["BFS", "DFS", "UCS", "Greedy", "A*", "JPS", "BiBFS", "BiA*"]  # Available algorithms
+
+
+def neighbors(grid, node):
+    """
+    Returns valid neighbors (adjacent cells) of a node in the grid.
+    """
+    row, col = node
+    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Right, Down, Left, Up
+    result = []
+    for dr, dc in directions:
+        r, c = row + dr, col + dc
+        if 0 <= r < len(grid) and 0 <= c < len(grid[0]) and grid[r][c] == 0:
+            result.append((r, c))
+    return result
+
+
+def bfs(grid, start, target):
+    """Breadth-First Search."""
+    queue = deque([start])
+    visited = set([start])
+    parent = {}
+    expanded = 0
+
+    while queue:
+        current = queue.popleft()
+        expanded += 1
+        if current == target:
+            return visited, reconstruct_path(parent, start, target), True, expanded
+        for neighbor in neighbors(grid, current):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                parent[neighbor] = current
+                queue.append(neighbor)
+    return visited, [], False, expanded  # No solution found
+
+
+def dfs(grid, start, target):
+    """Depth-First Search."""
+    stack = [start]
+    visited = set([start])
+    parent = {}
+    expanded = 0
+
+    while stack:
+        current = stack.pop()
+        expanded += 1
+        if current == target:
+            return visited, reconstruct_path(parent, start, target), True, expanded
+        for neighbor in neighbors(grid, current):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                parent[neighbor] = current
+                stack.append(neighbor)
+    return visited, [], False, expanded  # No solution found
+
+
+def ucs(grid, start, target):
+    """Uniform Cost Search."""
+    pq = [(0, start)]  # Priority queue with cost and node
+    visited = set()
+    parent = {}
+    cost = {start: 0}
+
+    while pq:
+        current_cost, current = heapq.heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current == target:
+            return visited, reconstruct_path(parent, start, target), True, len(visited)
+        for neighbor in neighbors(grid, current):
+            new_cost = current_cost + 1  # All edges have uniform cost
+            if neighbor not in cost or new_cost < cost[neighbor]:
+                cost[neighbor] = new_cost
+                parent[neighbor] = current
+                heapq.heappush(pq, (new_cost, neighbor))
+    return visited, [], False, len(visited)  # No solution found
+
+
+def greedy(grid, start, target):
+    """Greedy Best-First Search."""
+    pq = [(heuristic(start, target), start)]
+    visited = set()
+    parent = {}
+
+    while pq:
+        _, current = heapq.heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current == target:
+            return visited, reconstruct_path(parent, start, target), True, len(visited)
+        for neighbor in neighbors(grid, current):
+            if neighbor not in visited:
+                parent[neighbor] = current
+                heapq.heappush(pq, (heuristic(neighbor, target), neighbor))
+    return visited, [], False, len(visited)  # No solution found
+
+
+def a_star(grid, start, target):
+    """A* Search."""
+    pq = [(heuristic(start, target), 0, start)]  # (f, g, node)
+    visited = set()
+    parent = {}
+    cost = {start: 0}
+
+    while pq:
+        _, current_cost, current = heapq.heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current == target:
+            return visited, reconstruct_path(parent, start, target), True, len(visited)
+        for neighbor in neighbors(grid, current):
+            new_cost = current_cost + 1
+            if neighbor not in cost or new_cost < cost[neighbor]:
+                cost[neighbor] = new_cost
+                parent[neighbor] = current
+                heapq.heappush(pq, (new_cost + heuristic(neighbor, target), new_cost, neighbor))
+    return visited, [], False, len(visited)  # No solution found
+
+
+def jps(grid, start, target):
+    """
+    Jump Point Search for the 4-connected uniform grid. Canonical paths go
+    vertically first and turn horizontally; horizontal runs only stop at a
+    forced neighbor (an open cell above/below whose approach from behind is
+    blocked), so long open stretches are crossed without queueing every cell.
+    """
+    rows, cols = len(grid), len(grid[0])
+
+    def free(r, c):
+        return 0 <= r < rows and 0 <= c < cols and grid[r][c] == 0
+
+    def jump_horizontal(r, c, dc):
+        while True:
+            c += dc
+            if not free(r, c):
+                return None
+            if (r, c) == target:
+                return r, c
+            for dr in (-1, 1):
+                if free(r + dr, c) and not free(r + dr, c - dc):
+                    return r, c
+
+    def jump_vertical(r, c, dr):
+        while True:
+            r += dr
+            if not free(r, c):
+                return None
+            if (r, c) == target:
+                return r, c
+            if jump_horizontal(r, c, -1) or jump_horizontal(r, c, 1):
+                return r, c
+
+    def successors(node, direction):
+        r, c = node
+        if direction is None:  # start node: every direction
+            moves = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        elif direction[0] == 0:  # reached horizontally
+            dc = direction[1]
+            moves = [(0, dc)] + [(dr, 0) for dr in (-1, 1)
+                                 if free(r + dr, c) and not free(r + dr, c - dc)]
+        else:  # reached vertically
+            moves = [direction, (0, -1), (0, 1)]
+        for dr, dc in moves:
+            if dc == 0:
+                point = jump_vertical(r, c, dr)
+            else:
+                point = jump_horizontal(r, c, dc)
+            if point:
+                yield point, (dr, dc)
+
+    pq = [(heuristic(start, target), 0, start, None)]  # (f, -g, node, direction)
+    visited = set()
+    parent = {}
+    cost = {start: 0}
+
+    while pq:
+        _, neg_cost, current, direction = heapq.heappop(pq)
+        current_cost = -neg_cost
+        if current in visited:
+            continue
+        visited.add(current)
+        if current == target:
+            # Jump points are joined by straight runs; fill in the cells between
+            corners = reconstruct_path(parent, start, target)
+            path = [start]
+            for (r, c) in corners[1:]:
+                pr, pc = path[-1]
+                dr, dc = (r > pr) - (r < pr), (c > pc) - (c < pc)
+                while (pr, pc) != (r, c):
+                    pr, pc = pr + dr, pc + dc
+                    path.append((pr, pc))
+            return visited, path, True, len(visited)
+        for point, move in successors(current, direction):
+            new_cost = current_cost + heuristic(current, point)
+            if point not in cost or new_cost < cost[point]:
+                cost[point] = new_cost
+                parent[point] = current
+                heapq.heappush(pq, (new_cost + heuristic(point, target), -new_cost, point, move))
+    return visited, [], False, len(visited)  # No solution found
+
+
+def bidirectional_bfs(grid, start, target):
+    """BFS from both ends, always growing the smaller frontier by one layer."""
+    if start == target:
+        return {start}, [start], True, 1
+    parents = ({start: None}, {target: None})
+    frontiers = ([start], [target])
+    expanded = 0
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other = parents[side], parents[1 - side]
+        next_frontier = []
+        for current in frontiers[side]:
+            expanded += 1
+            for neighbor in neighbors(grid, current):
+                if neighbor in own:
+                    continue
+                own[neighbor] = current
+                if neighbor in other:
+                    visited = set(parents[0]) | set(parents[1])
+                    return visited, join_paths(parents, neighbor), True, expanded
+                next_frontier.append(neighbor)
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+    return set(parents[0]) | set(parents[1]), [], False, expanded  # No solution found
+
+
+def bidirectional_a_star(grid, start, target):
+    """
+    A* from both ends, expanding whichever open list has the smaller top.
+    Stops once both tops (i.e. the smaller one) reach the best meeting cost
+    found so far, which keeps the result optimal with the consistent
+    Manhattan heuristic.
+    """
+    if start == target:
+        return {start}, [start], True, 1
+    goals = (target, start)
+    parents = ({start: None}, {target: None})
+    costs = ({start: 0}, {target: 0})
+    # Ties on f go to the deeper node (larger g), otherwise open grids expand every cell
+    queues = ([(heuristic(start, target), 0, start)], [(heuristic(target, start), 0, target)])
+    closed = (set(), set())
+    best, meeting = float('inf'), None
+
+    while queues[0] and queues[1]:
+        if min(queues[0][0][0], queues[1][0][0]) >= best:
+            break
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        _, neg_cost, current = heapq.heappop(queues[side])
+        current_cost = -neg_cost
+        if current in closed[side] or current_cost > costs[side][current]:
+            continue
+        closed[side].add(current)
+        for neighbor in neighbors(grid, current):
+            new_cost = current_cost + 1
+            if neighbor not in costs[side] or new_cost < costs[side][neighbor]:
+                costs[side][neighbor] = new_cost
+                parents[side][neighbor] = current
+                heapq.heappush(queues[side],
+                               (new_cost + heuristic(neighbor, goals[side]), -new_cost, neighbor))
+                if neighbor in costs[1 - side] and new_cost + costs[1 - side][neighbor] < best:
+                    best = new_cost + costs[1 - side][neighbor]
+                    meeting = neighbor
+
+    visited = closed[0] | closed[1]
+    expanded = len(visited)
+    if meeting is None:
+        return visited, [], False, expanded  # No solution found
+    return visited, join_paths(parents, meeting), True, expanded
+
+
+def join_paths(parents, meeting):
+    """Path from start to target through the cell where the two searches met."""
+    path = []
+    current = meeting
+    while current is not None:
+        path.append(current)
+        current = parents[0][current]
+    path.reverse()
+    current = parents[1][meeting]
+    while current is not None:
+        path.append(current)
+        current = parents[1][current]
+    return path
+
+
+def heuristic(node, target):
+    """Manhattan Distance Heuristic."""
+    return abs(node[0] - target[0]) + abs(node[1] - target[1])
+
+
+def reconstruct_path(parent, start, target):
+    """Reconstructs the path from start to target using the parent dictionary."""
+    path = []
+    current = target
+    while current != start:
+        path.append(current)
+        current = parent.get(current)
+        if current is None:
+            return []  # No path exists
+    path.append(start)
+    return path[::-1]  # Reverse the path
+
+
+ALGORITHM_FUNCTIONS = {
+    "BFS": bfs,
+    "DFS": dfs,
+    "UCS": ucs,
+    "Greedy": greedy,
+    "A*": a_star,
+    "JPS": jps,
+    "BiBFS": bidirectional_bfs,
+    "BiA*": bidirectional_a_star,
+}